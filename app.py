@@ -1,12 +1,28 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response
 import pandas as pd
+import numpy as np
+import json
 import os
-from datetime import datetime
+from datetime import datetime, date
 from ml_engine import MLEngine
-from dsa_engine import DSAEngine
+from dsa_engine import DSAEngine, RESULT_LIMIT, NEARBY_RADIUS_KM
+from price_index import decode_cursor
+from store import MarketStore, ListingFeed
+from market_index import AvailabilityIndex
+from search_index import SearchIndex
+from recommendations import RecommendationIndex, RECOMMENDATION_CONFIG
+from order_book import MatchingEngine
+from price_history import PriceHistory, RESOLUTIONS
+from response_cache import ResponseCache
+from instrumentation import registry, timed, instrument
 
 app = Flask(__name__)
 app.secret_key = 'landsphere_secret_key'
+# Requests slower than this (seconds) log their per-stage breakdown; None disables it
+app.config['SLOW_REQUEST_SECONDS'] = 0.5
+
+# Template rendering is a stage of its own in the request breakdowns
+render_template = instrument('render')(render_template)
 
 # Initialize Engines
 ml_engine = MLEngine()
@@ -16,14 +32,89 @@ DATA_DIR = 'data'
 USERS_CSV = os.path.join(DATA_DIR, 'Users.csv')
 TRANSACTIONS_CSV = os.path.join(DATA_DIR, 'Transactions.csv')
 LISTINGS_CSV = os.path.join(DATA_DIR, 'Listings.csv')
+STORE_DB = os.path.join(DATA_DIR, 'landsphere.db')
+
+# Users/Listings/Transactions live in SQLite; the CSVs are imported once
+store = MarketStore(STORE_DB)
+if store.created:
+    store.import_csvs(USERS_CSV, LISTINGS_CSV, TRANSACTIONS_CSV)
+
+# Retrain in a worker process when the dataset or the sales history changes. Under
+# serve.py each forked worker starts its own watcher: threads do not survive fork.
+if not os.environ.get('LANDSPHERE_PREFORK'):
+    ml_engine.watch(sales_count=store.sales_count, load_sales=store.sales)
+
+# Available-listing counts per region/state/city, updated by buy and sell
+availability = AvailabilityIndex(dsa_engine, store.available_listings())
+
+# Region/state/city/type names for the search box: prefix autocomplete and typo-tolerant lookup
+search_index = SearchIndex(dsa_engine)
+
+# Top investment picks per region/state/city/type, scored on first use and re-ranked by buy and sell
+recommendations = RecommendationIndex(dsa_engine, availability, ml_engine)
+
+# Price per sqft history per city and type, built from the recorded sales and fed every new one
+price_history = PriceHistory(dsa_engine)
+price_history.load(store.sales())
+
+# Bids and asks per listing, matched in price-time order; a match settles like a buy
+order_books = MatchingEngine(store)
+
+def apply_listing_change(property_id, price, status, order_id=None, sale_date=None):
+    """Bring this process's indexes and models up to date with one buy, relist or order"""
+    if status == 'Order':
+        # A bid placed or cancelled: only the order book holds bids
+        order_books.order_changed(property_id, order_id)
+        return
+    if status == 'Sold':
+        availability.remove(property_id)
+        # Sales feed the price model in mini-batches, off the request path
+        ml_engine.observe_sale(property_id, price)
+        # Bucketed by the transaction's date, as price_history.load does, not by when the change is applied
+        day = date.fromisoformat(str(sale_date)[:10]) if sale_date else datetime.now().date()
+        price_history.record(property_id, price, day)
+    elif status == 'Withdrawn':
+        availability.remove(property_id)
+    else:
+        availability.add(property_id, price)
+    recommendations.update(property_id)
+    order_books.invalidate(property_id)
 
-def load_csv(path):
-    if os.path.exists(path):
-        return pd.read_csv(path)
-    return pd.DataFrame()
+# Buys, relists and orders reach the indexes through the store's change log, so forked workers see each other's
+listing_feed = ListingFeed(store, apply_listing_change)
 
-def save_csv(df, path):
-    df.to_csv(path, index=False)
+def data_version():
+    # The same in every worker serving the same data, so no worker answers 304 for another's different
+    # body: the newest listing change applied from the store's log (buys, sells and relists of every
+    # worker, applied before each request; bids only touch order books, which no cached view reads)
+    # and the newest UserID (registrations). Views of model output key on model_version instead.
+    return f'{listing_feed.listings_seen}.{store.last_user_id()}'
+
+def model_version():
+    # Loads the models first, so a worker that has not served them yet does not key on 'unloaded'
+    ml_engine.ensure_loaded()
+    return ml_engine.version
+
+# GET responses that only change with the data: ETags, 304s, and an LRU of rendered bodies
+response_cache = ResponseCache(data_version)
+
+# Listing views and list APIs return pages of at most MAX_PAGE_SIZE rows
+LISTING_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Every request is timed as route.<endpoint>, the listing sync included, and counted by status
+registry.track_requests(app)
+
+@app.before_request
+def sync_listings():
+    listing_feed.sync()
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Stage histograms and counters in the Prometheus text format, for local scrapers only
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'error': 'Forbidden'}), 403
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
@@ -34,10 +125,9 @@ def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
-        users = load_csv(USERS_CSV)
-        user = users[(users['Username'] == username) & (users['Password'] == password)]
-        if not user.empty:
-            session['user_id'] = int(user.iloc[0]['UserID'])
+        user = store.authenticate(username, password)
+        if user:
+            session['user_id'] = int(user['UserID'])
             session['username'] = username
             return redirect(url_for('dashboard'))
         return render_template('login.html', error="Invalid credentials")
@@ -53,15 +143,9 @@ def register():
         phone = request.form['phone']
         address = request.form['address']
         
-        users = load_csv(USERS_CSV)
-        if username in users['Username'].values:
+        new_id = store.create_user(username, password, email, 10000000, fullname, phone, address)
+        if new_id is None:
             return render_template('register.html', error="Username already exists")
-        
-        new_id = users['UserID'].max() + 1 if not users.empty else 1
-        new_user = pd.DataFrame([[new_id, username, password, email, 10000000, fullname, phone, address]], 
-                                columns=['UserID', 'Username', 'Password', 'Email', 'Balance', 'FullName', 'Phone', 'Address'])
-        users = pd.concat([users, new_user], ignore_index=True)
-        save_csv(users, USERS_CSV)
         return redirect(url_for('login'))
     return render_template('register.html')
 
@@ -74,71 +158,127 @@ def logout():
 def dashboard():
     if 'user_id' not in session: return redirect(url_for('login'))
     user_id = session['user_id']
-    trans = load_csv(TRANSACTIONS_CSV)
     
-    # Admin View: User ID 1 sees everything
+    # Admin View: User ID 1 pages through everything; others see their own history
+    next_cursor = None
     if user_id == 1:
-        transactions = trans
+        try:
+            transactions, next_cursor = store.transactions_page(
+                page_size(request.args.get('limit', type=int), LISTING_PAGE_SIZE), request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
     else:
-        transactions = trans[trans['UserID'] == user_id]
+        transactions = store.transactions(user_id)
     
-    users = load_csv(USERS_CSV)
-    balance = users[users['UserID'] == user_id]['Balance'].values[0]
+    balance = store.get_user(user_id)['Balance']
     
-    # Get Owned Properties
-    listings = load_csv(LISTINGS_CSV)
-    owned = listings[listings['OwnerID'] == user_id]
-    props = dsa_engine.df
-    my_properties = pd.merge(owned, props, left_on='PropertyID', right_on='Property_ID').to_dict('records')
+    # Get Owned Properties: indexed by owner in the store, then only those property rows
+    owned = store.owned_listings(user_id)
+    with timed('merge.owned_properties'):
+        my_properties = pd.merge(owned, properties_for(owned['PropertyID']),
+                                 left_on='PropertyID', right_on='Property_ID').to_dict('records')
     
     return render_template('dashboard.html', username=session['username'], balance=balance, 
-                         transactions=transactions.to_dict('records'), my_properties=my_properties, is_admin=(user_id == 1))
+                         transactions=transactions.to_dict('records'), next_cursor=next_cursor,
+                         my_properties=my_properties, is_admin=(user_id == 1))
 
 @app.route('/api/nearby_cities')
+@response_cache.cached()
 def nearby_cities():
     city = request.args.get('city')
     if not city:
         return jsonify({'error': 'City is required'}), 400
     
-    # Query the DSA engine's BFS implementation
-    nearby = dsa_engine.bfs_nearby_cities(city)
-    return jsonify({'nearby': nearby})
+    max_hops = request.args.get('max_hops', type=int)
+    limit = request.args.get('limit', type=int)
+    radius_km = request.args.get('radius_km', type=float)
+    k = request.args.get('k', type=int)
+    
+    # Served from the DSA engine's precomputed hop tables, or its spatial index given radius_km / k
+    nearby = dsa_engine.bfs_nearby_cities(city, max_hops=max_hops, limit=limit, with_hops=True, radius_km=radius_km, k=k)
+    names = [c for c, _ in nearby]
+    return jsonify({'nearby': names, 'hops': {c: h for c, h in nearby},
+                    'distance_km': dsa_engine.city_distances(city, names)})
 
-@app.route('/marketplace')
-def marketplace():
-    listings = load_csv(LISTINGS_CSV)
-    available = listings[listings['Status'] == 'Available']
-    props = dsa_engine.df
-    users = load_csv(USERS_CSV)
+@app.route('/api/route')
+def city_route():
+    source, target = request.args.get('from'), request.args.get('to')
+    if not source or not target:
+        return jsonify({'error': 'from and to cities are required'}), 400
+    # Shortest distance-weighted path over the road graph, precomputed at load
+    route = dsa_engine.shortest_path(source, target)
+    if not route:
+        return jsonify({'error': 'No route between these cities'}), 404
+    return jsonify(route)
+
+def properties_for(property_ids):
+    """Property table rows of the given PropertyIDs (unknown IDs skipped), without scanning the table"""
+    rows = dsa_engine.rows_of(property_ids)
+    return dsa_engine.df.iloc[rows[rows >= 0]]
+
+def city_market_data(property_ids):
+    """Available listings merged with property and owner details, in the given PropertyID order"""
+    props = properties_for(property_ids)
+    available = store.listings_for(props['Property_ID'])
+    available = available[available['Status'] == 'Available']
     
     # Merge available listings with properties
-    market_data = pd.merge(available, props, left_on='PropertyID', right_on='Property_ID')
+    with timed('merge.listing_properties'):
+        market_data = pd.merge(available, props, left_on='PropertyID', right_on='Property_ID')
     # Merge with users to get owner details
     user_cols = ['UserID', 'Username', 'FullName', 'Phone', 'Email', 'Address']
-    market_data = pd.merge(market_data, users[user_cols], left_on='OwnerID', right_on='UserID', how='left')
+    users = store.users_frame(user_cols, user_ids=available['OwnerID'].unique())
+    with timed('merge.listing_owners'):
+        market_data = pd.merge(market_data, users, left_on='OwnerID', right_on='UserID', how='left')
     market_data['OwnerName'] = market_data['FullName'].fillna(market_data['Username'].fillna('Platform'))
-    
+    position = {int(pid): i for i, pid in enumerate(property_ids)}
+    return market_data.sort_values('PropertyID', key=lambda ids: ids.map(position))
+
+def page_size(limit, default):
+    return default if limit is None else min(max(limit, 1), MAX_PAGE_SIZE)
+
+def ndjson_response(lines):
+    """Stream an iterable of newline-terminated JSON strings as NDJSON"""
+    return Response(lines, mimetype='application/x-ndjson')
+
+def stream_city_listings(city, budget, sort_by, cursor, limit):
+    """NDJSON lines of every listing a city's pages hold from cursor on, one page in memory at a time"""
+    # DSA Logic: pages come from the city's price index or PropertyID order (see AvailabilityIndex.city_page)
+    pages = availability.city_pages(city, limit, cursor, sort_by, max_price=budget or None)
+    return (city_market_data(property_ids).to_json(orient='records', lines=True)
+            for property_ids in pages if len(property_ids))
+
+@app.route('/marketplace')
+# Region, state and city summaries; listing pages and searches are not cached
+@response_cache.cached(per_user=True, when=lambda: not request.args.get('city') and not request.args.get('search'))
+def marketplace():
     region_filter = request.args.get('region')
     state_filter = request.args.get('state')
     city_filter = request.args.get('city')
     search_query = request.args.get('search')
     if search_query:
-        search_query = search_query.strip().lower()
-        # Search Cities first
-        city_match = props[props['City'].str.lower() == search_query]
-        if not city_match.empty:
-            row = city_match.iloc[0]
-            return redirect(url_for('marketplace', region=row['Region'], state=row['State'], city=row['City']))
-        
-        # Search States
-        state_match = props[props['State'].str.lower() == search_query]
-        if not state_match.empty:
-            row = state_match.iloc[0]
-            return redirect(url_for('marketplace', region=row['Region'], state=row['State']))
+        # Exact city, then state names first; otherwise the closest match, so "Bangalor" finds Bengaluru
+        match = search_index.resolve(search_query, kinds=('city', 'state', 'region'))
+        if match and match['type'] == 'city':
+            return redirect(url_for('marketplace', region=match['region'], state=match['state'], city=match['name']))
+        if match and match['type'] == 'state':
+            return redirect(url_for('marketplace', region=match['region'], state=match['name']))
+        if match:
+            return redirect(url_for('marketplace', region=match['name']))
 
     if city_filter:
-        # Step 4: Detailed Listings for City
-        city_market = market_data[market_data['City'].str.lower() == city_filter.lower()]
+        # Step 4: Detailed Listings for City (only this city's listings are read)
+        budget = request.args.get('budget', type=int)
+        sort_by = request.args.get('sort')
+        cursor = request.args.get('cursor')
+        limit = page_size(request.args.get('limit', type=int), LISTING_PAGE_SIZE)
+        try:
+            if request.args.get('format') == 'ndjson':
+                return ndjson_response(stream_city_listings(city_filter, budget, sort_by, cursor, limit))
+            property_ids, next_cursor = availability.city_page(city_filter, limit, cursor, sort_by, max_price=budget or None)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        city_market = city_market_data(property_ids)
         
         # Infer context if missing (e.g. from direct URL)
         if not state_filter and not city_market.empty:
@@ -146,104 +286,47 @@ def marketplace():
         if not region_filter and not city_market.empty:
             region_filter = city_market.iloc[0]['Region']
             
-        # DSA Logic: Sort/Search
-        budget = request.args.get('budget', type=int)
-        if budget:
-            city_market = city_market[city_market['Price'] <= budget]
-        
-        sort_by = request.args.get('sort')
-        if sort_by == 'price_asc':
-            city_market = city_market.sort_values('Price')
-        elif sort_by == 'price_desc':
-            city_market = city_market.sort_values('Price', ascending=False)
-            
-        return render_template('marketplace.html', properties=city_market.to_dict('records'), 
+        return render_template('marketplace.html', properties=city_market.to_dict('records'), next_cursor=next_cursor,
                              selected_city=city_filter, selected_state=state_filter, selected_region=region_filter)
     
     elif state_filter:
-        # Step 3: City Overview within State
-        state_market = market_data[market_data['State'].str.lower() == state_filter.lower()]
-        if state_market.empty:
+        # Step 3: City Overview within State, from the availability index
+        city_counts = availability.city_summary(state_filter)
+        if not city_counts:
             return redirect('/marketplace')
             
         if not region_filter:
-            region_filter = state_market.iloc[0]['Region']
+            region_filter = availability.region_of_state(state_filter)
             
-        city_counts = state_market.groupby('City').size().reset_index(name='count')
-        return render_template('marketplace.html', city_summary=city_counts.to_dict('records'), 
+        return render_template('marketplace.html', city_summary=city_counts, 
+                             type_summary=availability.type_summary('state', availability.states[state_filter.lower()]),
                              selected_state=state_filter, selected_region=region_filter)
     
     elif region_filter:
         # Step 2: State Overview within Region
-        region_market = market_data[market_data['Region'].str.lower() == region_filter.lower()]
-        if region_market.empty:
+        state_counts = availability.state_summary(region_filter)
+        if not state_counts:
             return redirect('/marketplace')
             
-        state_counts = region_market.groupby('State').size().reset_index(name='count')
-        return render_template('marketplace.html', state_summary=state_counts.to_dict('records'), 
+        return render_template('marketplace.html', state_summary=state_counts, 
+                             type_summary=availability.type_summary('region', availability.regions[region_filter.lower()]),
                              selected_region=region_filter)
     
     else:
         # Step 1: Region Overview (India)
-        region_counts = market_data.groupby('Region').size().reset_index(name='count')
-        return render_template('marketplace.html', region_summary=region_counts.to_dict('records'))
+        return render_template('marketplace.html', region_summary=availability.region_summary())
 
 @app.route('/buy/<int:property_id>', methods=['POST'])
 def buy_land(property_id):
     if 'user_id' not in session: return jsonify({'error': 'Unauthorized'}), 401
     buyer_id = session['user_id']
     
-    listings = load_csv(LISTINGS_CSV)
-    listing_match = listings[listings['PropertyID'] == property_id]
-    
-    if listing_match.empty or listing_match.iloc[0]['Status'] != 'Available':
-        return jsonify({'error': 'Not available'}), 400
-    
-    listing_idx = listing_match.index[0]
-    price = listing_match.at[listing_idx, 'Price']
-    seller_id = int(listing_match.at[listing_idx, 'OwnerID'])
-    
-    if buyer_id == seller_id:
-        return jsonify({'error': 'You already own this land'}), 400
-
-    users = load_csv(USERS_CSV)
-    buyer_idx = users[users['UserID'] == buyer_id].index[0]
-    
-    # Balance Restriction Removed per User Request
-    # if users.at[buyer_idx, 'Balance'] < price:
-    #     return jsonify({'error': 'Insufficient balance'}), 400
-    
-    # 1. Update Buyer Balance
-    users.at[buyer_idx, 'Balance'] -= price
-    
-    # 2. Update Seller Balance (if not platform)
-    if seller_id != 0:
-        seller_row_idx = users[users['UserID'] == seller_id].index
-        if not seller_row_idx.empty:
-            users.at[seller_row_idx[0], 'Balance'] += price
-            
-    save_csv(users, USERS_CSV)
-    
-    # 3. Update Listing
-    listings.at[listing_idx, 'Status'] = 'Sold'
-    listings.at[listing_idx, 'OwnerID'] = buyer_id
-    save_csv(listings, LISTINGS_CSV)
-    
-    # 4. Record Transaction for Buyer
-    trans = load_csv(TRANSACTIONS_CSV)
-    new_trans_id = trans['TransactionID'].max() + 1 if not trans.empty else 1
-    new_record = pd.DataFrame([[new_trans_id, buyer_id, property_id, datetime.now().strftime('%Y-%m-%d'), price, 'Buy']], 
-                               columns=['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type'])
-    trans = pd.concat([trans, new_record], ignore_index=True)
-    
-    # Optional: Record Transaction for Seller
-    if seller_id != 0:
-        new_trans_id += 1
-        sell_record = pd.DataFrame([[new_trans_id, seller_id, property_id, datetime.now().strftime('%Y-%m-%d'), price, 'Sell']], 
-                                    columns=['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type'])
-        trans = pd.concat([trans, sell_record], ignore_index=True)
-        
-    save_csv(trans, TRANSACTIONS_CSV)
+    # Debit, credit, listing flip and both transaction rows commit together
+    listing, error = order_books.buy(property_id, buyer_id, datetime.now().strftime('%Y-%m-%d'))
+    if error:
+        return jsonify({'error': error}), 400
+    # The indexes and the price model catch up from the change log, here and in every other worker
+    listing_feed.publish()
     
     return jsonify({'success': True})
 
@@ -256,18 +339,49 @@ def sell_land(property_id):
     if not price or price <= 0:
         return jsonify({'error': 'Invalid price'}), 400
         
-    listings = load_csv(LISTINGS_CSV)
-    listing_match = listings[(listings['PropertyID'] == property_id) & (listings['OwnerID'] == user_id)]
-    
-    if listing_match.empty:
-        return jsonify({'error': 'Property not found or not owned by you'}), 400
-        
-    idx = listing_match.index[0]
-    listings.at[idx, 'Status'] = 'Available'
-    listings.at[idx, 'Price'] = price
-    save_csv(listings, LISTINGS_CSV)
+    # The new asking price may meet a waiting bid at once
+    order, trades, error = order_books.place(property_id, user_id, 'Ask', price, datetime.now().strftime('%Y-%m-%d'))
+    if error:
+        return jsonify({'error': error}), 400
+    listing_feed.publish()
     
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'order_id': order['OrderID'], 'trades': trades})
+
+@app.route('/orders/<int:property_id>', methods=['POST'])
+def place_order(property_id):
+    if 'user_id' not in session: return jsonify({'error': 'Unauthorized'}), 401
+    side = str(request.json.get('side', '')).capitalize()
+    price = request.json.get('price')
+    if side not in ('Bid', 'Ask'):
+        return jsonify({'error': 'Side must be bid or ask'}), 400
+    if not isinstance(price, (int, float)) or price <= 0:
+        return jsonify({'error': 'Invalid price'}), 400
+
+    order, trades, error = order_books.place(property_id, session['user_id'], side, price,
+                                             datetime.now().strftime('%Y-%m-%d'))
+    if error:
+        return jsonify({'error': error}), 400
+    listing_feed.publish()
+    return jsonify({'success': True, 'order': order, 'trades': trades})
+
+@app.route('/orders/cancel/<int:order_id>', methods=['POST'])
+def cancel_order(order_id):
+    if 'user_id' not in session: return jsonify({'error': 'Unauthorized'}), 401
+    order, error = order_books.cancel(order_id, session['user_id'])
+    if error:
+        return jsonify({'error': error}), 400
+    listing_feed.publish()
+    return jsonify({'success': True, 'order': order})
+
+@app.route('/api/order_book/<int:property_id>')
+def order_book_api(property_id):
+    levels = min(max(request.args.get('levels', 10, type=int), 1), 100)
+    return jsonify(order_books.book(property_id, levels))
+
+# /predict's inputs and defaults; growth_rate and risk_score are fixed there and per row in /predict_batch
+PREDICT_DEFAULTS = {'area': 1000, 'year_buying': 2024, 'years': 5, 'growth_rate': 0.1, 'risk_score': 5}
+# Longest horizon a /predict_batch row may ask for (its time series has years + 1 points)
+MAX_PREDICT_YEARS = 100
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -277,8 +391,8 @@ def predict():
     horizon = data.get('years', 5)
     
     # Sensible defaults for parameters removed from UI
-    growth_rate = 0.1  # 10% annual growth
-    risk_score = 5    # Neutral risk
+    growth_rate = PREDICT_DEFAULTS['growth_rate']  # 10% annual growth
+    risk_score = PREDICT_DEFAULTS['risk_score']    # Neutral risk
     
     # Initial prediction (Current Price approx.)
     # Note: Using year_buying as year_built for ML input consistency
@@ -303,7 +417,67 @@ def predict():
     res['time_series'] = series
     return jsonify(res)
 
+def predict_rows(rows):
+    """Columns area, year_buying, years, growth_rate, risk_score of /predict_batch rows.
+
+    Each row is an object with /predict's inputs (area, year_buying, years)
+    and optionally its own growth_rate and risk_score, defaulting to the
+    values /predict uses. Raises ValueError naming the first invalid row.
+    """
+    if not isinstance(rows, list) or not rows:
+        raise ValueError('rows must be a non-empty list')
+    columns = {name: [] for name in PREDICT_DEFAULTS}
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f'row {i} must be an object')
+        for name, default in PREDICT_DEFAULTS.items():
+            value = row.get(name, default)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+                raise ValueError(f'row {i}: {name} must be a number')
+            columns[name].append(value)
+        if not isinstance(columns['years'][-1], int) or not 0 <= columns['years'][-1] <= MAX_PREDICT_YEARS:
+            raise ValueError(f'row {i}: years must be a whole number from 0 to {MAX_PREDICT_YEARS}')
+        if columns['risk_score'][-1] <= 0:
+            raise ValueError(f'row {i}: risk_score must be positive')
+        if columns['growth_rate'][-1] <= -1:
+            raise ValueError(f'row {i}: growth_rate must be above -1')
+    return columns
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    body = request.get_json(silent=True)
+    try:
+        columns = predict_rows(body.get('rows') if isinstance(body, dict) else None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    area, year_buying, horizon = columns['area'], columns['year_buying'], columns['years']
+    growth_rate, risk_score = columns['growth_rate'], columns['risk_score']
+    
+    # One model call for the whole batch
+    res = ml_engine.predict_batch(area, year_buying, growth_rate, risk_score, horizon)
+    
+    series = res['time_series'].tolist()
+    results = []
+    for i in range(len(area)):
+        results.append({
+            'current_price_est': float(res['current_price_est'][i]),
+            'future_price': float(res['future_price'][i]),
+            'roi': float(res['roi'][i]),
+            'risk_score': risk_score[i],
+            'investment_score': float(res['investment_score'][i]),
+            'time_series': [{'year': year_buying[i] + y, 'price': series[i][y]} for y in range(horizon[i] + 1)]
+        })
+    return jsonify({'results': results})
+
+@app.route('/retrain', methods=['POST'])
+def retrain():
+    # Admin only: retrain in the background, /predict keeps serving the current models
+    if session.get('user_id') != 1: return jsonify({'error': 'Unauthorized'}), 401
+    ml_engine.retrain_async(store.sales())
+    return jsonify({'started': True})
+
 @app.route('/analyzer')
+@response_cache.cached(per_user=True, version=model_version)
 def analyzer():
     return render_template('analyzer.html', metrics=ml_engine.metrics)
 
@@ -313,11 +487,13 @@ def compare():
     return render_template('compare.html', cities=cities)
 
 @app.route('/api/city/<city_name>')
+@response_cache.cached()
 def city_api(city_name):
     data = dsa_engine.get_city_data(city_name)
     return jsonify(data)
 
 @app.route('/api/compare')
+@response_cache.cached()
 def compare_api():
     cities = request.args.get('cities', '').split(',')
     cities = [c.strip() for c in cities if c.strip()]
@@ -326,6 +502,70 @@ def compare_api():
     data = dsa_engine.get_multi_city_data(cities)
     return jsonify(data)
 
+def history_args():
+    # resolution, type, start/end (YYYY-MM-DD) and limit of the history APIs; raises ValueError when invalid
+    resolution = request.args.get('resolution', 'month')
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    start, end = (request.args.get(name) for name in ('start', 'end'))
+    return {'property_type': request.args.get('type'), 'resolution': resolution,
+            'start': datetime.strptime(start, '%Y-%m-%d').date() if start else None,
+            'end': datetime.strptime(end, '%Y-%m-%d').date() if end else None,
+            'limit': request.args.get('limit', type=int)}
+
+@app.route('/api/city/<city_name>/history')
+def city_history_api(city_name):
+    # Pre-aggregated price per sqft history: daily, monthly or yearly points with rolling median, volume and growth
+    try:
+        args = history_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    history = price_history.history(city_name, **args)
+    if history is None:
+        return jsonify({'error': 'Unknown city or property type'}), 404
+    return jsonify(history)
+
+@app.route('/api/compare/history')
+def compare_history_api():
+    cities = [c.strip() for c in request.args.get('cities', '').split(',') if c.strip()]
+    try:
+        args = history_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(price_history.compare(cities, **args))
+
+@app.route('/api/properties')
+def properties_api():
+    # Properties by price: a page and its next_cursor, or every match streamed as NDJSON with format=ndjson
+    min_price = request.args.get('min_price', type=float)
+    max_price = request.args.get('max_price', type=float)
+    descending = request.args.get('sort') == 'price_desc'
+    cursor = request.args.get('cursor')
+    try:
+        if cursor:
+            decode_cursor(cursor)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    if request.args.get('format') == 'ndjson':
+        rows = dsa_engine.iter_price_range(min_price, max_price, descending, cursor)
+        return ndjson_response(json.dumps(row) + '\n' for row in rows)
+    limit = page_size(request.args.get('limit', type=int), RESULT_LIMIT)
+    return jsonify(dsa_engine.price_page(limit, cursor, descending, min_price, max_price))
+
+@app.route('/api/autocomplete')
+def autocomplete_api():
+    # Regions, states, cities and property types starting with q (or closest to it, for typos)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    return jsonify(search_index.complete(request.args.get('q', ''), limit))
+
+@app.route('/api/recommendations')
+def recommendations_api():
+    # Available listings with the best expected return per point of risk, filtered by region/state/city and type
+    limit = min(max(request.args.get('limit', 10, type=int), 1), RECOMMENDATION_CONFIG['top_k'])
+    return jsonify(recommendations.top(request.args.get('region'), request.args.get('state'),
+                                       request.args.get('city'), request.args.get('type'), limit))
+
 @app.route('/api/search_nearby')
 def search_nearby_api():
     state = request.args.get('state', '')
@@ -333,11 +573,12 @@ def search_nearby_api():
     prop_type = request.args.get('type', '')
     target_price = request.args.get('price', type=float)
     margin = request.args.get('margin', type=float)
+    radius_km = request.args.get('radius_km', NEARBY_RADIUS_KM, type=float)
     
     if not state or not prop_type or target_price is None:
         return jsonify({'error': 'State, type, and target price are required'}), 400
         
-    results = dsa_engine.search_nearby(state, city, prop_type, target_price, margin)
+    results = dsa_engine.search_nearby(state, city, prop_type, target_price, margin, radius_km)
     return jsonify(results)
 
 
@@ -0,0 +1,251 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [5000, 100_000, 1_000_000]
+RESULTS_PATH = os.path.join('data', 'benchmarks', 'results.json')
+BASELINE_PATH = os.path.join('data', 'benchmarks', 'baseline.json')
+# A p50 this many times the baseline's counts as a regression
+REGRESSION_THRESHOLD = 1.25
+
+def measure(fn, repeat, warmup=2):
+    """Latency percentiles (ms) and throughput of repeat calls fn(i), after warmup calls"""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    start = time.perf_counter()
+    for i in range(warmup, warmup + repeat):
+        t = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    ms = np.array(samples) * 1000
+    return {
+        'n': repeat,
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p90_ms': round(float(np.percentile(ms, 90)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'mean_ms': round(float(ms.mean()), 4),
+        'max_ms': round(float(ms.max()), 4),
+        'ops_per_s': round(repeat / total, 2)
+    }
+
+def once(fn):
+    """measure() for expensive one-off steps such as generation and training"""
+    return measure(lambda i: fn(), 1, warmup=0)
+
+# --- One dataset size, run in its own process with cwd holding data/ ---
+
+def bench_size(rows, repeat, stub_templates):
+    sys.path.insert(0, REPO_DIR)
+    from data_gen import generate_dataset, DATASET_PATH
+    results = {}
+    n_users = max(100, rows // 100)
+    results['data_gen'] = {'generate_dataset': once(lambda: generate_dataset(rows, n_users, rows // 20, path=DATASET_PATH))}
+
+    from dsa_engine import DSAEngine
+    dsa = DSAEngine()
+    results['dsa'] = bench_dsa(dsa, repeat)
+
+    from ml_engine import MLEngine
+    ml = MLEngine(cache_dir=os.path.join('data', 'model_cache'))
+    results['ml'] = bench_ml(ml, repeat)
+
+    # app.py builds its engines and store from data/ at import; the model cache above is reused
+    started = time.perf_counter()
+    import app as app_module
+    results['app'] = {'startup_s': round(time.perf_counter() - started, 3)}
+    if stub_templates:
+        # Time the route handlers without the Jinja templates
+        app_module.render_template = lambda name, **context: name
+    results['routes'] = bench_routes(app_module, dsa, repeat)
+    return results
+
+def bench_dsa(dsa, repeat):
+    from dsa_engine import DSAEngine
+    prices = np.asarray(dsa.prices)
+    median = float(np.median(prices))
+    city = dsa.city_names[int(np.bincount(dsa.city_codes).argmax())]
+    state = dsa.state_names[dsa.state_codes[dsa.city_rows[dsa.city_index[city]][0]]]
+    cities = dsa.city_names[:5]
+    targets = prices[np.random.default_rng(0).integers(len(prices), size=64)]
+    pages = {'cursor': None}
+
+    def next_page(i):
+        page = dsa.price_page(cursor=pages['cursor'])
+        pages['cursor'] = page['next_cursor']
+
+    return {
+        'load': measure(lambda i: DSAEngine(), max(3, repeat // 20), warmup=0),
+        'linear_search': measure(lambda i: dsa.linear_search(median), repeat),
+        'binary_search': measure(lambda i: dsa.binary_search(targets[i % len(targets)]), repeat),
+        'merge_sort': measure(lambda i: dsa.merge_sort(descending=bool(i % 2)), repeat),
+        'price_range': measure(lambda i: dsa.price_range(median * 0.9, median * 1.1), repeat),
+        'price_page': measure(next_page, repeat),
+        'bfs_nearby_cities': measure(lambda i: dsa.bfs_nearby_cities(city), repeat),
+        'nearby_radius': measure(lambda i: dsa.bfs_nearby_cities(city, radius_km=200), repeat),
+        'shortest_path': measure(lambda i: dsa.shortest_path(city, cities[i % len(cities)]), repeat),
+        'get_city_data': measure(lambda i: dsa.get_city_data(city), repeat),
+        'get_multi_city_data': measure(lambda i: dsa.get_multi_city_data(cities), repeat),
+        'search_nearby': measure(lambda i: dsa.search_nearby(state, city, 'Residential', targets[i % len(targets)]), repeat)
+    }
+
+def bench_ml(ml, repeat):
+    n = 1000
+    rng = np.random.default_rng(0)
+    batch = (rng.integers(500, 10001, n), rng.integers(2018, 2024, n), rng.uniform(0.05, 0.15, n),
+             rng.integers(1, 11, n), rng.integers(1, 11, n))
+    return {
+        # Cold: trains and writes the model cache the app then loads
+        'train': once(ml.ensure_loaded),
+        'load_cached': once(ml.load_cached),
+        'predict': measure(lambda i: ml.predict(2000, 2020, 0.1, 5, 5), repeat),
+        f'predict_batch_{n}': measure(lambda i: ml.predict_batch(*batch), max(3, repeat // 10))
+    }
+
+def bench_routes(app_module, dsa, repeat):
+    store = app_module.store
+    client = app_module.app.test_client()
+    admin = app_module.app.test_client()
+    client.post('/login', data={'username': 'user2', 'password': 'password'})
+    admin.post('/login', data={'username': 'user1', 'password': 'password'})
+    statuses = {}
+
+    def call(name, request):
+        def run(i):
+            status = request(i).status_code
+            counts = statuses.setdefault(name, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+        return run
+
+    row = dsa.city_rows[int(np.bincount(dsa.city_codes).argmax())][0]
+    region = dsa.region_names[dsa.region_codes[row]]
+    state = dsa.state_names[dsa.state_codes[row]]
+    city = dsa.city_names[dsa.city_codes[row]]
+    available = iter(store.available_listings()['PropertyID'].sample(frac=1, random_state=0).tolist())
+
+    def sell():
+        # Relists properties bought for it alone, outside the timing, so it does not depend on the buy benchmark
+        owned = [pid for pid in itertools.islice(available, 10) if client.post(f'/buy/{pid}').status_code == 200]
+        resell = itertools.cycle(owned)
+        return measure(call('sell', lambda i: client.post(f'/sell/{next(resell)}', json={'price': 1_000_000 + i})), repeat)
+
+    # Low bids rest on a few listings, so the books grow as they would on popular properties
+    bid_on = itertools.cycle(store.available_listings()['PropertyID'].head(10).tolist())
+    results = {
+        'marketplace_region': measure(call('marketplace_region', lambda i: client.get('/marketplace')), repeat),
+        'marketplace_state': measure(call('marketplace_state', lambda i: client.get('/marketplace', query_string={'region': region})), repeat),
+        'marketplace_city': measure(call('marketplace_city', lambda i: client.get('/marketplace', query_string={'region': region, 'state': state})), repeat),
+        'marketplace_listings': measure(call('marketplace_listings', lambda i: client.get(
+            '/marketplace', query_string={'region': region, 'state': state, 'city': city})), repeat),
+        'marketplace_listings_sorted': measure(call('marketplace_listings_sorted', lambda i: client.get(
+            '/marketplace', query_string={'region': region, 'state': state, 'city': city, 'sort': 'price_asc'})), repeat),
+        'buy': measure(call('buy', lambda i: client.post(f'/buy/{next(available)}')), repeat),
+        'sell': sell(),
+        'bid': measure(call('bid', lambda i: client.post(f'/orders/{next(bid_on)}', json={'side': 'bid', 'price': 1 + i})), repeat),
+        'order_book': measure(call('order_book', lambda i: client.get(f'/api/order_book/{next(bid_on)}')), repeat),
+        'city_api': measure(call('city_api', lambda i: client.get(f'/api/city/{city}')), repeat),
+        'city_api_not_modified': measure(call('city_api_not_modified', lambda i: client.get(
+            f'/api/city/{city}', headers={'If-None-Match': client.get(f'/api/city/{city}').headers['ETag']})), repeat),
+        'city_history': measure(call('city_history', lambda i: client.get(f'/api/city/{city}/history', query_string={'resolution': 'day'})), repeat),
+        'dashboard': measure(call('dashboard', lambda i: client.get('/dashboard')), repeat),
+        'recommendations': measure(call('recommendations', lambda i: client.get(
+            '/api/recommendations', query_string={'state': state, 'type': 'Residential'})), repeat),
+        'dashboard_admin': measure(call('dashboard_admin', lambda i: admin.get('/dashboard')), max(3, repeat // 10)),
+        'predict': measure(call('predict', lambda i: client.post('/predict', json={'area': 2000, 'year_buying': 2024, 'years': 5})), repeat)
+    }
+    for name, counts in statuses.items():
+        results[name]['status'] = counts
+    return results
+
+# --- Driver ---
+
+def run(sizes, repeat, stub_templates, workdir=None):
+    results = {'meta': {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'stub_templates': stub_templates
+    }, 'sizes': {}}
+    for rows in sizes:
+        # Each size gets a fresh process and data directory, so module-level app state starts clean
+        size_dir = os.path.join(workdir, str(rows)) if workdir else tempfile.mkdtemp(prefix=f'landsphere-bench-{rows}-')
+        os.makedirs(os.path.join(size_dir, 'data'), exist_ok=True)
+        out = os.path.join(size_dir, 'result.json')
+        cmd = [sys.executable, os.path.abspath(__file__), '--size-worker', str(rows), '--repeat', str(repeat), '--output', out]
+        if stub_templates:
+            cmd.append('--stub-templates')
+        print(f"Benchmarking {rows} rows in {size_dir}")
+        subprocess.run(cmd, cwd=size_dir, check=True)
+        with open(out) as f:
+            results['sizes'][str(rows)] = json.load(f)
+    return results
+
+def compare(results, baseline):
+    """(size, group, name, baseline p50, current p50, ratio) for every benchmark in both runs"""
+    rows = []
+    for size, groups in results['sizes'].items():
+        for group, benches in groups.items():
+            for name, current in benches.items():
+                before = baseline.get('sizes', {}).get(size, {}).get(group, {}).get(name)
+                if not isinstance(current, dict) or not isinstance(before, dict) or not before.get('p50_ms'):
+                    continue
+                rows.append((size, group, name, before['p50_ms'], current['p50_ms'], current['p50_ms'] / before['p50_ms']))
+    return rows
+
+def report(comparison, threshold=REGRESSION_THRESHOLD):
+    regressions = 0
+    for size, group, name, before, current, ratio in comparison:
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{size:>9} {group:>8} {name:<28} {before:>12.3f} -> {current:>12.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+def write_json(data, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the engines and Flask routes at several dataset sizes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('--stub-templates', action='store_true', help="skip Jinja rendering in the route benchmarks")
+    parser.add_argument('--workdir', help="keep generated datasets here instead of temporary directories")
+    parser.add_argument('--size-worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.size_worker:
+        write_json(bench_size(args.size_worker, args.repeat, args.stub_templates), args.output)
+        sys.exit(0)
+
+    results = run(args.sizes, args.repeat, args.stub_templates, args.workdir)
+    write_json(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        write_json(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = report(compare(results, json.load(f)), args.threshold)
+        print(f"{regressions} regression(s) over x{args.threshold} against {args.baseline}")
+        sys.exit(1 if regressions else 0)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
@@ -0,0 +1,225 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import shutil
+from instrumentation import instrument
+
+# Fixed-width numeric columns of the property table
+NUMERIC_COLUMNS = {
+    'Property_ID': 'int64',
+    'Area_SqFt': 'int32',
+    'Price_Per_SqFt': 'int64',
+    'Current_Price': 'int64',
+    'Year_Built': 'int16',
+    'Growth_Rate': 'float64',
+    'Risk_Score': 'int8'
+}
+# Low-cardinality string columns, stored as int16 codes into a dictionary
+DICTIONARY_COLUMNS = ['Region', 'State', 'City', 'Property_Type']
+# Bumped whenever the files in a .cols directory change; older copies are ignored
+FORMAT_VERSION = 2
+COLUMN_ORDER = ['Property_ID', 'Region', 'State', 'City', 'Property_Type', 'Area_SqFt',
+                'Price_Per_SqFt', 'Current_Price', 'Year_Built', 'Growth_Rate', 'Risk_Score']
+
+# Rows read at a time while the derived orderings are built (see derived_orders)
+ORDER_CHUNK = 1 << 20
+
+def columnar_path(csv_path):
+    """data/X.csv -> data/X.cols"""
+    return os.path.splitext(csv_path)[0] + '.cols'
+
+def derived_orders(prices, city_codes, type_codes, n_cities, n_types, create=None, chunk=ORDER_CHUNK):
+    """Row orderings the engines query: by price, by city, and by (city, type) then price.
+
+    All sorts are stable, so ties keep dataset row order. Offsets delimit the
+    groups: group g is order[offsets[g]:offsets[g + 1]].
+
+    The inputs may be memory maps larger than memory: rows are read chunk rows
+    at a time and each ordering is filled group by group (see _grouped_order),
+    so besides the outputs only a chunk and the largest group are in memory.
+    create(name, rows) allocates an output ordering (np.empty by default; a
+    memory-mapped file when writing a columnar copy).
+    """
+    create = create or (lambda name, rows: np.empty(rows, dtype=np.int64))
+    n = len(prices)
+    # Price buckets of about chunk rows each, split at quantiles of a sample; equal prices share a bucket
+    sample = np.asarray(prices[::max(1, n // chunk)])
+    bounds = np.unique(np.quantile(sample, np.linspace(0, 1, n // chunk + 1)[1:-1])) if len(sample) else []
+
+    orders = {}
+    orders['price_order'], _ = _grouped_order(
+        create('price_order', n), lambda rows: np.searchsorted(bounds, prices[rows], side='right'),
+        len(bounds) + 1, n, chunk, prices)
+    orders['city_order'], orders['city_offsets'] = _grouped_order(
+        create('city_order', n), lambda rows: city_codes[rows], n_cities, n, chunk)
+    orders['city_type_order'], orders['city_type_offsets'] = _grouped_order(
+        create('city_type_order', n), lambda rows: city_codes[rows].astype(np.int64) * n_types + type_codes[rows],
+        n_cities * n_types, n, chunk, prices)
+    return orders
+
+def _grouped_order(out, group_of, n_groups, n, chunk, sort_by=None):
+    # A stable counting sort of rows 0..n-1 by group_of(rows) into out, in two passes over chunks
+    # (count, then place), then each group stable-sorted by sort_by. Returns out and the group offsets.
+    counts = np.zeros(n_groups, dtype=np.int64)
+    for start in range(0, n, chunk):
+        counts += np.bincount(group_of(slice(start, min(start + chunk, n))), minlength=n_groups)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    cursor = offsets[:-1].copy()
+    for start in range(0, n, chunk):
+        groups = np.asarray(group_of(slice(start, min(start + chunk, n))))
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+        chunk_counts = np.bincount(groups, minlength=n_groups)
+        first = np.concatenate([[0], np.cumsum(chunk_counts)[:-1]])
+        out[cursor[sorted_groups] + np.arange(len(groups)) - first[sorted_groups]] = order + start
+        cursor += chunk_counts
+    if sort_by is not None:
+        for group in np.flatnonzero(counts > 1):
+            rows = np.asarray(out[offsets[group]:offsets[group + 1]])
+            out[offsets[group]:offsets[group + 1]] = rows[np.argsort(sort_by[rows], kind='stable')]
+    return out, offsets
+
+@instrument('io.write_columnar')
+def write_columnar(df, path):
+    """Write the property table as one .npy file per column plus a schema.json.
+
+    Dictionary columns are written as <name>.codes.npy, and the orderings from
+    derived_orders() as _<name>.npy so loading never sorts.
+    """
+    # Dictionaries in order of first appearance, as pd.factorize numbers them
+    dictionaries = {col: [str(c) for c in pd.unique(df[col])] for col in DICTIONARY_COLUMNS}
+    with ColumnarWriter(path, len(df), dictionaries) as writer:
+        writer.write(df)
+
+class ColumnarWriter:
+    """Fill a .cols directory chunk by chunk, for tables that do not fit in memory.
+
+    Column files are preallocated memory maps of `rows` entries and chunks are
+    written at increasing offsets; dictionaries are fixed up front. On a clean
+    exit the derived orderings and schema.json are written and the finished
+    directory is swapped in; on an error the partial directory is removed.
+    """
+
+    def __init__(self, path, rows, dictionaries):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.rows = rows
+        self.dictionaries = dictionaries
+        self.offset = 0
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.arrays = {}
+        for col, dtype in NUMERIC_COLUMNS.items():
+            self.arrays[col] = self._create(col + '.npy', dtype)
+        for col in DICTIONARY_COLUMNS:
+            self.arrays[col] = self._create(col + '.codes.npy', 'int16')
+
+    def _create(self, name, dtype):
+        return np.lib.format.open_memmap(os.path.join(self.tmp_path, name), mode='w+', dtype=dtype, shape=(self.rows,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.arrays = {}
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+        return False
+
+    def write(self, df):
+        """Append the rows of df (property table columns) after those already written"""
+        rows = slice(self.offset, self.offset + len(df))
+        if rows.stop > self.rows:
+            raise ValueError(f"{rows.stop} rows written to a table of {self.rows}")
+        for col, dtype in NUMERIC_COLUMNS.items():
+            self.arrays[col][rows] = df[col].to_numpy(dtype=dtype)
+        for col in DICTIONARY_COLUMNS:
+            codes = pd.Categorical(df[col], categories=self.dictionaries[col]).codes
+            if (codes < 0).any():
+                raise ValueError(f"{col} value missing from its dictionary")
+            self.arrays[col][rows] = codes
+        self.offset = rows.stop
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"{self.offset} of {self.rows} rows written")
+        for arr in self.arrays.values():
+            arr.flush()
+
+        # Derived orderings, so engines never sort at load time; the orders go straight to their files
+        orders = derived_orders(self.arrays['Current_Price'], self.arrays['City'], self.arrays['Property_Type'],
+                                len(self.dictionaries['City']), len(self.dictionaries['Property_Type']),
+                                create=lambda name, rows: self._create('_' + name + '.npy', 'int64'))
+        for name, arr in orders.items():
+            if isinstance(arr, np.memmap):
+                arr.flush()
+            else:
+                np.save(os.path.join(self.tmp_path, '_' + name + '.npy'), arr)
+        self.arrays = {}
+
+        schema = {'version': FORMAT_VERSION, 'rows': self.rows, 'numeric': dict(NUMERIC_COLUMNS),
+                  'dictionaries': self.dictionaries, 'orders': list(orders)}
+        with open(os.path.join(self.tmp_path, 'schema.json'), 'w') as f:
+            json.dump(schema, f)
+
+        # Swap the finished directory in; open memory maps keep the old inodes alive
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.rename(self.tmp_path, self.path)
+
+class ColumnarTable:
+    """Read-only, memory-mapped view of a directory written by write_columnar."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'schema.json')) as f:
+            schema = json.load(f)
+        self.rows = schema['rows']
+        self.dictionaries = schema['dictionaries']
+        self.columns = {}
+        for col in schema['numeric']:
+            self.columns[col] = self._map(col + '.npy')
+        for col in self.dictionaries:
+            self.columns[col] = self._map(col + '.codes.npy')
+        self.orders = {name: self._map('_' + name + '.npy') for name in schema['orders']}
+
+    def _map(self, name):
+        return np.load(os.path.join(self.path, name), mmap_mode='r')
+
+    def to_frame(self):
+        """DataFrame over the mapped columns; dictionary columns become categoricals."""
+        data = {}
+        for col in COLUMN_ORDER:
+            if col in self.dictionaries:
+                data[col] = pd.Categorical.from_codes(self.columns[col], self.dictionaries[col])
+            else:
+                data[col] = self.columns[col]
+        return pd.DataFrame(data, copy=False)
+
+def is_fresh(csv_path):
+    """True if the columnar copy exists and is not older than the CSV."""
+    path = columnar_path(csv_path)
+    schema = os.path.join(path, 'schema.json')
+    if not os.path.exists(schema):
+        return False
+    with open(schema) as f:
+        if json.load(f).get('version') != FORMAT_VERSION:
+            return False
+    return not os.path.exists(csv_path) or os.path.getmtime(schema) >= os.path.getmtime(csv_path)
+
+@instrument('io.open_table')
+def open_table(csv_path):
+    """Memory-map the columnar copy of csv_path, or None if missing or stale."""
+    if is_fresh(csv_path):
+        return ColumnarTable(columnar_path(csv_path))
+    return None
+
+@instrument('io.load_properties')
+def load_properties(csv_path):
+    """Property table as a DataFrame, memory-mapped when a fresh columnar copy exists."""
+    table = open_table(csv_path)
+    if table is not None:
+        return table.to_frame()
+    return pd.read_csv(csv_path)
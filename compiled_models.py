@@ -0,0 +1,173 @@
+import numpy as np
+
+# Batches up to this many rows walk the flat arrays; bigger ones amortise a call per tree (see CompiledForest.predict)
+TRAVERSAL_ROWS = 64
+
+def _as_rows(X, dtype):
+    X = np.asarray(X, dtype=dtype)
+    if X.ndim == 1:
+        X = X[None, :]
+    if not np.isfinite(X).all():
+        # As sklearn's input validation: none of the models was trained with missing values
+        raise ValueError("Input X contains NaN or infinity.")
+    return X
+
+class CompiledForest:
+    """A fitted RandomForestRegressor as flat node arrays, predicting bit-identically to it.
+
+    All trees' nodes are concatenated. Node i tests feature[i] and continues
+    at children[2 * i] if x <= threshold[i], else at children[2 * i + 1]; a
+    leaf is its own child on both sides, so every tree can be walked
+    max_depth steps at once without checking which have finished. As in
+    sklearn, inputs are compared as float32, the trees' leaf values are added
+    up in tree order (np.cumsum sums sequentially) and divided by the number
+    of trees.
+
+    predict_one walks all trees together for one row: no DataFrame, input
+    validation or joblib dispatch. Small batches walk rows x trees together;
+    bigger ones call each tree's own evaluator, where the per-call cost is
+    spread over the rows and the compiled loop beats NumPy gathers.
+    """
+
+    def __init__(self, forest):
+        self.estimators = forest.estimators_
+        trees = [estimator.tree_ for estimator in self.estimators]
+        counts = np.array([tree.node_count for tree in trees])
+        self.roots = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+        own = [np.arange(tree.node_count) + root for tree, root in zip(trees, self.roots)]
+        left = np.concatenate([np.where(tree.children_left < 0, ids, tree.children_left + root)
+                               for tree, root, ids in zip(trees, self.roots, own)])
+        right = np.concatenate([np.where(tree.children_right < 0, ids, tree.children_right + root)
+                                for tree, root, ids in zip(trees, self.roots, own)])
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2], self.children[1::2] = left, right
+        self.feature = np.concatenate([np.maximum(tree.feature, 0) for tree in trees]).astype(np.intp)
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        self.value = np.concatenate([tree.value[:, 0, 0] for tree in trees])
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.n_features = forest.n_features_in_
+
+    def _walk(self, x, nodes, offsets):
+        # x is flat; a node's feature is read at offsets + feature
+        children, feature, threshold = self.children, self.feature, self.threshold
+        for _ in range(self.max_depth):
+            nodes = children[2 * nodes + (x[offsets + feature[nodes]] > threshold[nodes])]
+        return nodes
+
+    def predict_one(self, x):
+        x = _as_rows(x, np.float32)[0].astype(np.float64)
+        nodes = self._walk(x, self.roots, 0)
+        return np.cumsum(self.value[nodes])[-1] / len(self.roots)
+
+    def predict(self, X):
+        X = np.ascontiguousarray(_as_rows(X, np.float32))
+        if not len(X):
+            return np.zeros(0)
+        if len(X) > TRAVERSAL_ROWS:
+            y = np.zeros(len(X))
+            for estimator in self.estimators:
+                y += estimator.tree_.predict(X).reshape(len(X), -1)[:, 0]
+            return y / len(self.estimators)
+        n, n_trees = len(X), len(self.roots)
+        nodes = np.tile(self.roots, n)
+        offsets = np.repeat(np.arange(n) * self.n_features, n_trees)
+        nodes = self._walk(X.astype(np.float64).ravel(), nodes, offsets)
+        return np.cumsum(self.value[nodes].reshape(n, n_trees), axis=1)[:, -1] / n_trees
+
+class CompiledLinear:
+    """A fitted LinearRegression as its coefficients: X @ coef + intercept, computed as sklearn does"""
+
+    def __init__(self, model):
+        self.coef = np.asarray(model.coef_, dtype=np.float64)
+        self.intercept = model.intercept_
+
+    def predict(self, X):
+        # BLAS sums X @ coef in an order that depends on X's layout: keep the caller's, as sklearn does
+        return _as_rows(X, np.float64) @ self.coef + self.intercept
+
+    def predict_one(self, x):
+        # A row is laid out as sklearn lays out a one-row frame
+        return self.predict(np.ascontiguousarray(_as_rows(x, np.float64)))[0]
+
+class CompiledPolynomial:
+    """PolynomialFeatures then LinearRegression, with the features built column by column.
+
+    The plan repeats sklearn's dense transform: each term of degree d is a
+    term of degree d - 1 times one input feature, multiplied in the same
+    order, so the features (and so the predictions) are bit-identical.
+    """
+
+    def __init__(self, poly_features, model):
+        self.n_features = poly_features.n_features_in_
+        self.include_bias = poly_features.include_bias
+        # The memory layout decides how BLAS sums X @ coef, so it follows the transformer's too
+        self.order = poly_features.order
+        self.plan = self._plan(poly_features._max_degree, poly_features.interaction_only)
+        self.keep = self._columns(poly_features)
+        self.linear = CompiledLinear(model)
+
+    def _plan(self, max_degree, interaction_only):
+        # (column, source column, feature): column = source column * X[:, feature], in sklearn's order
+        current = 1 if self.include_bias else 0
+        index = list(range(current, current + self.n_features))
+        current += self.n_features
+        index.append(current)
+        plan = []
+        for _ in range(2, max_degree + 1):
+            new_index = []
+            end = index[-1]
+            for feature in range(self.n_features):
+                start = index[feature]
+                new_index.append(current)
+                if interaction_only:
+                    start += index[feature + 1] - index[feature]
+                if current + end - start <= current:
+                    break
+                plan.extend((current + offset, start + offset, feature) for offset in range(end - start))
+                current += end - start
+            new_index.append(current)
+            index = new_index
+        self.width = current
+        return plan
+
+    def _columns(self, poly_features):
+        # Powers of the planned columns, to check the plan against the fitted transformer
+        powers = np.zeros((self.width, self.n_features), dtype=int)
+        first = 1 if self.include_bias else 0
+        powers[first:first + self.n_features] = np.eye(self.n_features, dtype=int)
+        for column, source, feature in self.plan:
+            powers[column] = powers[source]
+            powers[column, feature] += 1
+        lookup = {tuple(row): i for i, row in enumerate(powers)}
+        try:
+            return np.array([lookup[tuple(row)] for row in poly_features.powers_])
+        except KeyError:
+            raise ValueError("polynomial feature layout does not match the transformer")
+
+    def transform(self, X):
+        X = _as_rows(X, np.float64)
+        XP = np.empty((len(X), self.width))
+        first = 1 if self.include_bias else 0
+        if self.include_bias:
+            XP[:, 0] = 1
+        XP[:, first:first + self.n_features] = X
+        for column, source, feature in self.plan:
+            np.multiply(XP[:, source], X[:, feature], out=XP[:, column])
+        return np.asarray(XP[:, self.keep], order=self.order)
+
+    def predict(self, X):
+        return self.linear.predict(self.transform(X))
+
+    def predict_one(self, x):
+        return self.predict(x)[0]
+
+def compile_models(models, poly_features):
+    """Compiled counterparts of MLEngine's trained models ('lr', 'poly', 'rf'), by the same names"""
+    compiled = {}
+    if 'lr' in models:
+        compiled['lr'] = CompiledLinear(models['lr'])
+    if 'poly' in models and poly_features is not None:
+        compiled['poly'] = CompiledPolynomial(poly_features, models['poly'])
+    if 'rf' in models:
+        compiled['rf'] = CompiledForest(models['rf'])
+    return compiled
@@ -1,122 +1,238 @@
 import pandas as pd
-import random
+import numpy as np
+import argparse
 import os
+from columnar import ColumnarWriter, columnar_path
 
-def generate_dataset():
-    state_city_map = {
-        'Uttar Pradesh': ['Lucknow', 'Kanpur', 'Varanasi', 'Agra', 'Prayagraj', 'Ghaziabad', 'Noida', 'Meerut', 'Gorakhpur', 'Jhansi', 'Bareilly'],
-        'Haryana': ['Faridabad', 'Gurugram', 'Panipat', 'Ambala', 'Karnal', 'Hisar', 'Rohtak', 'Sonipat', 'Yamunanagar', 'Panchkula', 'Kurukshetra', 'Rewari', 'Palwal', 'Bhiwani', 'Jind', 'Kaithal', 'Sirsa', 'Bahadurgarh', 'Mahendragarh', 'Narnaul', 'Tohana', 'Dabwali', 'Pehowa', 'Assandh', 'Gohana', 'Fatehabad', 'Hansi', 'Charkhi Dadri', 'Narwana', 'Shahbad', 'Ratia', 'Sohna', 'Pundri', 'Kosli'],
-        'Punjab': ['Amritsar', 'Ludhiana', 'Jalandhar', 'Patiala', 'Bathinda', 'Mohali', 'Pathankot', 'Hoshiarpur', 'Moga', 'Firozpur', 'Barnala', 'Sangrur', 'Kapurthala', 'Faridkot', 'Malerkotla', 'Phagwara', 'Abohar', 'Tarn Taran'],
-        'Rajasthan': ['Jaipur', 'Jodhpur', 'Udaipur', 'Kota', 'Bikaner', 'Ajmer', 'Alwar', 'Bharatpur', 'Sikar', 'Pali', 'Barmer', 'Chittorgarh', 'Bhilwara', 'Nagaur', 'Bundi', 'Hanumangarh', 'Dausa', 'Tonk', 'Jaisalmer', 'Sawai Madhopur', 'Sri Ganganagar', 'Jhunjhunu'],
-        'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Bhavnagar', 'Jamnagar', 'Junagadh', 'Gandhinagar', 'Bharuch', 'Anand', 'Morbi', 'Vapi', 'Navsari', 'Porbandar', 'Mehsana', 'Palanpur', 'Godhra'],
-        'Maharashtra': ['Mumbai', 'Pune', 'Nagpur', 'Nashik', 'Thane', 'Aurangabad', 'Solapur', 'Kolhapur', 'Amravati', 'Nanded', 'Jalgaon', 'Akola', 'Latur', 'Dhule', 'Ahmednagar', 'Chandrapur', 'Parbhani', 'Satara', 'Beed', 'Ratnagiri', 'Wardha', 'Yavatmal', 'Sangli', 'Bhiwandi', 'Panvel'],
-        'Madhya Pradesh': ['Bhopal', 'Indore', 'Gwalior', 'Jabalpur', 'Ujjain', 'Sagar', 'Rewa', 'Satna', 'Dewas', 'Ratlam', 'Morena', 'Khandwa', 'Burhanpur', 'Shivpuri', 'Vidisha', 'Chhindwara', 'Mandsaur', 'Sehore', 'Neemuch'],
-        'Bihar': ['Patna', 'Gaya', 'Bhagalpur', 'Muzaffarpur', 'Darbhanga', 'Purnia', 'Ara', 'Begusarai', 'Katihar', 'Munger', 'Chapra', 'Sasaram', 'Siwan', 'Motihari'],
-        'West Bengal': ['Kolkata', 'Howrah', 'Durgapur', 'Asansol', 'Siliguri', 'Darjeeling', 'Malda', 'Kharagpur', 'Haldia', 'Bardhaman', 'Jalpaiguri', 'Raiganj', 'Cooch Behar', 'Chandannagar', 'Midnapore', 'Bankura'],
-        'Odisha': ['Bhubaneswar', 'Cuttack', 'Rourkela', 'Puri', 'Sambalpur', 'Berhampur', 'Balasore', 'Bhadrak', 'Jharsuguda', 'Koraput', 'Baripada', 'Jeypore'],
-        'Jharkhand': ['Ranchi', 'Jamshedpur', 'Dhanbad', 'Bokaro', 'Deoghar', 'Hazaribagh', 'Giridih', 'Ramgarh', 'Chaibasa', 'Dumka'],
-        'Chhattisgarh': ['Raipur', 'Bilaspur', 'Durg', 'Korba', 'Rajnandgaon', 'Jagdalpur', 'Raigarh', 'Ambikapur', 'Dhamtari'],
-        'Himachal Pradesh': ['Shimla', 'Manali', 'Dharamshala', 'Solan', 'Mandi', 'Kullu', 'Chamba', 'Una'],
-        'Uttarakhand': ['Dehradun', 'Haridwar', 'Rishikesh', 'Haldwani', 'Roorkee', 'Nainital', 'Almora', 'Pithoragarh', 'Rudrapur'],
-        'Goa': ['Panaji', 'Margao', 'Vasco da Gama', 'Mapusa', 'Ponda', 'Bicholim'],
-        'Karnataka': ['Bengaluru', 'Mysuru', 'Mangaluru', 'Hubballi', 'Belagavi', 'Davanagere', 'Ballari', 'Tumakuru', 'Shivamogga', 'Udupi', 'Hassan', 'Bidar', 'Raichur', 'Kolar', 'Chitradurga', 'Mandya', 'Gadag', 'Haveri', 'Karwar', 'Bagalkot'],
-        'Kerala': ['Thiruvananthapuram', 'Kochi', 'Kozhikode', 'Thrissur', 'Kollam', 'Alappuzha', 'Kannur', 'Palakkad', 'Malappuram', 'Kottayam', 'Pathanamthitta', 'Idukki', 'Kasaragod'],
-        'Tamil Nadu': ['Chennai', 'Coimbatore', 'Madurai', 'Salem', 'Tiruchirappalli', 'Tirunelveli', 'Erode', 'Vellore', 'Thanjavur', 'Dindigul', 'Kanchipuram', 'Cuddalore', 'Thoothukudi', 'Karur', 'Namakkal', 'Nagercoil', 'Sivakasi', 'Pudukkottai', 'Tiruppur', 'Villupuram', 'Hosur'],
-        'Andhra Pradesh': ['Visakhapatnam', 'Vijayawada', 'Guntur', 'Nellore', 'Tirupati', 'Kurnool', 'Rajahmundry', 'Kadapa', 'Anantapur', 'Eluru', 'Ongole', 'Srikakulam', 'Vizianagaram', 'Machilipatnam', 'Tenali'],
-        'Telangana': ['Hyderabad', 'Warangal', 'Nizamabad', 'Karimnagar', 'Khammam', 'Ramagundam', 'Mahbubnagar', 'Nalgonda', 'Adilabad', 'Suryapet', 'Siddipet'],
-        'Assam': ['Guwahati', 'Dibrugarh', 'Silchar', 'Jorhat', 'Tinsukia', 'Tezpur', 'Nagaon', 'Karimganj', 'Sivasagar', 'Bongaigaon'],
-        'Arunachal Pradesh': ['Itanagar', 'Tawang', 'Pasighat', 'Ziro', 'Bomdila', 'Naharlagun'],
-        'Manipur': ['Imphal', 'Thoubal', 'Bishnupur', 'Churachandpur', 'Ukhrul', 'Kakching'],
-        'Meghalaya': ['Shillong', 'Tura', 'Nongpoh', 'Jowai', 'Baghmara', 'Williamnagar'],
-        'Mizoram': ['Aizawl', 'Lunglei', 'Champhai', 'Serchhip', 'Kolasib'],
-        'Nagaland': ['Kohima', 'Dimapur', 'Mokokchung', 'Wokha', 'Tuensang'],
-        'Tripura': ['Agartala', 'Udaipur', 'Dharmanagar', 'Kailashahar', 'Belonia'],
-        'Sikkim': ['Gangtok', 'Namchi', 'Gyalshing', 'Mangan', 'Rangpo'],
-        'Delhi': ['New Delhi', 'Dwarka', 'Rohini', 'Saket', 'Karol Bagh', 'Lajpat Nagar', 'Pitampura', 'Janakpuri', 'Shahdara', 'Narela', 'Vasant Kunj', 'Najafgarh']
-    }
-    
-    cities = []
-    for state_cities in state_city_map.values():
-        cities.extend(state_cities)
-        
-    property_types = ['Residential', 'Commercial', 'Agricultural', 'Industrial']
-    
-    data = []
-    # Tier-based pricing approximations
-    def get_city_base_price(city, state):
-        tier_1 = ['Mumbai', 'Delhi', 'New Delhi', 'Bengaluru', 'Chennai', 'Hyderabad', 'Kolkata', 'Ahmedabad', 'Pune', 'Gurugram', 'Noida']
-        tier_2 = ['Lucknow', 'Kanpur', 'Jaipur', 'Indore', 'Thane', 'Nagpur', 'Visakhapatnam', 'Bhopal', 'Patna', 'Vadodara', 'Ludhiana', 'Nashik']
-        
-        if city in tier_1: return random.randint(8000, 25000)
-        if city in tier_2: return random.randint(4000, 8000)
-        return random.randint(1500, 4000)
-
-    region_map = {
-        'North': ['Uttar Pradesh', 'Haryana', 'Punjab', 'Himachal Pradesh', 'Uttarakhand', 'Delhi'],
-        'West': ['Rajasthan', 'Gujarat', 'Maharashtra', 'Goa', 'Madhya Pradesh'],
-        'East': ['Bihar', 'West Bengal', 'Odisha', 'Jharkhand', 'Chhattisgarh'],
-        'South': ['Karnataka', 'Kerala', 'Tamil Nadu', 'Andhra Pradesh', 'Telangana'],
-        'North-East': ['Assam', 'Arunachal Pradesh', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Tripura', 'Sikkim']
-    }
-    
-    # Invert for lookup
-    state_to_region = {}
-    for region, states in region_map.items():
-        for state in states:
-            state_to_region[state] = region
-
-    for i in range(1, 5001):
-        state = random.choice(list(state_city_map.keys()))
-        city = random.choice(state_city_map[state])
-        region = state_to_region.get(state, 'Other')
-        prop_type = random.choice(property_types)
-        area = random.randint(500, 10000)
-        
-        price_per_sqft = get_city_base_price(city, state) * random.uniform(0.8, 1.5)
-        if prop_type == 'Commercial': price_per_sqft *= 1.5
-        elif prop_type == 'Agricultural': price_per_sqft *= 0.3
-        
-        current_price = int(price_per_sqft * area)
-        growth_rate = random.uniform(0.05, 0.15)
-        year = random.randint(2018, 2023)
-        
-        data.append({
-            'Property_ID': i,
-            'Region': region,
-            'State': state,
-            'City': city,
-            'Property_Type': prop_type,
-            'Area_SqFt': area,
-            'Price_Per_SqFt': int(price_per_sqft),
-            'Current_Price': current_price,
-            'Year_Built': year,
-            'Growth_Rate': round(growth_rate, 4),
-            'Risk_Score': random.randint(1, 10)
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('data/LandSphere_India_Dataset_5000_Rows.csv', index=False)
-    print("Dataset generated successfully.")
-
-def initialize_empty_csvs():
-    # Keep existing Users.csv if not exists
-    if not os.path.exists('data/Users.csv'):
-        pd.DataFrame(columns=['UserID', 'Username', 'Password', 'Email', 'Balance']).to_csv('data/Users.csv', index=False)
-    
-    # Initialize Transactions
-    pd.DataFrame(columns=['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type']).to_csv('data/Transactions.csv', index=False)
-    
-    # Seed Listings
-    df = pd.read_csv('data/LandSphere_India_Dataset_5000_Rows.csv')
-    listings = df[['Property_ID', 'Current_Price']].copy()
-    listings.columns = ['PropertyID', 'Price']
-    listings['OwnerID'] = 0
-    listings['Status'] = 'Available'
-    listings.to_csv('data/Listings.csv', index=False)
-    print("CSVs initialized.")
+DATASET_PATH = 'data/LandSphere_India_Dataset_5000_Rows.csv'
+
+STATE_CITY_MAP = {
+    'Uttar Pradesh': ['Lucknow', 'Kanpur', 'Varanasi', 'Agra', 'Prayagraj', 'Ghaziabad', 'Noida', 'Meerut', 'Gorakhpur', 'Jhansi', 'Bareilly'],
+    'Haryana': ['Faridabad', 'Gurugram', 'Panipat', 'Ambala', 'Karnal', 'Hisar', 'Rohtak', 'Sonipat', 'Yamunanagar', 'Panchkula', 'Kurukshetra', 'Rewari', 'Palwal', 'Bhiwani', 'Jind', 'Kaithal', 'Sirsa', 'Bahadurgarh', 'Mahendragarh', 'Narnaul', 'Tohana', 'Dabwali', 'Pehowa', 'Assandh', 'Gohana', 'Fatehabad', 'Hansi', 'Charkhi Dadri', 'Narwana', 'Shahbad', 'Ratia', 'Sohna', 'Pundri', 'Kosli'],
+    'Punjab': ['Amritsar', 'Ludhiana', 'Jalandhar', 'Patiala', 'Bathinda', 'Mohali', 'Pathankot', 'Hoshiarpur', 'Moga', 'Firozpur', 'Barnala', 'Sangrur', 'Kapurthala', 'Faridkot', 'Malerkotla', 'Phagwara', 'Abohar', 'Tarn Taran'],
+    'Rajasthan': ['Jaipur', 'Jodhpur', 'Udaipur', 'Kota', 'Bikaner', 'Ajmer', 'Alwar', 'Bharatpur', 'Sikar', 'Pali', 'Barmer', 'Chittorgarh', 'Bhilwara', 'Nagaur', 'Bundi', 'Hanumangarh', 'Dausa', 'Tonk', 'Jaisalmer', 'Sawai Madhopur', 'Sri Ganganagar', 'Jhunjhunu'],
+    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Bhavnagar', 'Jamnagar', 'Junagadh', 'Gandhinagar', 'Bharuch', 'Anand', 'Morbi', 'Vapi', 'Navsari', 'Porbandar', 'Mehsana', 'Palanpur', 'Godhra'],
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur', 'Nashik', 'Thane', 'Aurangabad', 'Solapur', 'Kolhapur', 'Amravati', 'Nanded', 'Jalgaon', 'Akola', 'Latur', 'Dhule', 'Ahmednagar', 'Chandrapur', 'Parbhani', 'Satara', 'Beed', 'Ratnagiri', 'Wardha', 'Yavatmal', 'Sangli', 'Bhiwandi', 'Panvel'],
+    'Madhya Pradesh': ['Bhopal', 'Indore', 'Gwalior', 'Jabalpur', 'Ujjain', 'Sagar', 'Rewa', 'Satna', 'Dewas', 'Ratlam', 'Morena', 'Khandwa', 'Burhanpur', 'Shivpuri', 'Vidisha', 'Chhindwara', 'Mandsaur', 'Sehore', 'Neemuch'],
+    'Bihar': ['Patna', 'Gaya', 'Bhagalpur', 'Muzaffarpur', 'Darbhanga', 'Purnia', 'Ara', 'Begusarai', 'Katihar', 'Munger', 'Chapra', 'Sasaram', 'Siwan', 'Motihari'],
+    'West Bengal': ['Kolkata', 'Howrah', 'Durgapur', 'Asansol', 'Siliguri', 'Darjeeling', 'Malda', 'Kharagpur', 'Haldia', 'Bardhaman', 'Jalpaiguri', 'Raiganj', 'Cooch Behar', 'Chandannagar', 'Midnapore', 'Bankura'],
+    'Odisha': ['Bhubaneswar', 'Cuttack', 'Rourkela', 'Puri', 'Sambalpur', 'Berhampur', 'Balasore', 'Bhadrak', 'Jharsuguda', 'Koraput', 'Baripada', 'Jeypore'],
+    'Jharkhand': ['Ranchi', 'Jamshedpur', 'Dhanbad', 'Bokaro', 'Deoghar', 'Hazaribagh', 'Giridih', 'Ramgarh', 'Chaibasa', 'Dumka'],
+    'Chhattisgarh': ['Raipur', 'Bilaspur', 'Durg', 'Korba', 'Rajnandgaon', 'Jagdalpur', 'Raigarh', 'Ambikapur', 'Dhamtari'],
+    'Himachal Pradesh': ['Shimla', 'Manali', 'Dharamshala', 'Solan', 'Mandi', 'Kullu', 'Chamba', 'Una'],
+    'Uttarakhand': ['Dehradun', 'Haridwar', 'Rishikesh', 'Haldwani', 'Roorkee', 'Nainital', 'Almora', 'Pithoragarh', 'Rudrapur'],
+    'Goa': ['Panaji', 'Margao', 'Vasco da Gama', 'Mapusa', 'Ponda', 'Bicholim'],
+    'Karnataka': ['Bengaluru', 'Mysuru', 'Mangaluru', 'Hubballi', 'Belagavi', 'Davanagere', 'Ballari', 'Tumakuru', 'Shivamogga', 'Udupi', 'Hassan', 'Bidar', 'Raichur', 'Kolar', 'Chitradurga', 'Mandya', 'Gadag', 'Haveri', 'Karwar', 'Bagalkot'],
+    'Kerala': ['Thiruvananthapuram', 'Kochi', 'Kozhikode', 'Thrissur', 'Kollam', 'Alappuzha', 'Kannur', 'Palakkad', 'Malappuram', 'Kottayam', 'Pathanamthitta', 'Idukki', 'Kasaragod'],
+    'Tamil Nadu': ['Chennai', 'Coimbatore', 'Madurai', 'Salem', 'Tiruchirappalli', 'Tirunelveli', 'Erode', 'Vellore', 'Thanjavur', 'Dindigul', 'Kanchipuram', 'Cuddalore', 'Thoothukudi', 'Karur', 'Namakkal', 'Nagercoil', 'Sivakasi', 'Pudukkottai', 'Tiruppur', 'Villupuram', 'Hosur'],
+    'Andhra Pradesh': ['Visakhapatnam', 'Vijayawada', 'Guntur', 'Nellore', 'Tirupati', 'Kurnool', 'Rajahmundry', 'Kadapa', 'Anantapur', 'Eluru', 'Ongole', 'Srikakulam', 'Vizianagaram', 'Machilipatnam', 'Tenali'],
+    'Telangana': ['Hyderabad', 'Warangal', 'Nizamabad', 'Karimnagar', 'Khammam', 'Ramagundam', 'Mahbubnagar', 'Nalgonda', 'Adilabad', 'Suryapet', 'Siddipet'],
+    'Assam': ['Guwahati', 'Dibrugarh', 'Silchar', 'Jorhat', 'Tinsukia', 'Tezpur', 'Nagaon', 'Karimganj', 'Sivasagar', 'Bongaigaon'],
+    'Arunachal Pradesh': ['Itanagar', 'Tawang', 'Pasighat', 'Ziro', 'Bomdila', 'Naharlagun'],
+    'Manipur': ['Imphal', 'Thoubal', 'Bishnupur', 'Churachandpur', 'Ukhrul', 'Kakching'],
+    'Meghalaya': ['Shillong', 'Tura', 'Nongpoh', 'Jowai', 'Baghmara', 'Williamnagar'],
+    'Mizoram': ['Aizawl', 'Lunglei', 'Champhai', 'Serchhip', 'Kolasib'],
+    'Nagaland': ['Kohima', 'Dimapur', 'Mokokchung', 'Wokha', 'Tuensang'],
+    'Tripura': ['Agartala', 'Udaipur', 'Dharmanagar', 'Kailashahar', 'Belonia'],
+    'Sikkim': ['Gangtok', 'Namchi', 'Gyalshing', 'Mangan', 'Rangpo'],
+    'Delhi': ['New Delhi', 'Dwarka', 'Rohini', 'Saket', 'Karol Bagh', 'Lajpat Nagar', 'Pitampura', 'Janakpuri', 'Shahdara', 'Narela', 'Vasant Kunj', 'Najafgarh']
+}
+
+REGION_MAP = {
+    'North': ['Uttar Pradesh', 'Haryana', 'Punjab', 'Himachal Pradesh', 'Uttarakhand', 'Delhi'],
+    'West': ['Rajasthan', 'Gujarat', 'Maharashtra', 'Goa', 'Madhya Pradesh'],
+    'East': ['Bihar', 'West Bengal', 'Odisha', 'Jharkhand', 'Chhattisgarh'],
+    'South': ['Karnataka', 'Kerala', 'Tamil Nadu', 'Andhra Pradesh', 'Telangana'],
+    'North-East': ['Assam', 'Arunachal Pradesh', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Tripura', 'Sikkim']
+}
+
+# Approximate (latitude, longitude) of every city in STATE_CITY_MAP, written to Cities.csv
+CITY_COORDINATES = {
+    'Uttar Pradesh': {'Lucknow': (26.85, 80.95), 'Kanpur': (26.45, 80.33), 'Varanasi': (25.32, 82.99), 'Agra': (27.18, 78.01), 'Prayagraj': (25.44, 81.85), 'Ghaziabad': (28.67, 77.45), 'Noida': (28.54, 77.39), 'Meerut': (28.98, 77.71), 'Gorakhpur': (26.76, 83.37), 'Jhansi': (25.45, 78.57), 'Bareilly': (28.37, 79.43)},
+    'Haryana': {'Faridabad': (28.41, 77.32), 'Gurugram': (28.46, 77.03), 'Panipat': (29.39, 76.97), 'Ambala': (30.38, 76.78), 'Karnal': (29.69, 76.99), 'Hisar': (29.15, 75.72), 'Rohtak': (28.90, 76.61), 'Sonipat': (28.99, 77.02), 'Yamunanagar': (30.13, 77.29), 'Panchkula': (30.69, 76.86), 'Kurukshetra': (29.97, 76.88), 'Rewari': (28.20, 76.62), 'Palwal': (28.14, 77.33), 'Bhiwani': (28.79, 76.13), 'Jind': (29.32, 76.32), 'Kaithal': (29.80, 76.40), 'Sirsa': (29.53, 75.03), 'Bahadurgarh': (28.69, 76.92), 'Mahendragarh': (28.27, 76.15), 'Narnaul': (28.04, 76.11), 'Tohana': (29.71, 75.90), 'Dabwali': (29.95, 74.74), 'Pehowa': (29.98, 76.58), 'Assandh': (29.52, 76.60), 'Gohana': (29.14, 76.70), 'Fatehabad': (29.52, 75.45), 'Hansi': (29.10, 75.96), 'Charkhi Dadri': (28.59, 76.27), 'Narwana': (29.60, 76.12), 'Shahbad': (30.17, 76.87), 'Ratia': (29.69, 75.58), 'Sohna': (28.25, 77.07), 'Pundri': (29.76, 76.56), 'Kosli': (28.39, 76.52)},
+    'Punjab': {'Amritsar': (31.63, 74.87), 'Ludhiana': (30.90, 75.86), 'Jalandhar': (31.33, 75.58), 'Patiala': (30.34, 76.39), 'Bathinda': (30.21, 74.95), 'Mohali': (30.70, 76.72), 'Pathankot': (32.27, 75.65), 'Hoshiarpur': (31.53, 75.91), 'Moga': (30.82, 75.17), 'Firozpur': (30.93, 74.61), 'Barnala': (30.38, 75.55), 'Sangrur': (30.25, 75.84), 'Kapurthala': (31.38, 75.38), 'Faridkot': (30.67, 74.76), 'Malerkotla': (30.53, 75.88), 'Phagwara': (31.22, 75.77), 'Abohar': (30.14, 74.20), 'Tarn Taran': (31.45, 74.93)},
+    'Rajasthan': {'Jaipur': (26.91, 75.79), 'Jodhpur': (26.24, 73.02), 'Udaipur': (24.59, 73.71), 'Kota': (25.18, 75.83), 'Bikaner': (28.02, 73.31), 'Ajmer': (26.45, 74.64), 'Alwar': (27.55, 76.63), 'Bharatpur': (27.22, 77.49), 'Sikar': (27.61, 75.14), 'Pali': (25.77, 73.32), 'Barmer': (25.75, 71.39), 'Chittorgarh': (24.88, 74.62), 'Bhilwara': (25.35, 74.63), 'Nagaur': (27.20, 73.73), 'Bundi': (25.44, 75.64), 'Hanumangarh': (29.58, 74.33), 'Dausa': (26.89, 76.34), 'Tonk': (26.17, 75.79), 'Jaisalmer': (26.92, 70.91), 'Sawai Madhopur': (26.02, 76.35), 'Sri Ganganagar': (29.90, 73.88), 'Jhunjhunu': (28.13, 75.40)},
+    'Gujarat': {'Ahmedabad': (23.02, 72.57), 'Surat': (21.17, 72.83), 'Vadodara': (22.31, 73.18), 'Rajkot': (22.30, 70.80), 'Bhavnagar': (21.76, 72.15), 'Jamnagar': (22.47, 70.06), 'Junagadh': (21.52, 70.46), 'Gandhinagar': (23.22, 72.65), 'Bharuch': (21.71, 72.98), 'Anand': (22.56, 72.95), 'Morbi': (22.82, 70.84), 'Vapi': (20.37, 72.90), 'Navsari': (20.95, 72.92), 'Porbandar': (21.64, 69.61), 'Mehsana': (23.60, 72.40), 'Palanpur': (24.17, 72.43), 'Godhra': (22.78, 73.61)},
+    'Maharashtra': {'Mumbai': (19.08, 72.88), 'Pune': (18.52, 73.86), 'Nagpur': (21.15, 79.09), 'Nashik': (20.00, 73.79), 'Thane': (19.22, 72.98), 'Aurangabad': (19.88, 75.34), 'Solapur': (17.66, 75.91), 'Kolhapur': (16.70, 74.24), 'Amravati': (20.93, 77.75), 'Nanded': (19.14, 77.32), 'Jalgaon': (21.01, 75.56), 'Akola': (20.70, 77.00), 'Latur': (18.41, 76.56), 'Dhule': (20.90, 74.77), 'Ahmednagar': (19.09, 74.74), 'Chandrapur': (19.96, 79.30), 'Parbhani': (19.26, 76.77), 'Satara': (17.68, 74.02), 'Beed': (18.99, 75.76), 'Ratnagiri': (16.99, 73.31), 'Wardha': (20.75, 78.60), 'Yavatmal': (20.39, 78.12), 'Sangli': (16.85, 74.58), 'Bhiwandi': (19.30, 73.06), 'Panvel': (18.99, 73.12)},
+    'Madhya Pradesh': {'Bhopal': (23.26, 77.41), 'Indore': (22.72, 75.86), 'Gwalior': (26.22, 78.18), 'Jabalpur': (23.18, 79.99), 'Ujjain': (23.18, 75.78), 'Sagar': (23.84, 78.74), 'Rewa': (24.53, 81.30), 'Satna': (24.60, 80.83), 'Dewas': (22.97, 76.05), 'Ratlam': (23.33, 75.04), 'Morena': (26.50, 78.00), 'Khandwa': (21.83, 76.35), 'Burhanpur': (21.31, 76.23), 'Shivpuri': (25.42, 77.66), 'Vidisha': (23.53, 77.81), 'Chhindwara': (22.06, 78.94), 'Mandsaur': (24.07, 75.07), 'Sehore': (23.20, 77.08), 'Neemuch': (24.47, 74.87)},
+    'Bihar': {'Patna': (25.59, 85.14), 'Gaya': (24.80, 85.00), 'Bhagalpur': (25.24, 86.98), 'Muzaffarpur': (26.12, 85.39), 'Darbhanga': (26.15, 85.90), 'Purnia': (25.78, 87.47), 'Ara': (25.56, 84.66), 'Begusarai': (25.42, 86.13), 'Katihar': (25.54, 87.58), 'Munger': (25.37, 86.47), 'Chapra': (25.78, 84.73), 'Sasaram': (24.95, 84.03), 'Siwan': (26.22, 84.36), 'Motihari': (26.65, 84.92)},
+    'West Bengal': {'Kolkata': (22.57, 88.36), 'Howrah': (22.59, 88.31), 'Durgapur': (23.52, 87.31), 'Asansol': (23.68, 86.98), 'Siliguri': (26.73, 88.40), 'Darjeeling': (27.04, 88.26), 'Malda': (25.01, 88.14), 'Kharagpur': (22.35, 87.23), 'Haldia': (22.03, 88.06), 'Bardhaman': (23.23, 87.86), 'Jalpaiguri': (26.52, 88.72), 'Raiganj': (25.62, 88.12), 'Cooch Behar': (26.32, 89.45), 'Chandannagar': (22.87, 88.38), 'Midnapore': (22.42, 87.32), 'Bankura': (23.23, 87.07)},
+    'Odisha': {'Bhubaneswar': (20.30, 85.82), 'Cuttack': (20.46, 85.88), 'Rourkela': (22.26, 84.85), 'Puri': (19.81, 85.83), 'Sambalpur': (21.47, 83.97), 'Berhampur': (19.31, 84.79), 'Balasore': (21.49, 86.93), 'Bhadrak': (21.05, 86.50), 'Jharsuguda': (21.86, 84.01), 'Koraput': (18.81, 82.71), 'Baripada': (21.93, 86.73), 'Jeypore': (18.86, 82.57)},
+    'Jharkhand': {'Ranchi': (23.34, 85.31), 'Jamshedpur': (22.80, 86.20), 'Dhanbad': (23.80, 86.43), 'Bokaro': (23.67, 86.15), 'Deoghar': (24.48, 86.70), 'Hazaribagh': (23.99, 85.36), 'Giridih': (24.19, 86.30), 'Ramgarh': (23.63, 85.51), 'Chaibasa': (22.55, 85.81), 'Dumka': (24.27, 87.25)},
+    'Chhattisgarh': {'Raipur': (21.25, 81.63), 'Bilaspur': (22.08, 82.15), 'Durg': (21.19, 81.28), 'Korba': (22.35, 82.68), 'Rajnandgaon': (21.10, 81.03), 'Jagdalpur': (19.08, 82.02), 'Raigarh': (21.90, 83.40), 'Ambikapur': (23.12, 83.20), 'Dhamtari': (20.71, 81.55)},
+    'Himachal Pradesh': {'Shimla': (31.10, 77.17), 'Manali': (32.24, 77.19), 'Dharamshala': (32.22, 76.32), 'Solan': (30.90, 77.10), 'Mandi': (31.71, 76.93), 'Kullu': (31.96, 77.11), 'Chamba': (32.55, 76.13), 'Una': (31.47, 76.27)},
+    'Uttarakhand': {'Dehradun': (30.32, 78.03), 'Haridwar': (29.95, 78.16), 'Rishikesh': (30.09, 78.27), 'Haldwani': (29.22, 79.51), 'Roorkee': (29.85, 77.89), 'Nainital': (29.39, 79.45), 'Almora': (29.60, 79.66), 'Pithoragarh': (29.58, 80.22), 'Rudrapur': (28.98, 79.40)},
+    'Goa': {'Panaji': (15.50, 73.83), 'Margao': (15.28, 73.96), 'Vasco da Gama': (15.40, 73.81), 'Mapusa': (15.59, 73.81), 'Ponda': (15.40, 74.02), 'Bicholim': (15.60, 73.95)},
+    'Karnataka': {'Bengaluru': (12.97, 77.59), 'Mysuru': (12.30, 76.64), 'Mangaluru': (12.91, 74.86), 'Hubballi': (15.36, 75.12), 'Belagavi': (15.85, 74.50), 'Davanagere': (14.46, 75.92), 'Ballari': (15.14, 76.92), 'Tumakuru': (13.34, 77.10), 'Shivamogga': (13.93, 75.57), 'Udupi': (13.34, 74.75), 'Hassan': (13.01, 76.10), 'Bidar': (17.91, 77.52), 'Raichur': (16.20, 77.36), 'Kolar': (13.14, 78.13), 'Chitradurga': (14.23, 76.40), 'Mandya': (12.52, 76.90), 'Gadag': (15.43, 75.63), 'Haveri': (14.79, 75.40), 'Karwar': (14.81, 74.13), 'Bagalkot': (16.18, 75.70)},
+    'Kerala': {'Thiruvananthapuram': (8.52, 76.94), 'Kochi': (9.93, 76.27), 'Kozhikode': (11.26, 75.78), 'Thrissur': (10.53, 76.21), 'Kollam': (8.89, 76.61), 'Alappuzha': (9.50, 76.34), 'Kannur': (11.87, 75.37), 'Palakkad': (10.79, 76.65), 'Malappuram': (11.07, 76.07), 'Kottayam': (9.59, 76.52), 'Pathanamthitta': (9.26, 76.79), 'Idukki': (9.85, 76.97), 'Kasaragod': (12.50, 74.99)},
+    'Tamil Nadu': {'Chennai': (13.08, 80.27), 'Coimbatore': (11.02, 76.96), 'Madurai': (9.93, 78.12), 'Salem': (11.66, 78.15), 'Tiruchirappalli': (10.79, 78.70), 'Tirunelveli': (8.71, 77.76), 'Erode': (11.34, 77.72), 'Vellore': (12.92, 79.13), 'Thanjavur': (10.79, 79.14), 'Dindigul': (10.36, 77.98), 'Kanchipuram': (12.83, 79.70), 'Cuddalore': (11.75, 79.77), 'Thoothukudi': (8.76, 78.13), 'Karur': (10.96, 78.08), 'Namakkal': (11.22, 78.17), 'Nagercoil': (8.18, 77.41), 'Sivakasi': (9.45, 77.80), 'Pudukkottai': (10.38, 78.82), 'Tiruppur': (11.11, 77.34), 'Villupuram': (11.94, 79.49), 'Hosur': (12.74, 77.83)},
+    'Andhra Pradesh': {'Visakhapatnam': (17.69, 83.22), 'Vijayawada': (16.51, 80.65), 'Guntur': (16.31, 80.44), 'Nellore': (14.44, 79.99), 'Tirupati': (13.63, 79.42), 'Kurnool': (15.83, 78.04), 'Rajahmundry': (17.00, 81.80), 'Kadapa': (14.47, 78.82), 'Anantapur': (14.68, 77.60), 'Eluru': (16.71, 81.10), 'Ongole': (15.50, 80.05), 'Srikakulam': (18.30, 83.90), 'Vizianagaram': (18.11, 83.40), 'Machilipatnam': (16.19, 81.14), 'Tenali': (16.24, 80.64)},
+    'Telangana': {'Hyderabad': (17.39, 78.49), 'Warangal': (17.97, 79.59), 'Nizamabad': (18.67, 78.09), 'Karimnagar': (18.44, 79.13), 'Khammam': (17.25, 80.15), 'Ramagundam': (18.76, 79.48), 'Mahbubnagar': (16.74, 78.00), 'Nalgonda': (17.05, 79.27), 'Adilabad': (19.66, 78.53), 'Suryapet': (17.14, 79.62), 'Siddipet': (18.10, 78.85)},
+    'Assam': {'Guwahati': (26.14, 91.74), 'Dibrugarh': (27.47, 94.91), 'Silchar': (24.83, 92.78), 'Jorhat': (26.75, 94.22), 'Tinsukia': (27.49, 95.36), 'Tezpur': (26.63, 92.80), 'Nagaon': (26.35, 92.68), 'Karimganj': (24.87, 92.36), 'Sivasagar': (26.98, 94.64), 'Bongaigaon': (26.48, 90.56)},
+    'Arunachal Pradesh': {'Itanagar': (27.08, 93.61), 'Tawang': (27.59, 91.86), 'Pasighat': (28.07, 95.33), 'Ziro': (27.54, 93.83), 'Bomdila': (27.26, 92.40), 'Naharlagun': (27.10, 93.70)},
+    'Manipur': {'Imphal': (24.82, 93.94), 'Thoubal': (24.64, 94.00), 'Bishnupur': (24.63, 93.76), 'Churachandpur': (24.33, 93.68), 'Ukhrul': (25.10, 94.36), 'Kakching': (24.50, 93.98)},
+    'Meghalaya': {'Shillong': (25.58, 91.89), 'Tura': (25.51, 90.22), 'Nongpoh': (25.90, 91.88), 'Jowai': (25.45, 92.20), 'Baghmara': (25.20, 90.64), 'Williamnagar': (25.50, 90.61)},
+    'Mizoram': {'Aizawl': (23.73, 92.72), 'Lunglei': (22.88, 92.73), 'Champhai': (23.46, 93.33), 'Serchhip': (23.30, 92.85), 'Kolasib': (24.22, 92.68)},
+    'Nagaland': {'Kohima': (25.67, 94.11), 'Dimapur': (25.91, 93.73), 'Mokokchung': (26.33, 94.53), 'Wokha': (26.10, 94.26), 'Tuensang': (26.27, 94.83)},
+    'Tripura': {'Agartala': (23.83, 91.28), 'Udaipur': (23.53, 91.48), 'Dharmanagar': (24.37, 92.17), 'Kailashahar': (24.33, 92.00), 'Belonia': (23.25, 91.45)},
+    'Sikkim': {'Gangtok': (27.33, 88.61), 'Namchi': (27.17, 88.36), 'Gyalshing': (27.29, 88.26), 'Mangan': (27.51, 88.53), 'Rangpo': (27.18, 88.53)},
+    'Delhi': {'New Delhi': (28.61, 77.21), 'Dwarka': (28.59, 77.05), 'Rohini': (28.74, 77.07), 'Saket': (28.52, 77.21), 'Karol Bagh': (28.65, 77.19), 'Lajpat Nagar': (28.57, 77.24), 'Pitampura': (28.70, 77.13), 'Janakpuri': (28.62, 77.08), 'Shahdara': (28.67, 77.29), 'Narela': (28.85, 77.09), 'Vasant Kunj': (28.52, 77.16), 'Najafgarh': (28.61, 76.98)}
+}
+
+PROPERTY_TYPES = ['Residential', 'Commercial', 'Agricultural', 'Industrial']
+
+# Tier-based pricing approximations: base Price_Per_SqFt range per city tier
+TIER_1 = ['Mumbai', 'Delhi', 'New Delhi', 'Bengaluru', 'Chennai', 'Hyderabad', 'Kolkata', 'Ahmedabad', 'Pune', 'Gurugram', 'Noida']
+TIER_2 = ['Lucknow', 'Kanpur', 'Jaipur', 'Indore', 'Thane', 'Nagpur', 'Visakhapatnam', 'Bhopal', 'Patna', 'Vadodara', 'Ludhiana', 'Nashik']
+TIER_BASE_PRICE = {1: (8000, 25000), 2: (4000, 8000), 3: (1500, 4000)}
+TYPE_MULTIPLIER = {'Commercial': 1.5, 'Agricultural': 0.3}
+
+# Sales in generated transaction histories happen at a premium over Current_Price, in this date window
+SALE_PREMIUM = (0.9, 1.2)
+SALE_START, SALE_DAYS = np.datetime64('2023-01-01'), 3 * 365
+
+def city_tier(city):
+    if city in TIER_1: return 1
+    if city in TIER_2: return 2
+    return 3
+
+# Invert for lookup
+STATE_TO_REGION = {state: region for region, states in REGION_MAP.items() for state in states}
+
+# Lookup arrays for vectorized generation. Every (state, city) pair is one
+# entry; state s owns pairs CITY_OFFSETS[s]:CITY_OFFSETS[s + 1]. City names
+# repeat across states (Udaipur), so CITIES holds each name once.
+STATES = list(STATE_CITY_MAP)
+REGIONS = list(REGION_MAP)
+CITIES = list(dict.fromkeys(city for cities in STATE_CITY_MAP.values() for city in cities))
+_PAIRS = [(state, city) for state in STATES for city in STATE_CITY_MAP[state]]
+CITY_COUNTS = np.array([len(STATE_CITY_MAP[state]) for state in STATES])
+CITY_OFFSETS = np.concatenate([[0], np.cumsum(CITY_COUNTS)])
+STATE_REGION_CODES = np.array([REGIONS.index(STATE_TO_REGION[state]) for state in STATES])
+PAIR_CITY_CODES = np.array([CITIES.index(city) for _, city in _PAIRS])
+PAIR_BASE_PRICE = np.array([TIER_BASE_PRICE[city_tier(city)] for _, city in _PAIRS])
+TYPE_MULTIPLIERS = np.array([TYPE_MULTIPLIER.get(t, 1.0) for t in PROPERTY_TYPES])
+DICTIONARIES = {'Region': REGIONS, 'State': STATES, 'City': CITIES, 'Property_Type': PROPERTY_TYPES}
+
+def property_batch(rng, first_id, n):
+    """n properties with consecutive IDs from first_id, drawn like the original per-row generator"""
+    state = rng.integers(len(STATES), size=n)
+    # Uniform city within the chosen state
+    pair = CITY_OFFSETS[state] + (rng.random(n) * CITY_COUNTS[state]).astype(np.int64)
+    prop_type = rng.integers(len(PROPERTY_TYPES), size=n)
+    area = rng.integers(500, 10001, size=n)
+
+    base = rng.integers(PAIR_BASE_PRICE[pair, 0], PAIR_BASE_PRICE[pair, 1] + 1)
+    price_per_sqft = base * rng.uniform(0.8, 1.5, size=n) * TYPE_MULTIPLIERS[prop_type]
+    current_price = (price_per_sqft * area).astype(np.int64)
+
+    return pd.DataFrame({
+        'Property_ID': np.arange(first_id, first_id + n, dtype=np.int64),
+        'Region': pd.Categorical.from_codes(STATE_REGION_CODES[state], REGIONS),
+        'State': pd.Categorical.from_codes(state, STATES),
+        'City': pd.Categorical.from_codes(PAIR_CITY_CODES[pair], CITIES),
+        'Property_Type': pd.Categorical.from_codes(prop_type, PROPERTY_TYPES),
+        'Area_SqFt': area,
+        'Price_Per_SqFt': price_per_sqft.astype(np.int64),
+        'Current_Price': current_price,
+        'Year_Built': rng.integers(2018, 2024, size=n),
+        'Growth_Rate': np.round(rng.uniform(0.05, 0.15, size=n), 4),
+        'Risk_Score': rng.integers(1, 11, size=n)
+    })
+
+def _write_csv(df, path, first):
+    df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+def generate_dataset(n_rows=5000, n_users=0, n_transactions=0, seed=42, chunk_size=500_000, path=DATASET_PATH):
+    """Generate the property table, listings, users, a purchase history and the city coordinates.
+
+    Rows are drawn in NumPy batches of chunk_size and appended to the CSVs and
+    the columnar copy as they are made, so memory is bounded by the chunk
+    size (plus the per-sale and per-user arrays, and the largest city and
+    type group while columnar.derived_orders sorts) rather than n_rows. The
+    same seed and chunk_size give the same files.
+
+    Each of the n_transactions sales is a first purchase from the platform by
+    a random user: the listing is marked Sold to the buyer, a Buy transaction
+    is recorded and the buyer's Balance is debited. With n_users=0 an existing
+    Users.csv is kept, as before.
+    """
+    if n_transactions > n_rows:
+        raise ValueError("Cannot sell more properties than are generated")
+    if n_transactions and not n_users:
+        raise ValueError("Transactions need users to buy")
+    data_dir = os.path.dirname(path) or '.'
+    listings_path = os.path.join(data_dir, 'Listings.csv')
+    transactions_path = os.path.join(data_dir, 'Transactions.csv')
+    users_path = os.path.join(data_dir, 'Users.csv')
+    cities_path = os.path.join(data_dir, 'Cities.csv')
+
+    # Which properties sell, to whom, for how much and when; TransactionIDs follow PropertyID order
+    rng = np.random.default_rng(seed)
+    sold_ids = np.sort(rng.choice(n_rows, size=n_transactions, replace=False)) + 1
+    buyers = rng.integers(1, n_users + 1, size=n_transactions)
+    premiums = rng.uniform(*SALE_PREMIUM, size=n_transactions)
+    dates = (SALE_START + np.sort(rng.integers(0, SALE_DAYS, size=n_transactions))).astype(str)
+    spent = np.zeros(n_users + 1)
+
+    # City coordinates, for the DSA engine's nearby-city queries and road distances
+    pd.DataFrame([(state, city) + CITY_COORDINATES[state][city] for state, city in _PAIRS],
+                 columns=['State', 'City', 'Latitude', 'Longitude']).to_csv(cities_path, index=False)
+
+    if n_transactions == 0:
+        _write_csv(pd.DataFrame(columns=['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type']), transactions_path, True)
+
+    with ColumnarWriter(columnar_path(path), n_rows, DICTIONARIES) as writer:
+        for batch, start in enumerate(range(0, n_rows, chunk_size)):
+            df = property_batch(np.random.default_rng([seed, batch]), start + 1, min(chunk_size, n_rows - start))
+            first = start == 0
+
+            lo, hi = np.searchsorted(sold_ids, [start + 1, start + len(df) + 1])
+            rows = sold_ids[lo:hi] - start - 1
+            sale_prices = (df['Current_Price'].to_numpy()[rows] * premiums[lo:hi]).astype(np.int64)
+            listings = pd.DataFrame({'PropertyID': df['Property_ID'], 'Price': df['Current_Price'],
+                                     'OwnerID': 0, 'Status': 'Available'})
+            listings.loc[rows, 'OwnerID'] = buyers[lo:hi]
+            listings.loc[rows, 'Status'] = 'Sold'
+            spent += np.bincount(buyers[lo:hi], weights=sale_prices, minlength=n_users + 1)
+
+            _write_csv(df, path, first)
+            _write_csv(listings, listings_path, first)
+            if n_transactions and (first or hi > lo):
+                _write_csv(pd.DataFrame({'TransactionID': np.arange(lo, hi) + 1, 'UserID': buyers[lo:hi],
+                                         'PropertyID': sold_ids[lo:hi], 'Date': dates[lo:hi],
+                                         'Price': sale_prices, 'Type': 'Buy'}), transactions_path, first)
+            # Memory-mappable copy for the engines (see columnar.py); finished after the CSV so it is fresh
+            writer.write(df)
+
+    if n_users:
+        for start in range(0, n_users, chunk_size):
+            ids = np.arange(start + 1, min(start + chunk_size, n_users) + 1)
+            pair = rng.integers(len(_PAIRS), size=len(ids))
+            names = pd.Series(ids).astype(str)
+            _write_csv(pd.DataFrame({
+                'UserID': ids,
+                'Username': 'user' + names,
+                'Password': 'password',
+                'Email': 'user' + names + '@example.com',
+                'Balance': rng.integers(10_000_000, 1_000_000_000, size=len(ids)) - spent[ids].astype(np.int64),
+                'FullName': 'User ' + names,
+                'Phone': rng.integers(6_000_000_000, 10_000_000_000, size=len(ids)),
+                'Address': [f'{_PAIRS[p][1]}, {_PAIRS[p][0]}' for p in pair]
+            }), users_path, start == 0)
+    elif not os.path.exists(users_path):
+        _write_csv(pd.DataFrame(columns=['UserID', 'Username', 'Password', 'Email', 'Balance']), users_path, True)
+    print(f"Dataset generated successfully: {n_rows} properties, {n_users} users, {n_transactions} transactions.")
 
 if __name__ == "__main__":
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    generate_dataset()
-    initialize_empty_csvs()
+    parser = argparse.ArgumentParser(description="Generate the LandSphere dataset, listings, users and transactions")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=0)
+    parser.add_argument('--transactions', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=500_000)
+    parser.add_argument('--out', default=DATASET_PATH)
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    generate_dataset(args.rows, args.users, args.transactions, args.seed, args.chunk_size, args.out)
+    print("Re-import into the store with: python store.py (or delete data/landsphere.db)")
@@ -1,62 +1,381 @@
 import pandas as pd
-import subprocess
-import json
+import numpy as np
+import copy
+import heapq
 import os
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import shortest_path
+from columnar import open_table, derived_orders
+from price_index import StaticPriceIndex
+from geo import CityGeometry
+from data_gen import CITY_COORDINATES
+from instrumentation import instrument
+
+# Same cutoff as formatProperties in DSAEngine.java ("Limit output for CLI performance")
+RESULT_LIMIT = 102
+# Cities this close (great-circle km) count as nearby in city analytics and search_nearby
+NEARBY_RADIUS_KM = 150
+# Nearby cities returned when a query sets no bound: about a state's worth, as when only a state's cities were linked
+NEARBY_CITIES_LIMIT = 25
 
 class DSAEngine:
+    @instrument('dsa.load')
     def __init__(self, data_path='data/LandSphere_India_Dataset_5000_Rows.csv'):
         self.data_path = data_path
+        self._lookups = {}
+        # Memory-map the columnar copy written by data_gen.py when it is fresh
+        self.table = open_table(data_path)
         # Keep DF for pandas-specific tasks in other parts of the app
-        self.df = pd.read_csv(data_path)
-        self.java_cmd = ['java', 'DSAEngine', self.data_path]
-
-    def _run_java(self, command, *args):
-        try:
-            cmd = self.java_cmd + [command] + list(map(str, args))
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return json.loads(result.stdout)
-        except Exception as e:
-            print(f"Java Engine Error: {e}")
-            return None
+        self.df = self.table.to_frame() if self.table is not None else pd.read_csv(data_path)
+        # Load once, answer every query from memory (same algorithms as DSAEngine.java)
+        self._load_columns()
+        self._load_geometry()
+        self._build_city_graph()
+        self._precompute_reachability()
+        # get_city_data results; they only depend on the property table, which
+        # buy and sell never change, so entries live as long as the engine
+        self._city_data = {}
+
+    def _encode(self, col):
+        if self.table is not None:
+            return self.table.columns[col], self.table.dictionaries[col]
+        codes, names = pd.factorize(self.df[col])
+        return codes, [str(n) for n in names]
+
+    def lookup_codes(self, names, value):
+        # Case-insensitive name -> codes, like equalsIgnoreCase; one lowercased map per name list
+        names_lookup = self._lookups.get(id(names))
+        if names_lookup is None or names_lookup[0] is not names:
+            lowered = {}
+            for code, name in enumerate(names):
+                lowered.setdefault(name.lower(), []).append(code)
+            names_lookup = self._lookups[id(names)] = (names, lowered)
+        return list(names_lookup[1].get(value.lower(), []))
+
+    def _load_columns(self):
+        df = self.df
+        self.ids = df['Property_ID'].to_numpy()
+        self.areas = df['Area_SqFt'].to_numpy()
+        self.price_per_sqft = df['Price_Per_SqFt'].to_numpy()
+        self.prices = df['Current_Price'].to_numpy()
+        self.region_codes, self.region_names = self._encode('Region')
+        self.state_codes, self.state_names = self._encode('State')
+        self.city_codes, self.city_names = self._encode('City')
+        self.type_codes, self.type_names = self._encode('Property_Type')
+        self.city_index = {name: code for code, name in enumerate(self.city_names)}
+        # PropertyID -> row lookup; generated IDs are already ascending
+        self.id_order = None if np.all(np.diff(self.ids) > 0) else np.argsort(self.ids, kind='stable')
+        self.sorted_ids = self.ids if self.id_order is None else self.ids[self.id_order]
+
+        if self.table is not None:
+            # Orderings precomputed by write_columnar
+            orders = self.table.orders
+        else:
+            orders = derived_orders(self.prices, self.city_codes, self.type_codes,
+                                    len(self.city_names), len(self.type_names))
+        # Stable price order, the result of the Java mergeSort
+        self.price_order = orders['price_order']
+        self.price_index = StaticPriceIndex(self.prices, self.price_order)
+
+        # Row positions per city code, in dataset order
+        city_order, city_offsets = orders['city_order'], orders['city_offsets']
+        self.city_rows = [city_order[city_offsets[c]:city_offsets[c + 1]] for c in range(len(self.city_names))]
+
+        # Composite (city, type) -> price-sorted rows, for search_nearby
+        ct_order, ct_offsets = orders['city_type_order'], orders['city_type_offsets']
+        self.city_type_index = {}
+        for key in np.flatnonzero(np.diff(ct_offsets)):
+            city, prop_type = divmod(int(key), len(self.type_names))
+            self.city_type_index[(city, prop_type)] = StaticPriceIndex(
+                self.prices, ct_order[ct_offsets[key]:ct_offsets[key + 1]])
+
+    def _load_geometry(self):
+        # City coordinates: the Cities.csv data_gen.py writes beside the dataset, else its built-in table
+        cities_path = os.path.join(os.path.dirname(self.data_path) or '.', 'Cities.csv')
+        if os.path.exists(cities_path):
+            cities = pd.read_csv(cities_path)
+            known = {(state, city): (lat, lon) for state, city, lat, lon in
+                     cities[['State', 'City', 'Latitude', 'Longitude']].itertuples(index=False)}
+        else:
+            known = {(state, city): coordinates for state, cities in CITY_COORDINATES.items()
+                     for city, coordinates in cities.items()}
+        # A name used in two states (Udaipur) is placed in the state of its first row
+        coordinates = np.full((len(self.city_names), 2), np.nan)
+        for code, name in enumerate(self.city_names):
+            rows = self.city_rows[code]
+            if len(rows):
+                coordinates[code] = known.get((self.state_names[self.state_codes[rows[0]]], name), np.nan)
+        self.geometry = CityGeometry(coordinates)
+
+    def _build_city_graph(self):
+        # Neighbours as insertion-ordered sets (dict keys): O(1) membership, stable BFS order
+        self.adj_list = {name: {} for name in self.city_names}
+        # Distinct (state, city) pairs in first-seen row order
+        pairs = self.state_codes.astype(np.int64) * len(self.city_names) + self.city_codes
+        present = np.flatnonzero(np.bincount(pairs, minlength=len(self.state_names) * len(self.city_names)))
+        first_seen = []
+        for pair in present:
+            state, city = divmod(int(pair), len(self.city_names))
+            rows = self.city_rows[city]
+            first_seen.append((rows[np.argmax(self.state_codes[rows] == state)], state, city))
+        self.state_cities = {}
+        for _, state, city in sorted(first_seen):
+            self.state_cities.setdefault(self.state_names[state], []).append(self.city_names[city])
+
+        # Roads between geographically close cities, across state borders, shortest first
+        for (a, b), _ in sorted(self.geometry.edges.items(), key=lambda edge: edge[1]):
+            self.adj_list[self.city_names[a]].setdefault(self.city_names[b])
+            self.adj_list[self.city_names[b]].setdefault(self.city_names[a])
+
+        # Cities without coordinates keep the old links: the next 3 cities in their state
+        for cities_in_state in self.state_cities.values():
+            for i, city_a in enumerate(cities_in_state):
+                for city_b in cities_in_state[i + 1:i + 4]:
+                    if not (self.geometry.has(self.city_index[city_a]) and self.geometry.has(self.city_index[city_b])):
+                        self.adj_list[city_a].setdefault(city_b)
+                        self.adj_list[city_b].setdefault(city_a)
+
+    def _precompute_reachability(self):
+        # Hop counts between every pair of cities (a BFS from each, run by scipy), and
+        # for every city the others in order of hops, then road distance: a nearby
+        # query is then a slice of one row.
+        n = len(self.city_names)
+        edges = [(self.city_index[a], self.city_index[b]) for a in self.adj_list for b in self.adj_list[a]]
+        a, b = np.array(edges, dtype=np.int64).reshape(-1, 2).T
+        graph = coo_matrix((np.ones(len(a)), (a, b)), shape=(n, n)).tocsr()
+        self.hop_counts = shortest_path(graph, directed=False, unweighted=True)
+        self.hop_order = np.lexsort((self.geometry.road_km, self.hop_counts))
+        # Cities reachable from each city, itself included (it always sorts first, at 0 hops)
+        self.reachable = np.isfinite(self.hop_counts).sum(axis=1)
+
+    def rows_of(self, property_ids):
+        """Row positions of the given PropertyIDs, -1 for unknown IDs"""
+        property_ids = np.asarray(property_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.sorted_ids, property_ids), len(self.sorted_ids) - 1)
+        rows = pos if self.id_order is None else self.id_order[pos]
+        return np.where(self.sorted_ids[pos] == property_ids, rows, -1)
+
+    def row_of(self, property_id):
+        row = int(self.rows_of([property_id])[0])
+        return row if row >= 0 else None
+
+    def _format_property(self, row):
+        return {
+            'Property_ID': int(self.ids[row]),
+            'City': self.city_names[self.city_codes[row]],
+            'Property_Type': self.type_names[self.type_codes[row]],
+            'Area_SqFt': int(self.areas[row]),
+            'Price_Per_SqFt': round(float(self.price_per_sqft[row]), 2),
+            'Current_Price': round(float(self.prices[row]), 2)
+        }
+
+    def _format_properties(self, rows):
+        return [self._format_property(row) for row in rows[:RESULT_LIMIT]]
+
+    def _city_code(self, city_name):
+        """The city's code: an exact name match, else the first case-insensitive one; None if unknown"""
+        code = self.city_index.get(city_name)
+        if code is None:
+            codes = self.lookup_codes(self.city_names, city_name)
+            code = codes[0] if codes else None
+        return code
+
+    def _bfs(self, start_city, max_hops=None, limit=None):
+        """Cities reachable from start_city as (city, hops), fewest hops (then shortest road) first"""
+        code = self._city_code(start_city)
+        if code is None:
+            return []
+        order = self.hop_order[code, 1:self.reachable[code]]
+        if max_hops is not None:
+            order = order[:np.searchsorted(self.hop_counts[code, order], max_hops, side='right')]
+        if limit is not None:
+            order = order[:limit]
+        return [(self.city_names[c], int(self.hop_counts[code, c])) for c in order]
 
+    def _nearest(self, start_city, k=None, radius_km=None):
+        """Cities with coordinates around start_city as (city, km), nearest first"""
+        code = self._city_code(start_city)
+        if code is None:
+            return []
+        cities, km = self.geometry.nearest(code, k, radius_km)
+        return [(self.city_names[c], float(d)) for c, d in zip(cities, km)]
+
+    def _nearby(self, start_city, radius_km=NEARBY_RADIUS_KM):
+        """Cities within radius_km, nearest first; by hops for a city without coordinates"""
+        code = self._city_code(start_city)
+        if code is not None and not self.geometry.has(code):
+            return [city for city, _ in self._bfs(start_city, limit=NEARBY_CITIES_LIMIT)]
+        return [city for city, _ in self._nearest(start_city, radius_km=radius_km)]
+
+    @instrument('dsa.linear_search')
     def linear_search(self, budget_max):
-        """Filter properties by budget - Delegated to Java"""
-        return self._run_java('filter', budget_max)
+        """Filter properties by budget, cheapest first"""
+        return self._format_properties(self.price_index.range(max_price=float(budget_max), limit=RESULT_LIMIT))
 
+    @instrument('dsa.binary_search')
     def binary_search(self, price_target):
-        """Search for a specific price - Delegated to Java"""
-        return self._run_java('search', price_target)
+        """Search for a specific price: the closest property within 1000"""
+        target = float(price_target)
+        closest = self.price_index.nearest(target, 1)
+        if closest and abs(self.prices[closest[0]] - target) < 1000:
+            return self._format_property(closest[0])
+        return {}
+
+    @instrument('dsa.merge_sort')
+    def merge_sort(self, props_placeholder=None, descending=False):
+        """Sort properties by price"""
+        # The price order is computed once at load time; descending mirrors
+        # the Java CLI, which reverses the stable ascending order.
+        return self._format_properties(self.price_index.range(limit=RESULT_LIMIT, descending=descending))
+
+    @instrument('dsa.price_range')
+    def price_range(self, min_price=None, max_price=None, offset=0, limit=RESULT_LIMIT):
+        """Properties priced in [min_price, max_price], cheapest first"""
+        return self._format_properties(self.price_index.range(min_price, max_price, offset, limit))
+
+    @instrument('dsa.nearest_price')
+    def nearest_price(self, target_price, k=10):
+        """The k properties closest in price to target_price, closest first"""
+        return self._format_properties(self.price_index.nearest(float(target_price), k))
+
+    @instrument('dsa.price_page')
+    def price_page(self, limit=RESULT_LIMIT, cursor=None, descending=False, min_price=None, max_price=None):
+        """One price-sorted page, optionally within [min_price, max_price], and the cursor for the next one"""
+        rows, next_cursor = self.price_index.page(limit, cursor, descending, min_price, max_price)
+        return {'properties': [self._format_property(row) for row in rows], 'next_cursor': next_cursor}
+
+    def iter_price_range(self, min_price=None, max_price=None, descending=False, cursor=None, batch=RESULT_LIMIT):
+        """Every property priced in [min_price, max_price] after cursor, in price order.
+
+        A generator reading the price index one batch at a time, so streaming
+        the whole range holds a single batch in memory.
+        """
+        while True:
+            rows, cursor = self.price_index.page(batch, cursor, descending, min_price, max_price)
+            for row in rows:
+                yield self._format_property(row)
+            if cursor is None:
+                return
+
+    @instrument('dsa.bfs_nearby_cities')
+    def bfs_nearby_cities(self, start_city, max_hops=None, limit=None, with_hops=False, radius_km=None, k=None):
+        """Find nearby cities, optionally within max_hops and capped at limit.
 
-    def merge_sort(self, props_placeholder=None):
-        """Sort properties by price - Delegated to Java"""
-        # In the original, this modified the list in place. 
-        # Here we return the sorted list from Java.
-        return self._run_java('sort')
+        Ordered by hops over the road graph; given radius_km and/or k, the
+        cities within radius_km / the k nearest by great-circle distance,
+        nearest first, from the spatial index. The road graph joins every
+        city, so a query with none of these bounds gets NEARBY_CITIES_LIMIT.
+        """
+        code = self._city_code(start_city)
+        if code is None:
+            return []
+        if max_hops is None and limit is None and radius_km is None and k is None:
+            limit = NEARBY_CITIES_LIMIT
+        if radius_km is None and k is None:
+            reached = self._bfs(start_city, max_hops, limit)
+        else:
+            hops = self.hop_counts[code]
+            reached = [(city, int(hops[self.city_index[city]])) for city, _ in self._nearest(start_city, k, radius_km)
+                       if max_hops is None or hops[self.city_index[city]] <= max_hops][:limit]
+        return reached if with_hops else [city for city, _ in reached]
 
-    def bfs_nearby_cities(self, start_city):
-        """Find nearby cities - Delegated to Java"""
-        res = self._run_java('city_data', start_city)
-        return res.get('nearby', []) if res else []
+    @instrument('dsa.city_distances')
+    def city_distances(self, start_city, cities):
+        """Great-circle km from start_city to each of cities, None where a city has no coordinates"""
+        code = self._city_code(start_city)
+        distances = {}
+        for city in cities:
+            other = self._city_code(city)
+            km = np.nan if code is None or other is None else self.geometry.distance_km(code, other)
+            distances[city] = None if np.isnan(km) else round(km, 1)
+        return distances
 
+    @instrument('dsa.shortest_path')
+    def shortest_path(self, source_city, target_city):
+        """The shortest road route between two cities: its length in km and the cities along it.
+
+        Dijkstra over the distance-weighted road graph, run from every city at
+        load time; {} when either city is unknown or has no coordinates.
+        """
+        source, target = self._city_code(source_city), self._city_code(target_city)
+        if source is None or target is None:
+            return {}
+        km, path = self.geometry.route(source, target)
+        if not path:
+            return {}
+        return {'distance_km': round(km, 1), 'path': [self.city_names[c] for c in path]}
+
+    @instrument('dsa.get_city_data')
     def get_city_data(self, city_name):
-        """City analytics - Delegated to Java"""
-        return self._run_java('city_data', city_name)
+        """City analytics, computed on the first request for a city and then served from memory.
+        Callers get their own copy, so changing it never changes the cached entry."""
+        codes = self.lookup_codes(self.city_names, city_name)
+        key = tuple(codes)
+        data = self._city_data.get(key)
+        if data is None:
+            data = self._city_data[key] = self._city_analytics(codes, city_name)
+        return dict(copy.deepcopy(data), name=city_name) if data else {}
+
+    def _city_analytics(self, codes, city_name):
+        rows = np.sort(np.concatenate([self.city_rows[c] for c in codes])) if codes else []
+        if len(rows) == 0:
+            return {}
+
+        type_codes = self.type_codes[rows]
+        type_count = np.bincount(type_codes, minlength=len(self.type_names))
+        type_price_sum = np.bincount(type_codes, weights=self.price_per_sqft[rows], minlength=len(self.type_names))
+        present = pd.unique(type_codes)
 
+        return {
+            'name': city_name,
+            'state': self.state_names[self.state_codes[rows[0]]],
+            'avg_price': float(self.prices[rows].sum()) / len(rows),
+            'count': len(rows),
+            'nearby': self._nearby(city_name),
+            'type_distribution': {self.type_names[t]: int(type_count[t]) for t in present},
+            'type_avg_prices': {self.type_names[t]: float(type_price_sum[t] / type_count[t]) for t in present}
+        }
+
+    @instrument('dsa.get_multi_city_data')
     def get_multi_city_data(self, cities):
-        """Batch city analytics - Delegated to Java"""
-        return self._run_java('multi_city_data', ",".join(cities))
+        """Batch city analytics"""
+        return {city.strip(): self.get_city_data(city.strip()) for city in cities}
+
+    @instrument('dsa.search_nearby')
+    def search_nearby(self, state, city, property_type, target_price, margin=None, radius_km=NEARBY_RADIUS_KM):
+        """Find properties with specific type and target price in and around city, closest price first.
 
-    def search_nearby(self, state, city, property_type, target_price, margin=None):
-        """Find properties nearby with specific type and target price - Delegated to Java"""
-        args = [state, city, property_type, target_price]
-        if margin is not None:
-            args.append(margin)
-        return self._run_java('search_nearby', *args)
+        Around means within radius_km (by hops, for a city without
+        coordinates); without a known city, the whole state is searched.
+        """
+        target_price = float(target_price)
+        if margin is None:
+            margin = target_price * 0.2  # 20% margin default
 
+        city_code = self._city_code(city.strip()) if city and city.strip() else None
+        if city_code is not None:
+            valid_cities = [self.city_names[city_code]] + self._nearby(self.city_names[city_code], radius_km)
+        else:
+            # If no specific city, consider all cities in state
+            valid_cities = []
+            for name in self.state_cities:
+                if name.lower() == state.lower():
+                    valid_cities.extend(self.state_cities[name])
+
+        # Range lookups in the (city, type) price index, merged and ranked by price distance
+        city_codes = {self.city_index[c] for c in valid_cities}
+        type_codes = self.lookup_codes(self.type_names, property_type)
+        candidates = []
+        for city_code in city_codes:
+            for type_code in type_codes:
+                index = self.city_type_index.get((city_code, type_code))
+                if index is not None:
+                    for row in index.nearest(target_price, RESULT_LIMIT, float(margin)):
+                        candidates.append((abs(float(self.prices[row]) - target_price), row))
+        return [self._format_property(row) for _, row in heapq.nsmallest(RESULT_LIMIT, candidates)]
 
 if __name__ == "__main__":
     dsa = DSAEngine()
-    print("Nearby Mumbai (Java):", dsa.bfs_nearby_cities('Mumbai'))
+    print("Nearby Mumbai:", dsa.bfs_nearby_cities('Mumbai'))
     city_data = dsa.get_city_data('Delhi')
-    print("Delhi Analytics (Java):", city_data.get('avg_price') if city_data else 'Error')
-
+    print("Delhi Analytics:", city_data.get('avg_price') if city_data else 'Error')
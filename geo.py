@@ -0,0 +1,103 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import dijkstra, minimum_spanning_tree
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0
+# Every city gets a road to this many of its nearest cities
+ROAD_NEIGHBORS = 4
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between points given in degrees (NumPy broadcasting)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+class CityGeometry:
+    """Neighbour queries and road distances between cities, precomputed from their coordinates.
+
+    Cities are numbered by their position in coordinates, one (latitude,
+    longitude) row each; rows of NaN mark cities without coordinates, which
+    take part in none of the structures. Built once:
+    - a ball tree (haversine metric), so a k-nearest or radius query costs
+      O(log n) plus the cities it returns;
+    - a road-like graph: each city is joined to its ROAD_NEIGHBORS nearest
+      cities, whatever their state, plus the edges of a minimum spanning tree
+      so that every city can reach every other; edges weigh their great-circle km;
+    - shortest road distances and predecessors from every city (Dijkstra), so a
+      distance is one lookup and a route is rebuilt in as many steps as it has.
+    """
+
+    def __init__(self, coordinates, road_neighbors=ROAD_NEIGHBORS):
+        self.coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        n = len(self.coordinates)
+        self.known = np.flatnonzero(~np.isnan(self.coordinates).any(axis=1))
+        self.tree = BallTree(np.radians(self.coordinates[self.known]), metric='haversine') if len(self.known) else None
+        self.edges = self._road_edges(road_neighbors)  # (a, b) with a < b -> km
+        ends = np.array(list(self.edges), dtype=np.int64).reshape(-1, 2)
+        km = np.array(list(self.edges.values()), dtype=float)
+        graph = coo_matrix((km, (ends[:, 0], ends[:, 1])), shape=(n, n)).tocsr()
+        self.road_km, self.predecessors = dijkstra(graph, directed=False, return_predecessors=True)
+
+    def _road_edges(self, road_neighbors):
+        edges = {}
+        m = len(self.known)
+        if m < 2:
+            return edges
+
+        def add(i, j, km):
+            a, b = sorted((int(self.known[i]), int(self.known[j])))
+            edges[(a, b)] = float(km)
+
+        points = np.radians(self.coordinates[self.known])
+        distances, neighbors = self.tree.query(points, k=min(road_neighbors + 1, m))
+        for i in range(m):
+            for distance, j in zip(distances[i], neighbors[i]):
+                if j != i:
+                    add(i, j, distance * EARTH_RADIUS_KM)
+        # Nearest-neighbour roads leave clusters (Goa's six cities) cut off; a spanning tree joins them
+        lat, lon = self.coordinates[self.known].T
+        pairwise = haversine_km(lat[:, None], lon[:, None], lat, lon)
+        # A zero weight means "no edge" to the spanning tree, so cities at the same point get a tiny one
+        pairwise = np.maximum(pairwise, 1e-6)
+        np.fill_diagonal(pairwise, 0)
+        tree = minimum_spanning_tree(pairwise).tocoo()
+        for i, j, km in zip(tree.row, tree.col, tree.data):
+            add(i, j, km)
+        return edges
+
+    def has(self, city):
+        return not np.isnan(self.coordinates[city]).any()
+
+    def nearest(self, city, k=None, radius_km=None):
+        """Other cities nearest first, as (cities, km) arrays: the k nearest and/or those within radius_km"""
+        if not self.has(city):
+            return np.array([], dtype=np.int64), np.array([])
+        point = np.radians(self.coordinates[city])[None, :]
+        if radius_km is not None:
+            neighbors, distances = self.tree.query_radius(point, r=radius_km / EARTH_RADIUS_KM,
+                                                          return_distance=True, sort_results=True)
+            neighbors, distances = neighbors[0], distances[0]
+        else:
+            wanted = len(self.known) if k is None else min(k + 1, len(self.known))
+            distances, neighbors = self.tree.query(point, k=wanted)
+            neighbors, distances = neighbors[0], distances[0]
+        cities = self.known[neighbors]
+        keep = cities != city
+        cities, km = cities[keep], distances[keep] * EARTH_RADIUS_KM
+        return (cities, km) if k is None else (cities[:k], km[:k])
+
+    def distance_km(self, a, b):
+        """Great-circle distance between cities a and b, NaN if either has no coordinates"""
+        (lat1, lon1), (lat2, lon2) = self.coordinates[a], self.coordinates[b]
+        return float(haversine_km(lat1, lon1, lat2, lon2))
+
+    def route(self, a, b):
+        """(road km, cities from a to b) along the shortest road path, or (inf, []) if there is none"""
+        km = float(self.road_km[a, b])
+        if not np.isfinite(km):
+            return km, []
+        path = [b]
+        while path[-1] != a:
+            path.append(int(self.predecessors[a, path[-1]]))
+        return km, path[::-1]
@@ -0,0 +1,149 @@
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger('landsphere.slow_requests')
+
+class StageMetrics:
+    """Latency histograms and error counters per named stage, and per-request stage breakdowns.
+
+    Stages are dotted names such as 'store.buy', 'dsa.get_city_data' or
+    'route.marketplace'. While a request is being handled, each finished stage
+    is also appended to that request's breakdown, so a slow request can be
+    logged with where its time went. Nested stages each record their own
+    total, so a breakdown's entries can add up to more than the request.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.histograms = {}              # stage -> per-bucket counts, last one is +Inf
+        self.sums = defaultdict(float)    # stage -> total seconds
+        self.errors = defaultdict(int)    # stage -> calls that raised
+        self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+        self.slow_requests = 0
+        self._local = threading.local()
+
+    def observe(self, stage, seconds, error=False):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self.histograms.get(stage)
+            if counts is None:
+                counts = self.histograms[stage] = [0] * (len(self.buckets) + 1)
+            counts[i] += 1
+            self.sums[stage] += seconds
+            if error:
+                self.errors[stage] += 1
+        stages = getattr(self._local, 'stages', None)
+        if stages is not None:
+            stages.append((stage, seconds))
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self.observe(stage, time.perf_counter() - start, error)
+
+    def instrument(self, stage):
+        """Decorator timing every call of the wrapped function as stage"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timed(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def start_request(self):
+        self._local.stages = []
+        self._local.started = time.perf_counter()
+
+    def finish_request(self, endpoint, method, status, slow_threshold=None):
+        """Record the request as stage route.<endpoint>; log its breakdown if it took over slow_threshold seconds"""
+        started = getattr(self._local, 'started', None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        stages, self._local.stages, self._local.started = self._local.stages, None, None
+        self.observe(f'route.{endpoint}', seconds, error=status >= 500)
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+        if slow_threshold is not None and seconds > slow_threshold:
+            with self._lock:
+                self.slow_requests += 1
+            breakdown = ', '.join(f'{stage} {s * 1000:.1f}ms' for stage, s in stages) or 'no instrumented stages'
+            logger.warning('Slow request %s %s: %.1fms (%s)', method, endpoint, seconds * 1000, breakdown)
+
+    def track_requests(self, app):
+        """Record every request of a Flask app with start_request / finish_request.
+
+        The request is finished at teardown, which Flask runs even when the
+        view raised and after_request was skipped, so unhandled errors count
+        as 500s. A streamed response (NDJSON) is finished once the view has
+        returned it, before its body is generated: its time leaves out the
+        streaming. The slow request threshold is app.config['SLOW_REQUEST_SECONDS'].
+        """
+        from flask import g, request
+
+        @app.before_request
+        def start_timing():
+            self.start_request()
+
+        @app.after_request
+        def remember_status(response):
+            g.response_status = response.status_code
+            return response
+
+        @app.teardown_request
+        def record_timing(exc):
+            status = 500 if exc is not None else g.get('response_status', 500)
+            self.finish_request(request.endpoint or 'unmatched', request.method, status,
+                                app.config.get('SLOW_REQUEST_SECONDS'))
+
+    def render(self):
+        """Prometheus text exposition of the histograms and counters"""
+        with self._lock:
+            histograms = {stage: list(counts) for stage, counts in self.histograms.items()}
+            sums, errors = dict(self.sums), dict(self.errors)
+            requests, slow_requests = dict(self.requests), self.slow_requests
+
+        lines = ['# HELP landsphere_stage_seconds Latency of instrumented stages.',
+                 '# TYPE landsphere_stage_seconds histogram']
+        for stage in sorted(histograms):
+            cumulative = 0
+            for le, count in zip([f'{b:g}' for b in self.buckets] + ['+Inf'], histograms[stage]):
+                cumulative += count
+                lines.append(f'landsphere_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'landsphere_stage_seconds_sum{{stage="{stage}"}} {sums[stage]:.6f}')
+            lines.append(f'landsphere_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+
+        lines += ['# HELP landsphere_stage_errors_total Instrumented calls that raised.',
+                  '# TYPE landsphere_stage_errors_total counter']
+        for stage in sorted(errors):
+            lines.append(f'landsphere_stage_errors_total{{stage="{stage}"}} {errors[stage]}')
+
+        lines += ['# HELP landsphere_requests_total Requests by endpoint, method and status.',
+                  '# TYPE landsphere_requests_total counter']
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'landsphere_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += ['# HELP landsphere_slow_requests_total Requests over the slow request threshold.',
+                  '# TYPE landsphere_slow_requests_total counter',
+                  f'landsphere_slow_requests_total {slow_requests}']
+        return '\n'.join(lines) + '\n'
+
+# The process-wide registry the engines, store and app report to
+registry = StageMetrics()
+timed = registry.timed
+instrument = registry.instrument
@@ -0,0 +1,194 @@
+import numpy as np
+from collections import Counter, defaultdict
+from price_index import PriceIndex
+from instrumentation import instrument
+
+class AvailabilityIndex:
+    """Available-listing counts per region -> state -> city, and per property type.
+
+    Built once from the store's available listings and kept current by add() and
+    remove() when buy_land or sell_land flips a listing, so the marketplace
+    summary levels never touch the property table. Each city also keeps a
+    PriceIndex of its available listings for budget filters and price sorts,
+    and its rows in PropertyID order for the default listing pages.
+    """
+
+    @instrument('index.build')
+    def __init__(self, dsa_engine, available):
+        self.engine = dsa_engine
+        # One flag and listing price per property row; a city page only reads its own rows
+        self.available = np.zeros(len(dsa_engine.ids), dtype=bool)
+        self.listing_price = np.full(len(dsa_engine.ids), np.nan)
+        self.city_prices = defaultdict(PriceIndex)  # city code -> available (Price, PropertyID)
+        self.region_counts = Counter()
+        self.state_counts = defaultdict(Counter)   # region -> state -> count
+        self.city_counts = defaultdict(Counter)    # state -> city -> count
+        self.type_counts = defaultdict(Counter)    # ('region', r) / ('state', s) / ('city', s, c) -> type -> count
+
+        # Case-insensitive name lookups, like the .str.lower() filters they replace
+        self.regions = {name.lower(): name for name in dsa_engine.region_names}
+        self.states = {name.lower(): name for name in dsa_engine.state_names}
+        self.state_region = {}
+
+        rows = dsa_engine.rows_of(available['PropertyID'])
+        known = rows >= 0
+        rows = rows[known]
+        prices = available['Price'].to_numpy(dtype=float)[known]
+        self.available[rows] = True
+        self.listing_price[rows] = prices
+        self._build_city_prices(rows, prices)
+        self._build_city_ids()
+        # Count each distinct (region, state, city, type) once, then fold into the levels
+        e = dsa_engine
+        dims = (len(e.region_names), len(e.state_names), len(e.city_names), len(e.type_names))
+        keys = np.ravel_multi_index((e.region_codes[rows], e.state_codes[rows], e.city_codes[rows], e.type_codes[rows]), dims)
+        counts = np.bincount(keys, minlength=int(np.prod(dims)))
+        for key in np.flatnonzero(counts):
+            region, state, city, prop_type = np.unravel_index(key, dims)
+            self._apply(e.region_names[region], e.state_names[state], e.city_names[city], e.type_names[prop_type], int(counts[key]))
+
+    def _build_city_prices(self, rows, prices):
+        ids = self.engine.ids[rows]
+        cities = self.engine.city_codes[rows]
+        order = np.lexsort((ids, prices, cities))
+        for chunk in np.split(order, np.flatnonzero(np.diff(cities[order])) + 1):
+            if len(chunk):
+                self.city_prices[int(cities[chunk[0]])] = PriceIndex(zip(prices[chunk].tolist(), ids[chunk].tolist()))
+
+    def _build_city_ids(self):
+        # Every row of each city by PropertyID; availability is checked while paging
+        e = self.engine
+        order = np.lexsort((e.ids, e.city_codes))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(e.city_codes, minlength=len(e.city_names)))])
+        self.city_id_rows = [order[offsets[c]:offsets[c + 1]] for c in range(len(e.city_names))]
+        self.city_ids = [e.ids[rows] for rows in self.city_id_rows]
+
+    def _names(self, row):
+        e = self.engine
+        return (e.region_names[e.region_codes[row]], e.state_names[e.state_codes[row]],
+                e.city_names[e.city_codes[row]], e.type_names[e.type_codes[row]])
+
+    def _apply(self, region, state, city, prop_type, delta):
+        self.state_region[state] = region
+        self.region_counts[region] += delta
+        self.state_counts[region][state] += delta
+        self.city_counts[state][city] += delta
+        self.type_counts[('region', region)][prop_type] += delta
+        self.type_counts[('state', state)][prop_type] += delta
+        self.type_counts[('city', state, city)][prop_type] += delta
+
+    def add(self, property_id, price):
+        """A listing became Available (relisted by its owner), possibly at a new price"""
+        row = self.engine.row_of(property_id)
+        if row is None:
+            return
+        city_prices = self.city_prices[int(self.engine.city_codes[row])]
+        if self.available[row]:
+            city_prices.remove(self.listing_price[row], property_id)
+        else:
+            self.available[row] = True
+            self._apply(*self._names(row), 1)
+        self.listing_price[row] = price
+        city_prices.add(price, property_id)
+
+    def remove(self, property_id):
+        """A listing was sold"""
+        row = self.engine.row_of(property_id)
+        if row is None or not self.available[row]:
+            return
+        self.available[row] = False
+        self._apply(*self._names(row), -1)
+        self.city_prices[int(self.engine.city_codes[row])].remove(self.listing_price[row], property_id)
+        self.listing_price[row] = np.nan
+
+    @staticmethod
+    def _records(counter, key):
+        return [{key: name, 'count': n} for name, n in sorted(counter.items()) if n > 0]
+
+    def region_summary(self):
+        return self._records(self.region_counts, 'Region')
+
+    def state_summary(self, region):
+        region = self.regions.get(region.lower())
+        return self._records(self.state_counts.get(region, {}), 'State')
+
+    def city_summary(self, state):
+        state = self.states.get(state.lower())
+        return self._records(self.city_counts.get(state, {}), 'City')
+
+    def region_of_state(self, state):
+        return self.state_region.get(self.states.get(state.lower()))
+
+    def type_summary(self, level, *names):
+        """Per-type counts for ('region', r), ('state', s) or ('city', s, c)"""
+        return {t: n for t, n in self.type_counts.get((level,) + names, {}).items() if n > 0}
+
+    def city_rows(self, city):
+        """Rows of the available properties in a city (matched case-insensitively), in dataset order"""
+        codes = self.engine.lookup_codes(self.engine.city_names, city)
+        if not codes:
+            return np.array([], dtype=np.int64)
+        rows = np.sort(np.concatenate([self.engine.city_rows[c] for c in codes]))
+        return rows[self.available[rows]]
+
+    def city_id_page(self, city, limit, cursor=None, max_price=None):
+        """One page of a city's available PropertyIDs in id order and the cursor for the next page (None at the end).
+
+        The cursor is the last PropertyID returned. The page starts with a binary
+        search on the cursor and scans forward only until it is full, so it costs
+        O(log n + page size + skipped sold or over-budget rows). Raises ValueError
+        for a bad cursor.
+        """
+        codes = self.engine.lookup_codes(self.engine.city_names, city)
+        if len(codes) == 1:
+            rows, ids = self.city_id_rows[codes[0]], self.city_ids[codes[0]]
+        else:
+            # Names differing only in case: merge their id orders (rare, and empty for unknown cities)
+            rows = np.concatenate([self.city_id_rows[c] for c in codes] + [np.array([], dtype=np.int64)])
+            rows = rows[np.argsort(self.engine.ids[rows], kind='stable')]
+            ids = self.engine.ids[rows]
+        start = 0 if cursor is None else int(np.searchsorted(ids, int(cursor), side='right'))
+        page = []
+        # Read twice what is still missing per step, so sold listings rarely cost another step
+        while start < len(rows) and len(page) <= limit:
+            block = rows[start:start + 2 * (limit + 1 - len(page))]
+            keep = self.available[block]
+            if max_price is not None:
+                keep &= self.listing_price[block] <= max_price
+            page.extend(block[keep].tolist())
+            start += len(block)
+        property_ids = self.engine.ids[np.array(page[:limit], dtype=np.int64)]
+        return property_ids, (str(property_ids[-1]) if len(page) > limit else None)
+
+    def city_page(self, city, limit, cursor=None, sort_by=None, max_price=None):
+        """One page of a city's available PropertyIDs and the cursor for the next page (None at the end).
+
+        Price sorts ('price_asc', 'price_desc') page through the city's price
+        index and their cursor is the last (price, PropertyID); otherwise
+        listings are in PropertyID order and the cursor is the last PropertyID.
+        Raises ValueError for a bad cursor.
+        """
+        if sort_by in ('price_asc', 'price_desc'):
+            entries, next_cursor = self.city_price_index(city).page(
+                limit, cursor, descending=(sort_by == 'price_desc'), max_price=max_price)
+            return [pid for _, pid in entries], next_cursor
+        return self.city_id_page(city, limit, cursor, max_price)
+
+    def city_pages(self, city, limit, cursor=None, sort_by=None, max_price=None):
+        """Every page city_page() would return from cursor on, one page in memory at a time"""
+        # The first page is read up front, so a bad cursor fails before iteration starts
+        first = self.city_page(city, limit, cursor, sort_by, max_price)
+        def pages(property_ids, cursor):
+            while True:
+                yield property_ids
+                if cursor is None:
+                    return
+                property_ids, cursor = self.city_page(city, limit, cursor, sort_by, max_price)
+        return pages(*first)
+
+    def city_price_index(self, city):
+        """PriceIndex of a city's available listings (matched case-insensitively)"""
+        codes = self.engine.lookup_codes(self.engine.city_names, city)
+        if len(codes) == 1:
+            return self.city_prices.get(codes[0], PriceIndex())
+        return PriceIndex(key for c in codes for key in self.city_prices.get(c, PriceIndex()))
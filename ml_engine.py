@@ -5,66 +5,478 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+import sklearn
 import pickle
+import copy
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
 import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from columnar import load_properties
+from compiled_models import compile_models
+from instrumentation import instrument, timed
+
+# Everything that changes the trained models; part of the cache fingerprint
+TRAINING_CONFIG = {
+    'features': ['Area_SqFt', 'Year_Built', 'Growth_Rate', 'Risk_Score'],
+    'target': 'Current_Price',
+    'test_size': 0.2,
+    'random_state': 42,
+    'poly_degree': 2,
+    'rf_estimators': 100
+}
+
+# Online updates from completed sales (see MLEngine.observe_sale)
+ONLINE_CONFIG = {
+    'batch_size': 25,           # sales per mini-batch
+    'trees_per_batch': 5,       # trees grown on each mini-batch
+    'max_online_trees': 50,     # oldest online trees are dropped past this
+    'replay_size': 500,         # training rows mixed into each mini-batch
+    'window': 500,              # recent sales scored for the drift metrics
+    'retrain_after_sales': 500, # full retrain once this many sales were not absorbed
+    'drift_retrain_ratio': 1.5, # full retrain once online MAE exceeds the test MAE by this factor...
+    'drift_min_sales': 100,     # ...measured over at least this many sales
+    # Batches between model cache writes, which the other pre-fork workers then load
+    # (sales absorbed since the last write are covered by the next full retrain)
+    'save_every': 20
+}
+
+# dataset_fingerprint results by (path, mtime, size, config), so an unchanged file is hashed once
+_fingerprints = {}
+
+def dataset_fingerprint(data_path, config=TRAINING_CONFIG):
+    """sha256 of the dataset bytes, the training config and the sklearn version.
+    Remembered while the file's mtime and size stay the same."""
+    stat = os.stat(data_path)
+    key = (os.path.abspath(data_path), stat.st_mtime_ns, stat.st_size, json.dumps(config, sort_keys=True))
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        fingerprint = _fingerprints[key] = _hash_dataset(data_path, config)
+    return fingerprint
+
+def _hash_dataset(data_path, config):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    digest.update(sklearn.__version__.encode())
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def evaluate(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    return {
+        'R2': round(r2_score(y_test, y_pred), 4),
+        'MAE': round(mean_absolute_error(y_test, y_pred), 2),
+        'MSE': round(mean_squared_error(y_test, y_pred), 2)
+    }
+
+@instrument('ml.train_models')
+def train_models(data_path, sales=None, n_jobs=-1):
+    """Train the linear, polynomial and RandomForest models concurrently.
+
+    Returns the artifact MLEngine serves: models, metrics, the fitted
+    PolynomialFeatures and the dataset fingerprint. Completed sales
+    (PropertyID, Price) are added to the training rows at their sale price.
+    Runs in the serving process or in a retraining worker process.
+    """
+    artifact = {'models': {}, 'metrics': {}, 'poly_features': None, 'fingerprint': None, 'trained_sales': 0}
+    if not os.path.exists(data_path):
+        print(f"Data file {data_path} not found.")
+        return artifact
+
+    df = load_properties(data_path)
+    features, target = TRAINING_CONFIG['features'], TRAINING_CONFIG['target']
+    
+    # Features: Area_SqFt, Year_Built, Growth_Rate, Risk_Score
+    # Target: Current_Price
+    X = df[features]
+    y = df[target]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TRAINING_CONFIG['test_size'], random_state=TRAINING_CONFIG['random_state'])
+
+    if sales is not None and len(sales):
+        with timed('merge.sales_features'):
+            sold = pd.merge(sales[['PropertyID', 'Price']], df[['Property_ID'] + features],
+                            left_on='PropertyID', right_on='Property_ID')
+        X_train = pd.concat([X_train, sold[features]], ignore_index=True)
+        y_train = pd.concat([y_train, sold['Price'].rename(target)], ignore_index=True)
+        artifact['trained_sales'] = len(sales)
+
+    poly_features = PolynomialFeatures(degree=TRAINING_CONFIG['poly_degree'])
+    X_train_poly = poly_features.fit_transform(X_train)
+    X_test_poly = poly_features.transform(X_test)
+    rf = RandomForestRegressor(n_estimators=TRAINING_CONFIG['rf_estimators'],
+                               random_state=TRAINING_CONFIG['random_state'], n_jobs=n_jobs)
+
+    # 1. Linear, 2. Polynomial and 3. Random Forest fit side by side; the forest uses every core
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        jobs = {
+            'lr': pool.submit(LinearRegression().fit, X_train, y_train),
+            'poly': pool.submit(LinearRegression().fit, X_train_poly, y_train),
+            'rf': pool.submit(rf.fit, X_train, y_train)
+        }
+        models = {name: job.result() for name, job in jobs.items()}
+    # Serving predicts a row at a time, where joblib dispatch only adds overhead
+    models['rf'].set_params(n_jobs=None)
+
+    artifact['models'] = models
+    artifact['metrics'] = {
+        'lr': evaluate(models['lr'], X_test, y_test),
+        'poly': evaluate(models['poly'], X_test_poly, y_test),
+        'rf': evaluate(models['rf'], X_test, y_test)
+    }
+    artifact['poly_features'] = poly_features
+    artifact['fingerprint'] = dataset_fingerprint(data_path)
+    return artifact
+
+def train_in_subprocess(data_path, sales=None):
+    """train_models in a fresh `python -m ml_engine --retrain` process, returning its artifact.
+
+    The child imports this module and its few dependencies only, not the
+    serving app (as a multiprocessing spawn would re-import app.py, building
+    the engines, the store and the indexes again before training). The sales
+    and the artifact go through pickle files in a temporary directory.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        sales_path, artifact_path = os.path.join(tmp, 'sales.pkl'), os.path.join(tmp, 'artifact.pkl')
+        with open(sales_path, 'wb') as f:
+            pickle.dump(sales, f, protocol=pickle.HIGHEST_PROTOCOL)
+        subprocess.run([sys.executable, '-m', 'ml_engine', '--retrain', os.path.abspath(data_path), sales_path, artifact_path],
+                       cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        with open(artifact_path, 'rb') as f:
+            return pickle.load(f)
+
+def _retrain_main(data_path, sales_path, artifact_path):
+    with open(sales_path, 'rb') as f:
+        sales = pickle.load(f)
+    artifact = train_models(data_path, sales)
+    with open(artifact_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def grow_forest(rf, X, y, n_trees, max_online_trees, seed):
+    """Copy of rf with n_trees more trees fitted on (X, y).
+
+    The copy shares the existing (read-only) trees with rf. Trees past the
+    originally trained ones are online trees; beyond max_online_trees the
+    oldest are dropped, so the forest follows recent sales.
+    """
+    params = dict(rf.get_params(), n_estimators=n_trees, random_state=seed, n_jobs=None, warm_start=False)
+    grown = RandomForestRegressor(**params).fit(X, y)
+    n_base = TRAINING_CONFIG['rf_estimators']
+    online = (rf.estimators_[n_base:] + grown.estimators_)[-max_online_trees:]
+    forest = copy.copy(rf)
+    forest.estimators_ = rf.estimators_[:n_base] + online
+    forest.n_estimators = len(forest.estimators_)
+    return forest
+
+def online_update(artifact, sold, replay):
+    """Artifact with the mini-batch `sold` (features plus sale Price) absorbed into the forest.
+
+    The batch is scored by the current forest before it is learned, so the
+    online metrics are prequential: R2/MAE/MSE over the last
+    ONLINE_CONFIG['window'] sales, and drift as that MAE over the test MAE.
+    """
+    features, target = TRAINING_CONFIG['features'], TRAINING_CONFIG['target']
+    rf = artifact['models']['rf']
+    state = artifact.get('online', {'batches': 0, 'sales': 0, 'actual': [], 'predicted': []})
+
+    window = ONLINE_CONFIG['window']
+    actual = (state['actual'] + sold['Price'].tolist())[-window:]
+    predicted = (state['predicted'] + rf.predict(sold[features]).tolist())[-window:]
+
+    X = pd.concat([sold[features], replay[features]], ignore_index=True)
+    y = pd.concat([sold['Price'].rename(target), replay[target]], ignore_index=True)
+    forest = grow_forest(rf, X, y, ONLINE_CONFIG['trees_per_batch'], ONLINE_CONFIG['max_online_trees'],
+                         seed=TRAINING_CONFIG['random_state'] + state['batches'] + 1)
+
+    state = {'batches': state['batches'] + 1, 'sales': state['sales'] + len(sold),
+             'actual': actual, 'predicted': predicted}
+    online = {
+        'R2': round(r2_score(actual, predicted), 4) if len(actual) > 1 else None,
+        'MAE': round(mean_absolute_error(actual, predicted), 2),
+        'MSE': round(mean_squared_error(actual, predicted), 2),
+        'batches': state['batches'],
+        'sales': state['sales'],
+        'trees': forest.n_estimators
+    }
+    test_mae = artifact['metrics']['rf']['MAE']
+    online['drift'] = round(online['MAE'] / test_mae, 4) if test_mae else None
+
+    updated = dict(artifact, online=state)
+    updated['models'] = dict(artifact['models'], rf=forest)
+    updated['metrics'] = dict(artifact['metrics'], online=online)
+    return updated
 
 class MLEngine:
-    def __init__(self, data_path='data/LandSphere_India_Dataset_5000_Rows.csv'):
+    def __init__(self, data_path='data/LandSphere_India_Dataset_5000_Rows.csv', cache_dir='data/model_cache', lazy=True):
         self.data_path = data_path
-        self.models = {}
-        self.metrics = {}
-        self.poly_features = PolynomialFeatures(degree=2)
-        self.load_and_train()
+        self.cache_dir = cache_dir
+        # models, metrics and poly_features live in one artifact dict that is
+        # replaced as a whole, so a retrain swap is a single reference assignment
+        self._artifact = None
+        self._lock = threading.Lock()
+        self._training = None
+        self._retrainer = ThreadPoolExecutor(max_workers=1)
+        self._dataset_mtime = None
+        # Sales waiting for the next online mini-batch, and the one thread that applies them
+        self._pending = []
+        self._online = ThreadPoolExecutor(max_workers=1)
+        # Property features for the online updates, read once per dataset: (fingerprint, frame by Property_ID)
+        self._frame = None
+        # Under serve.py only one worker is the trainer: it absorbs sales, retrains and writes the
+        # model cache; the others load what it writes. saved counts its writes, in memory shared
+        # with the workers forked after this (as ListingFeed.latest)
+        self.trainer = True
+        self.saved = multiprocessing.Value('q', 0)
+        self._loaded_save = 0
+        # Models are loaded (or trained) on first use, not at import time of app.py
+        if not lazy:
+            self.ensure_loaded()
+
+    @property
+    def models(self):
+        self.ensure_loaded()
+        return self._artifact['models']
+
+    @property
+    def compiled(self):
+        """The models as flat arrays (compiled_models), predicting exactly as the sklearn ones"""
+        self.ensure_loaded()
+        return self._artifact['compiled']
+
+    @property
+    def version(self):
+        """The served models, named alike in every process that serves them (for caches of model output):
+        their dataset fingerprint, the sales they were trained on and the online batches absorbed since"""
+        artifact = self._artifact
+        if artifact is None:
+            return 'unloaded'
+        batches = artifact.get('online', {}).get('batches', 0)
+        return f"{(artifact['fingerprint'] or 'none')[:12]}-{artifact.get('trained_sales', 0)}-{batches}"
+
+    @property
+    def metrics(self):
+        self.ensure_loaded()
+        return self._artifact['metrics']
+
+    @property
+    def poly_features(self):
+        self.ensure_loaded()
+        return self._artifact['poly_features']
 
-    def load_and_train(self):
+    def ensure_loaded(self):
+        """Load the cached models for this dataset, training and caching them on a miss"""
+        if self._artifact is not None:
+            return
+        with self._lock:
+            if self._artifact is None and not self.load_cached():
+                self.load_and_train()
+                self.save_cached()
+
+    def _install(self, artifact):
+        # Compiled next to the models they come from, so both swap in one assignment
+        self._artifact = dict(artifact, compiled=compile_models(artifact['models'], artifact['poly_features']))
+        if os.path.exists(self.data_path):
+            self._dataset_mtime = os.path.getmtime(self.data_path)
+
+    def _cache_path(self, fingerprint):
+        return os.path.join(self.cache_dir, f'mlengine-{fingerprint[:24]}.pkl')
+
+    @instrument('ml.load_cached')
+    def load_cached(self):
+        artifact = self._read_cached()
+        if artifact is None:
+            return False
+        self._install(artifact)
+        return True
+
+    def _read_cached(self):
         if not os.path.exists(self.data_path):
-            print(f"Data file {self.data_path} not found.")
+            return None
+        path = self._cache_path(dataset_fingerprint(self.data_path))
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable model cache {path}: {e}")
+            return None
+
+    @instrument('ml.save_cached')
+    def save_cached(self):
+        artifact = self._artifact
+        if not artifact or not artifact['models']:
             return
+        # The compiled models are rebuilt on load rather than stored twice
+        artifact = {key: value for key, value in artifact.items() if key != 'compiled'}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(artifact['fingerprint'])
+        # Write then rename, so concurrent workers never read a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        # Artifacts for older fingerprints are never loaded again
+        for name in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, name)
+            if name.startswith('mlengine-') and name.endswith('.pkl') and stale != path:
+                os.remove(stale)
+        with self.saved.get_lock():
+            self.saved.value += 1
+            # This process already serves what it wrote
+            self._loaded_save = self.saved.value
 
-        df = pd.read_csv(self.data_path)
-        
-        # Features: Area_SqFt, Year_Built, Growth_Rate, Risk_Score
-        # Target: Current_Price
-        X = df[['Area_SqFt', 'Year_Built', 'Growth_Rate', 'Risk_Score']]
-        y = df['Current_Price']
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        # 1. Linear Regression
-        lr = LinearRegression()
-        lr.fit(X_train, y_train)
-        self.models['lr'] = lr
-        self.evaluate('lr', lr, X_test, y_test)
-
-        # 2. Polynomial Regression
-        X_train_poly = self.poly_features.fit_transform(X_train)
-        X_test_poly = self.poly_features.transform(X_test)
-        poly_model = LinearRegression()
-        poly_model.fit(X_train_poly, y_train)
-        self.models['poly'] = poly_model
-        self.evaluate('poly', poly_model, X_test_poly, y_test)
-
-        # 3. Random Forest
-        rf = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf.fit(X_train, y_train)
-        self.models['rf'] = rf
-        self.evaluate('rf', rf, X_test, y_test)
-
-    def evaluate(self, name, model, X_test, y_test):
-        y_pred = model.predict(X_test)
-        self.metrics[name] = {
-            'R2': round(r2_score(y_test, y_pred), 4),
-            'MAE': round(mean_absolute_error(y_test, y_pred), 2),
-            'MSE': round(mean_squared_error(y_test, y_pred), 2)
-        }
+    @instrument('ml.follow')
+    def follow(self):
+        """Load the models the trainer saved last, if this process has not loaded them yet.
+        Returns True if it did."""
+        saved = self.saved.value
+        if saved == self._loaded_save:
+            return False
+        artifact = self._read_cached()
+        if artifact is None:
+            return False
+        with self._lock:
+            self._install(artifact)
+            self._loaded_save = saved
+        return True
+
+    def load_and_train(self, sales=None):
+        self._install(train_models(self.data_path, sales))
+
+    def retrain_async(self, sales=None):
+        """Retrain in a separate worker process and swap the new models in when done.
+
+        The current models keep serving meanwhile. Returns the training future;
+        a call while a retrain is already running returns that one.
+        """
+        with self._lock:
+            if self._training is not None and not self._training.done():
+                return self._training
+            training = self._training = self._retrainer.submit(train_in_subprocess, self.data_path, sales)
+        # Outside the lock: a future that is already done runs the callback at once
+        training.add_done_callback(self._install_trained)
+        return training
+
+    def _install_trained(self, future):
+        try:
+            artifact = future.result()
+        except Exception as e:
+            print(f"Retraining failed: {e}")
+            return
+        if artifact['models']:
+            # Under the lock, so an online update computed from the old models cannot replace these
+            with self._lock:
+                self._install(artifact)
+            self.save_cached()
+
+    def observe_sale(self, property_id, price):
+        """Record a completed sale for the online model updates.
+
+        Every ONLINE_CONFIG['batch_size'] sales are handed to partial_update()
+        on the background update thread; returns its future, or None while the
+        batch is still filling. A process that is not the trainer leaves the
+        sale to the trainer and loads the trainer's newest saved models instead.
+        """
+        if not self.trainer:
+            return self._online.submit(self.follow) if self.saved.value != self._loaded_save else None
+        with self._lock:
+            self._pending.append((int(property_id), float(price)))
+            if len(self._pending) < ONLINE_CONFIG['batch_size']:
+                return None
+            batch, self._pending = self._pending, []
+        return self._online.submit(self.partial_update, batch)
+
+    @instrument('ml.partial_update')
+    def partial_update(self, sales):
+        """Absorb a mini-batch of (PropertyID, Price) sales into the served forest.
 
+        Costs a few small trees per batch instead of a full retrain. The updated
+        artifact is swapped in like a retrain; if a retrain swapped in first,
+        the batch is applied to its models instead.
+        """
+        self.ensure_loaded()
+        features = TRAINING_CONFIG['features']
+        frame = self._features_frame()
+        with timed('merge.sales_features'):
+            sold = pd.DataFrame(sales, columns=['PropertyID', 'Price']).join(frame[features], on='PropertyID', how='inner')
+        if sold.empty:
+            return
+        while True:
+            artifact = self._artifact
+            # Replayed training rows keep each new tree anchored to the whole market
+            replay = frame.sample(min(len(frame), ONLINE_CONFIG['replay_size']),
+                                  random_state=artifact.get('online', {}).get('batches', 0))
+            updated = online_update(artifact, sold, replay)
+            with self._lock:
+                if self._artifact is artifact:
+                    self._install(updated)
+                    break
+        # The cached forest can be hundreds of MB, so it is not rewritten per batch
+        if updated['online']['batches'] % ONLINE_CONFIG['save_every'] == 0:
+            self.save_cached()
+
+    def _features_frame(self):
+        # Only the update thread calls this; the dataset is read again only when it changed
+        fingerprint = self._artifact['fingerprint']
+        if self._frame is None or self._frame[0] != fingerprint:
+            columns = TRAINING_CONFIG['features'] + [TRAINING_CONFIG['target']]
+            df = load_properties(self.data_path)
+            self._frame = (fingerprint, df[['Property_ID'] + columns].set_index('Property_ID'))
+        return self._frame[1]
+
+    def needs_retrain(self, sales_count=0):
+        """True if the dataset file changed, the online updates drifted, or too many sales were not absorbed
+
+        Sales learned by partial_update() count as absorbed, so a trickle of
+        purchases never forces a full retrain on its own.
+        """
+        artifact = self._artifact
+        if artifact is None or not os.path.exists(self.data_path):
+            return False
+        if os.path.getmtime(self.data_path) != self._dataset_mtime:
+            # Touched; only a content change counts
+            if dataset_fingerprint(self.data_path) != artifact['fingerprint']:
+                return True
+            self._dataset_mtime = os.path.getmtime(self.data_path)
+        online = artifact['metrics'].get('online')
+        if (online and online['drift'] is not None and online['sales'] >= ONLINE_CONFIG['drift_min_sales']
+                and online['drift'] > ONLINE_CONFIG['drift_retrain_ratio']):
+            return True
+        absorbed = artifact.get('trained_sales', 0) + artifact.get('online', {}).get('sales', 0)
+        return abs(sales_count - absorbed) >= ONLINE_CONFIG['retrain_after_sales']
+
+    def watch(self, sales_count=None, load_sales=None, interval=60):
+        """Poll every interval seconds and retrain in the background when needs_retrain().
+        A process that is not the trainer polls for the trainer's saved models instead."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    if not self.trainer:
+                        self.follow()
+                    elif self.needs_retrain(sales_count() if sales_count else 0):
+                        self.retrain_async(load_sales() if load_sales else None)
+                except Exception as e:
+                    print(f"Retrain watcher error: {e}")
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+    @instrument('ml.predict')
     def predict(self, area, year_built, growth_rate, risk_score, years_ahead=1):
         # We predict the current price first, then apply growth
-        input_data = pd.DataFrame([[area, year_built, growth_rate, risk_score]], 
-                                   columns=['Area_SqFt', 'Year_Built', 'Growth_Rate', 'Risk_Score'])
-        
-        # Use RF for best accuracy usually
-        base_price_pred = self.models['rf'].predict(input_data)[0]
+        # Use RF for best accuracy usually; the compiled forest skips sklearn's per-call overhead
+        base_price_pred = self.compiled['rf'].predict_one([area, year_built, growth_rate, risk_score])
         
         # Future price prediction based on growth rate
         future_price = base_price_pred * ((1 + growth_rate) ** years_ahead)
@@ -78,7 +490,45 @@ class MLEngine:
             'investment_score': round((growth_rate * roi * 100) / risk_score, 2)
         }
 
+    @instrument('ml.predict_batch')
+    def predict_batch(self, areas, years_built, growth_rates, risk_scores, years_ahead):
+        """predict() for N inputs with a single model call.
+
+        Returns a dict of length-N arrays with the same keys as predict(), plus
+        'time_series': an (N, max(years_ahead) + 1) matrix of yearly prices
+        grown from the rounded current estimate, NaN past each row's horizon.
+        """
+        # Each column goes to float32 on its own, as in sklearn's conversion of a DataFrame
+        input_data = np.column_stack([np.asarray(column, dtype=np.float32)
+                                      for column in (areas, years_built, growth_rates, risk_scores)])
+        base_price_pred = self.compiled['rf'].predict(input_data)
+
+        growth_rates = np.asarray(growth_rates, dtype=float)
+        risk_scores = np.asarray(risk_scores, dtype=float)
+        years_ahead = np.asarray(years_ahead, dtype=int)
+        future_price = base_price_pred * ((1 + growth_rates) ** years_ahead)
+        roi = ((future_price - base_price_pred) / base_price_pred) * 100
+        current_price_est = np.round(base_price_pred, 2)
+
+        # Row i, column y: price after y years of growth
+        years = np.arange(years_ahead.max() + 1 if len(years_ahead) else 1)
+        series = np.round(current_price_est[:, None] * (1 + growth_rates[:, None]) ** years, 2)
+        series[years > years_ahead[:, None]] = np.nan
+
+        return {
+            'current_price_est': current_price_est,
+            'future_price': np.round(future_price, 2),
+            'roi': np.round(roi, 2),
+            'risk_score': risk_scores,
+            'investment_score': np.round((growth_rates * roi * 100) / risk_scores, 2),
+            'time_series': series
+        }
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ['--retrain']:
+        # Child of train_in_subprocess: data path, sales pickle, artifact pickle
+        _retrain_main(*sys.argv[2:5])
+        sys.exit(0)
     ml = MLEngine()
     print("Metrics:", ml.metrics)
     # Sample prediction
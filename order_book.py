@@ -0,0 +1,192 @@
+import heapq
+import threading
+from instrumentation import instrument
+from store import listing_ask
+
+# Properties are spread over this many independently locked shards of order books
+SHARDS = 64
+# A match refused by the store (another process got there first) is retried this often on a reloaded book
+MAX_RETRIES = 3
+
+class OrderBook:
+    """Open orders on one property in price-time priority.
+
+    Bids are a max-heap and asks a min-heap on price; between equal prices
+    the older order (lower OrderID) comes first. Filled and cancelled orders
+    leave self.orders at once and are popped from the heaps lazily, when they
+    reach the top.
+    """
+
+    def __init__(self, orders=()):
+        self.orders = {}  # OrderID -> open order
+        self.bids = []    # (-price, OrderID)
+        self.asks = []    # (price, OrderID)
+        for order in orders:
+            self.add(order)
+
+    def add(self, order):
+        if order['OrderID'] in self.orders:
+            return
+        self.orders[order['OrderID']] = order
+        if order['Side'] == 'Bid':
+            heapq.heappush(self.bids, (-order['Price'], order['OrderID']))
+        else:
+            heapq.heappush(self.asks, (order['Price'], order['OrderID']))
+
+    def discard(self, order_id):
+        self.orders.pop(order_id, None)
+
+    def keep_only(self, keep):
+        """Discard every order for which keep(order) is false"""
+        for order_id in [o['OrderID'] for o in self.orders.values() if not keep(o)]:
+            del self.orders[order_id]
+
+    def best(self, side):
+        heap = self.bids if side == 'Bid' else self.asks
+        while heap and heap[0][1] not in self.orders:
+            heapq.heappop(heap)
+        return self.orders[heap[0][1]] if heap else None
+
+    def depth(self, side, levels):
+        """Up to levels [price, open orders] pairs on one side, best price first"""
+        counts = {}
+        for order in self.orders.values():
+            if order['Side'] == side:
+                counts[order['Price']] = counts.get(order['Price'], 0) + 1
+        prices = sorted(counts, reverse=side == 'Bid')[:levels]
+        return [[price, counts[price]] for price in prices]
+
+class MatchingEngine:
+    """Continuous bid/ask matching on listings, one OrderBook per property.
+
+    Properties hash to SHARDS shards, each with its own lock and books: the
+    orders on one property are matched one at a time, in arrival order, and a
+    slow book load or match only holds up its own shard. The store writes are
+    still serialized, since every order and settlement is a BEGIN IMMEDIATE
+    transaction on the one SQLite database. Every order is recorded in the
+    store before it is matched, and every match settles in one store
+    transaction (store.settle) that re-checks both orders and the listing, so
+    two buyers can never both get a property. The trade price is the price of
+    the order that was waiting.
+
+    The books are this process's view of the store's open orders: loaded on
+    first use, kept current by this process's own orders, and brought up to
+    date from the listing change log (see order_changed and invalidate), so
+    forked workers trade in one market. The store reports the best opposite
+    order with every new order, and a book that disagrees is reloaded before
+    matching.
+    """
+
+    def __init__(self, store, shards=SHARDS):
+        self.store = store
+        self.shards = [(threading.Lock(), {}) for _ in range(shards)]
+
+    def _shard(self, property_id):
+        return self.shards[property_id % len(self.shards)]
+
+    def _load(self, property_id):
+        orders = self.store.open_orders(property_id)
+        listing = self.store.get_listing(property_id)
+        if listing and listing['Status'] == 'Available' and not any(o['Side'] == 'Ask' for o in orders):
+            orders.insert(0, listing_ask(listing))
+        return OrderBook(orders)
+
+    def _book(self, books, property_id):
+        book = books.get(property_id)
+        if book is None:
+            book = books[property_id] = self._load(property_id)
+        return book
+
+    @instrument('orders.place')
+    def place(self, property_id, user_id, side, price, date):
+        """Add a 'Bid' or 'Ask' and match it. Returns (order, trades, error)."""
+        lock, books = self._shard(property_id)
+        with lock:
+            book = self._book(books, property_id)
+            order, against, error = self.store.place_order(property_id, user_id, side, price)
+            if error:
+                return None, [], error
+            if side == 'Ask':
+                # The owner's new ask replaces their old one
+                book.keep_only(lambda o: o['Side'] != 'Ask')
+            book.add(order)
+            opposite = book.best('Ask' if side == 'Bid' else 'Bid')
+            if (opposite and opposite['OrderID']) != (against and against['OrderID']):
+                book = books[property_id] = self._load(property_id)
+            return order, self._match(books, property_id, date), None
+
+    def _match(self, books, property_id, date):
+        trades = []
+        book = books[property_id]
+        retries = 0
+        while True:
+            bid, ask = book.best('Bid'), book.best('Ask')
+            if bid is None or ask is None or bid['Price'] < ask['Price']:
+                return trades
+            price = ask['Price'] if ask['OrderID'] < bid['OrderID'] else bid['Price']
+            listing, error = self.store.settle(property_id, bid, ask, price, date)
+            if error:
+                retries += 1
+                if retries > MAX_RETRIES:
+                    return trades
+                book = books[property_id] = self._load(property_id)
+                continue
+            trades.append({'PropertyID': property_id, 'BuyerID': bid['UserID'], 'SellerID': ask['UserID'],
+                           'Price': price, 'BidID': bid['OrderID'], 'AskID': ask['OrderID']})
+            # As in the store: the filled bid, the seller's asks and the buyer's other bids all close
+            book.keep_only(lambda o: o['Side'] == 'Bid' and o['UserID'] != bid['UserID'])
+
+    @instrument('orders.buy')
+    def buy(self, property_id, buyer_id, date):
+        """Take the ask at its price (store.buy), in turn with the property's other orders"""
+        lock, books = self._shard(property_id)
+        with lock:
+            listing, error = self.store.buy(property_id, buyer_id, date)
+            if listing is not None:
+                books.pop(property_id, None)
+            return listing, error
+
+    @instrument('orders.cancel')
+    def cancel(self, order_id, user_id):
+        """Cancel an open order of user_id's. Returns (order, error)."""
+        order = self.store.get_order(order_id)
+        if order is None:
+            return None, 'Order not found or not open'
+        lock, books = self._shard(order['PropertyID'])
+        with lock:
+            order, error = self.store.cancel_order(order_id, user_id)
+            if order is not None and order['PropertyID'] in books:
+                books[order['PropertyID']].discard(order_id)
+            return order, error
+
+    def book(self, property_id, levels=10):
+        """Best bid and ask and up to levels price levels per side"""
+        lock, books = self._shard(property_id)
+        with lock:
+            book = self._book(books, property_id)
+            bid, ask = book.best('Bid'), book.best('Ask')
+            return {'PropertyID': property_id,
+                    'best_bid': bid['Price'] if bid else None,
+                    'best_ask': ask['Price'] if ask else None,
+                    'bids': book.depth('Bid', levels),
+                    'asks': book.depth('Ask', levels)}
+
+    def order_changed(self, property_id, order_id):
+        """A bid was placed or cancelled, here or in another process"""
+        lock, books = self._shard(property_id)
+        with lock:
+            book = books.get(property_id)
+            if book is None:
+                return
+            # Re-read even an order the book holds: the change may be its cancellation
+            order = self.store.get_order(order_id)
+            if order is not None and order['Status'] == 'Open':
+                book.add(order)
+            else:
+                book.discard(order_id)
+
+    def invalidate(self, property_id):
+        """The listing changed hands or price: reload its book when next used"""
+        lock, books = self._shard(property_id)
+        with lock:
+            books.pop(property_id, None)
@@ -0,0 +1,224 @@
+import bisect
+import threading
+from datetime import date
+from instrumentation import instrument
+
+RESOLUTIONS = ('day', 'month', 'year')
+HISTORY_CONFIG = {
+    # Rolling aggregates cover this many buckets, ending at each bucket
+    'windows': {'day': 30, 'month': 12, 'year': 3},
+    'max_points': 5000  # points one history call returns at most (the newest)
+}
+
+def period_of(resolution, day):
+    """The bucket index of a date: days since year 1, months since year 0, or the year"""
+    if resolution == 'day':
+        return day.toordinal()
+    if resolution == 'month':
+        return day.year * 12 + day.month - 1
+    return day.year
+
+def period_label(resolution, period):
+    if resolution == 'day':
+        return date.fromordinal(period).isoformat()
+    if resolution == 'month':
+        return f"{period // 12:04d}-{period % 12 + 1:02d}"
+    return f"{period:04d}"
+
+def _median(values):
+    n = len(values)
+    return (values[(n - 1) // 2] + values[n // 2]) / 2
+
+def _median_with(median, count, value):
+    # Median of count values all equal to median, plus value
+    if count == 0:
+        return value
+    return (median + value) / 2 if count == 1 else median
+
+def _pct(new, old):
+    return round((new - old) / old * 100, 2) if old else None
+
+class Series:
+    """One city's (optionally one type's) sales at one resolution.
+
+    Only the buckets inside the rolling window (the last `window` periods)
+    keep their sales' price per sqft, sorted (bisect.insort) so a median is a
+    lookup; their sales are also kept sorted together for the rolling median.
+    When a sale opens a newer bucket, the rolling figures of the bucket before
+    it are frozen and the buckets that fall out of the window are compacted to
+    their median, sale count, total value and total price per sqft, so memory
+    grows with the number of buckets rather than the number of sales.
+
+    A late sale (older than the newest bucket) updates its own bucket and the
+    current window, and the frozen figures of the buckets whose window it
+    falls in are recomputed. A compacted bucket stands in for its sales as
+    that many sales at its median, so a sale arriving after its bucket left
+    the window keeps volumes, values and averages exact and moves the medians
+    only approximately.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        # period -> [sorted price/sqft (None once compacted), total value, total price/sqft, sales, median once compacted]
+        self.buckets = {}
+        self.periods = []         # sorted periods with sales
+        self.rolling = []         # sorted price/sqft of the sales in the window ending at the newest period
+        self.frozen = {}          # period -> (rolling median, rolling volume) as of that period's end
+
+    def add(self, period, price_per_sqft, price):
+        newest = self.periods[-1] if self.periods else period
+        if period > newest:
+            # Freeze the bucket that stops being the newest, then slide the window to end at period
+            self.frozen[newest] = (_median(self.rolling), len(self.rolling))
+            for old in self.periods[bisect.bisect_left(self.periods, newest - self.window + 1):
+                                    bisect.bisect_left(self.periods, period - self.window + 1)]:
+                bucket = self.buckets[old]
+                for value in bucket[0]:
+                    del self.rolling[bisect.bisect_left(self.rolling, value)]
+                bucket[4], bucket[0] = _median(bucket[0]), None
+            newest = period
+        in_window = period > newest - self.window
+        bucket = self.buckets.get(period)
+        if bucket is None:
+            bucket = self.buckets[period] = [[] if in_window else None, 0.0, 0.0, 0, None]
+            bisect.insort(self.periods, period)
+        if bucket[0] is not None:
+            bisect.insort(bucket[0], price_per_sqft)
+        else:
+            bucket[4] = _median_with(bucket[4], bucket[3], price_per_sqft)
+        bucket[1] += price
+        bucket[2] += price_per_sqft
+        bucket[3] += 1
+        if in_window:
+            bisect.insort(self.rolling, price_per_sqft)
+        if period < newest:
+            for later in self.periods[bisect.bisect_left(self.periods, period):
+                                      bisect.bisect_left(self.periods, min(period + self.window, newest))]:
+                self.frozen[later] = self._window_at(later)
+
+    def _values(self, period):
+        # A bucket's price/sqft values; a compacted bucket's as its sale count times its median
+        values, _, _, count, median = self.buckets[period]
+        return values if values is not None else [median] * count
+
+    def _window_at(self, period):
+        # Rolling figures of the window ending at period, from the buckets (for late sales only)
+        periods = self.periods[bisect.bisect_left(self.periods, period - self.window + 1):
+                               bisect.bisect_right(self.periods, period)]
+        values = sorted(value for p in periods for value in self._values(p))
+        return _median(values), len(values)
+
+    def points(self, resolution, start=None, end=None, limit=None):
+        lo = 0 if start is None else bisect.bisect_left(self.periods, start)
+        hi = len(self.periods) if end is None else bisect.bisect_right(self.periods, end)
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        points = []
+        previous = None
+        if lo > 0:
+            previous = self._rolling_at(self.periods[lo - 1])[0]
+        for period in self.periods[lo:hi]:
+            values, value, ppsf_sum, count, median = self.buckets[period]
+            rolling_median, rolling_volume = self._rolling_at(period)
+            points.append({
+                'period': period_label(resolution, period),
+                'volume': count,
+                'value': round(value, 2),
+                'median_ppsf': round(_median(values) if values is not None else median, 2),
+                'avg_ppsf': round(ppsf_sum / count, 2),
+                'rolling_median_ppsf': round(rolling_median, 2),
+                'rolling_volume': rolling_volume,
+                'growth_pct': _pct(rolling_median, previous) if previous is not None else None
+            })
+            previous = rolling_median
+        return points
+
+    def _rolling_at(self, period):
+        if period == self.periods[-1]:
+            return _median(self.rolling), len(self.rolling)
+        return self.frozen[period]
+
+class PriceHistory:
+    """Price per sqft history of completed sales, per city and per (city, property type).
+
+    Every sale goes into a Series per resolution (RESOLUTIONS) for its city
+    and for its city and type, so a history query reads pre-aggregated
+    buckets (median, volume, total value, and rolling median, volume and
+    growth over HISTORY_CONFIG['windows']) instead of the transactions. The
+    series are built from the stored sales once, then fed one sale at a time
+    from the listing change log.
+    """
+
+    def __init__(self, dsa_engine, config=HISTORY_CONFIG):
+        self.engine = dsa_engine
+        self.config = config
+        self.series = {}  # (city code, type code or -1, resolution) -> Series
+        self._lock = threading.Lock()
+
+    @instrument('history.load')
+    def load(self, sales):
+        """Add past sales, a frame of PropertyID, Price, Date (store.sales())"""
+        sales = sales.assign(_day=sales['Date'].astype(str).str[:10]).sort_values('_day', kind='stable')
+        rows = self.engine.rows_of(sales['PropertyID'].to_numpy())
+        for row, price, day in zip(rows.tolist(), sales['Price'].to_numpy(dtype=float).tolist(), sales['_day']):
+            if row >= 0:
+                self._add(row, price, date.fromisoformat(day))
+
+    @instrument('history.record')
+    def record(self, property_id, price, day):
+        """Add one completed sale (day: a date)"""
+        row = self.engine.row_of(property_id)
+        if row is not None:
+            self._add(row, float(price), day)
+
+    def _add(self, row, price, day):
+        e = self.engine
+        price_per_sqft = price / float(e.areas[row])
+        city, type_code = int(e.city_codes[row]), int(e.type_codes[row])
+        with self._lock:
+            for resolution in RESOLUTIONS:
+                period = period_of(resolution, day)
+                for key in ((city, -1, resolution), (city, type_code, resolution)):
+                    series = self.series.get(key)
+                    if series is None:
+                        series = self.series[key] = Series(self.config['windows'][resolution])
+                    series.add(period, price_per_sqft, price)
+
+    @instrument('history.query')
+    def history(self, city, property_type=None, resolution='month', start=None, end=None, limit=None):
+        """A city's sales history, oldest first: one point per bucket with sales, between the
+        start and end dates (inclusive) if given, and the newest figures as a summary.
+        Returns None for an unknown city or property type."""
+        e = self.engine
+        codes = e.lookup_codes(e.city_names, city)
+        if not codes:
+            return None
+        city_code = codes[0]
+        type_code = -1
+        if property_type:
+            codes = e.lookup_codes(e.type_names, property_type)
+            if not codes:
+                return None
+            type_code = codes[0]
+        limit = min(limit or self.config['max_points'], self.config['max_points'])
+        with self._lock:
+            series = self.series.get((city_code, type_code, resolution))
+            points = series.points(resolution, start and period_of(resolution, start),
+                                   end and period_of(resolution, end), limit) if series else []
+        latest = points[-1] if points else None
+        return {
+            'city': e.city_names[city_code],
+            'type': e.type_names[type_code] if type_code >= 0 else None,
+            'resolution': resolution,
+            'points': points,
+            'summary': {
+                'period': latest and latest['period'],
+                'rolling_median_ppsf': latest and latest['rolling_median_ppsf'],
+                'rolling_volume': latest['rolling_volume'] if latest else 0,
+                'growth_pct': latest and latest['growth_pct']
+            }
+        }
+
+    def compare(self, cities, property_type=None, resolution='month', start=None, end=None, limit=None):
+        """history() for several cities, keyed by the names asked for"""
+        return {city: self.history(city, property_type, resolution, start, end, limit) for city in cities}
@@ -0,0 +1,186 @@
+import bisect
+import itertools
+
+# Entries per chunk of a PriceIndex; a chunk is split in two past twice this
+CHUNK_SIZE = 1000
+
+class _SortedPrices:
+    """Range, nearest and page queries over entries kept in (price, tiebreak) order.
+
+    Subclasses provide __len__, _key(i) -> (price, tiebreak) and _item(i).
+    Every query is a binary search plus a walk over the returned entries, so it
+    costs O(log n + page size).
+    """
+
+    def _bisect(self, key, right=False):
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            mid_key = self._key(mid)
+            if mid_key < key or (right and mid_key == key):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _bounds(self, min_price=None, max_price=None):
+        start = 0 if min_price is None else self._bisect((min_price, float('-inf')))
+        stop = len(self) if max_price is None else self._bisect((max_price, float('inf')))
+        return start, max(start, stop)
+
+    def count(self, min_price=None, max_price=None):
+        start, stop = self._bounds(min_price, max_price)
+        return stop - start
+
+    def range(self, min_price=None, max_price=None, offset=0, limit=None, descending=False):
+        """Entries with min_price <= price <= max_price, by price"""
+        start, stop = self._bounds(min_price, max_price)
+        if descending:
+            hi = stop - offset
+            lo = start if limit is None else max(start, hi - limit)
+            return [self._item(i) for i in range(hi - 1, lo - 1, -1)]
+        lo = start + offset
+        hi = stop if limit is None else min(stop, lo + limit)
+        return [self._item(i) for i in range(lo, hi)]
+
+    def nearest(self, target, k=1, max_distance=None):
+        """The k entries closest to target (within max_distance), closest first"""
+        right = self._bisect((target, float('-inf')))
+        left = right - 1
+        result = []
+        while len(result) < k:
+            left_gap = target - self._key(left)[0] if left >= 0 else float('inf')
+            right_gap = self._key(right)[0] - target if right < len(self) else float('inf')
+            gap = min(left_gap, right_gap)
+            if gap == float('inf') or (max_distance is not None and gap > max_distance):
+                break
+            if left_gap <= right_gap:
+                result.append(self._item(left))
+                left -= 1
+            else:
+                result.append(self._item(right))
+                right += 1
+        return result
+
+    def page(self, limit, cursor=None, descending=False, min_price=None, max_price=None):
+        """One page of entries in price order and the cursor for the next page (None at the end).
+
+        The cursor names the last entry returned, so pages stay consistent while
+        entries before it are added or removed.
+        """
+        start, stop = self._bounds(min_price, max_price)
+        if descending:
+            hi = stop if cursor is None else min(stop, self._bisect(decode_cursor(cursor)))
+            lo = max(start, hi - limit)
+            positions = range(hi - 1, lo - 1, -1)
+            more = lo > start
+        else:
+            lo = start if cursor is None else max(start, self._bisect(decode_cursor(cursor), right=True))
+            hi = min(stop, lo + limit)
+            positions = range(lo, hi)
+            more = hi < stop
+        items = [self._item(i) for i in positions]
+        next_cursor = encode_cursor(self._key(positions[-1])) if more and items else None
+        return items, next_cursor
+
+def encode_cursor(key):
+    return '%r:%d' % (float(key[0]), key[1])
+
+def decode_cursor(cursor):
+    price, tiebreak = cursor.rsplit(':', 1)
+    return (float(price), int(tiebreak))
+
+class PriceIndex(_SortedPrices):
+    """Mutable price-sorted index of (price, property_id) entries.
+
+    Entries are kept in sorted chunks of at most 2 * CHUNK_SIZE, so add() and
+    remove() shift one chunk (O(log n + CHUNK_SIZE)) instead of the whole
+    list. Positions are found through the chunks' running offsets, rebuilt on
+    the first query after a change (O(n / CHUNK_SIZE)).
+    """
+
+    def __init__(self, entries=()):
+        keys = sorted((float(p), int(i)) for p, i in entries)
+        self.chunks = [keys[i:i + CHUNK_SIZE] for i in range(0, len(keys), CHUNK_SIZE)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.size = len(keys)
+        self._offsets = None
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk
+
+    def _offset(self):
+        if self._offsets is None:
+            self._offsets = [0] + list(itertools.accumulate(len(chunk) for chunk in self.chunks))
+        return self._offsets
+
+    def _bisect(self, key, right=False):
+        find = bisect.bisect_right if right else bisect.bisect_left
+        c = find(self.maxes, key)
+        if c == len(self.chunks):
+            return self.size
+        return self._offset()[c] + find(self.chunks[c], key)
+
+    def _key(self, i):
+        offsets = self._offset()
+        c = bisect.bisect_right(offsets, i) - 1
+        return self.chunks[c][i - offsets[c]]
+
+    def _item(self, i):
+        return self._key(i)
+
+    def add(self, price, property_id):
+        key = (float(price), int(property_id))
+        if not self.chunks:
+            self.chunks, self.maxes = [[key]], [key]
+        else:
+            c = min(bisect.bisect_left(self.maxes, key), len(self.chunks) - 1)
+            chunk = self.chunks[c]
+            bisect.insort(chunk, key)
+            self.maxes[c] = chunk[-1]
+            if len(chunk) > 2 * CHUNK_SIZE:
+                self.chunks[c:c + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+                self.maxes[c:c + 1] = [chunk[CHUNK_SIZE - 1], chunk[-1]]
+        self.size += 1
+        self._offsets = None
+
+    def remove(self, price, property_id):
+        key = (float(price), int(property_id))
+        c = bisect.bisect_left(self.maxes, key)
+        if c == len(self.chunks):
+            return
+        chunk = self.chunks[c]
+        i = bisect.bisect_left(chunk, key)
+        if i == len(chunk) or chunk[i] != key:
+            return
+        del chunk[i]
+        if chunk:
+            self.maxes[c] = chunk[-1]
+        else:
+            del self.chunks[c], self.maxes[c]
+        self.size -= 1
+        self._offsets = None
+
+class StaticPriceIndex(_SortedPrices):
+    """Read-only index over a precomputed stable price order (row positions).
+
+    Entries are row positions; ties are ordered by row, matching a stable sort.
+    """
+
+    def __init__(self, prices, order):
+        self.prices = prices
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def _key(self, i):
+        row = int(self.order[i])
+        return (float(self.prices[row]), row)
+
+    def _item(self, i):
+        return int(self.order[i])
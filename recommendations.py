@@ -0,0 +1,242 @@
+import heapq
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import instrument
+
+RECOMMENDATION_CONFIG = {
+    'horizon_years': 5,      # the listing's Growth_Rate is compounded over this many years
+    'top_k': 50,             # listings served per table
+    'slack': 2,              # tables hold top_k * slack listings, so a sale rarely forces a refill
+    'rescore_seconds': 300,  # after a model swap, rescore at most this often
+    'chunk_size': 100_000    # rows per model call when scoring
+}
+LEVELS = ('all', 'region', 'state', 'city')
+
+class TopK:
+    """The best listings of one group, as a min-heap of (score, -PropertyID, row) with the worst at [0].
+
+    The heap always holds the best len(heap) listings of its group (ties to
+    the lower PropertyID); complete means it holds the whole group. The ranked
+    list is cached until the heap changes.
+    """
+
+    def __init__(self, entries, capacity, complete):
+        self.heap = list(entries)
+        heapq.heapify(self.heap)
+        self.capacity = capacity
+        self.complete = complete
+        self._ranked = None
+
+    def offer(self, entry):
+        if self.complete or (self.heap and entry > self.heap[0]):
+            heapq.heappush(self.heap, entry)
+            if len(self.heap) > self.capacity:
+                heapq.heappop(self.heap)
+                self.complete = False
+            self._ranked = None
+        # Otherwise listings outside the heap may outrank entry, so it cannot join
+
+    def discard(self, row):
+        for i, entry in enumerate(self.heap):
+            if entry[2] == row:
+                self.heap[i] = self.heap[-1]
+                self.heap.pop()
+                heapq.heapify(self.heap)
+                self._ranked = None
+                return
+
+    def ranked(self):
+        if self._ranked is None:
+            self._ranked = sorted(self.heap, reverse=True)
+        return self._ranked
+
+class RecommendationIndex:
+    """The best investments among the available listings, per region, state, city and property type.
+
+    A listing's score is its expected return per point of risk: the model's
+    fair value grown at its Growth_Rate for horizon_years, against its asking
+    Price, in percent, divided by its Risk_Score. Model values for every row
+    come from one vectorized pass (predict_batch in chunks); scores then only
+    need the listing price.
+
+    One TopK table per (level, code, type code), where level is one of LEVELS
+    and type code -1 means any type. buy and sell re-rank the one listing they
+    touch in its 8 tables; a table that sales shrink below top_k is refilled
+    from its group. A model swap is picked up by a background rescore.
+    Everything is built on first use, so the models load lazily as before.
+    """
+
+    def __init__(self, dsa_engine, availability, ml_engine, config=RECOMMENDATION_CONFIG):
+        self.engine = dsa_engine
+        self.availability = availability
+        self.ml_engine = ml_engine
+        self.config = config
+        self.capacity = config['top_k'] * config['slack']
+        self.growth = dsa_engine.df['Growth_Rate'].to_numpy(dtype=float)
+        self.risk = dsa_engine.df['Risk_Score'].to_numpy(dtype=float)
+        self.fair_value = None      # per row: the model's current price estimate
+        self.expected_value = None  # per row: fair_value after horizon_years of growth
+        self.tables = None
+        self._models = None         # the models the values came from
+        self._scored_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rescorer = ThreadPoolExecutor(max_workers=1)
+        self._rescoring = None
+
+    @instrument('recommend.model_values')
+    def _model_values(self):
+        models = self.ml_engine.models
+        df = self.engine.df
+        horizon = self.config['horizon_years']
+        fair_value, expected_value = np.empty(len(df)), np.empty(len(df))
+        for start in range(0, len(df), self.config['chunk_size']):
+            part = df.iloc[start:start + self.config['chunk_size']]
+            result = self.ml_engine.predict_batch(part['Area_SqFt'], part['Year_Built'], part['Growth_Rate'],
+                                                  part['Risk_Score'], np.full(len(part), horizon))
+            fair_value[start:start + len(part)] = result['current_price_est']
+            expected_value[start:start + len(part)] = result['future_price']
+        return models, fair_value, expected_value
+
+    def _rescore(self):
+        models, fair_value, expected_value = self._model_values()
+        with self._lock:
+            self._models, self.fair_value, self.expected_value = models, fair_value, expected_value
+            self.tables = self._build_tables()
+            self._scored_at = time.monotonic()
+
+    def _score(self, rows):
+        price = self.availability.listing_price[rows]
+        return (self.expected_value[rows] - price) / price * 100 / self.risk[rows]
+
+    def _entries(self, rows, scores, order):
+        top = order[:self.capacity]
+        return zip(scores[top].tolist(), (-self.engine.ids[rows[top]]).tolist(), rows[top].tolist())
+
+    def _level_codes(self, level, rows):
+        e = self.engine
+        return {'all': np.zeros(len(rows), dtype=np.int64), 'region': e.region_codes[rows],
+                'state': e.state_codes[rows], 'city': e.city_codes[rows]}[level]
+
+    @instrument('recommend.build')
+    def _build_tables(self):
+        # Sort the available listings once per (level, typed) family by group, then best first
+        rows = np.flatnonzero(self.availability.available)
+        scores = self._score(rows)
+        types = self.engine.type_codes[rows].astype(np.int64)
+        tables = {}
+        for level in LEVELS:
+            codes = self._level_codes(level, rows).astype(np.int64)
+            for typed in (False, True):
+                group = codes * (len(self.engine.type_names) + 1) + (types + 1 if typed else 0)
+                order = np.lexsort((self.engine.ids[rows], -scores, group))
+                for chunk in np.split(order, np.flatnonzero(np.diff(group[order])) + 1):
+                    if len(chunk):
+                        key = (level, int(codes[chunk[0]]), int(types[chunk[0]]) if typed else -1)
+                        tables[key] = TopK(self._entries(rows[chunk], scores[chunk], np.arange(len(chunk))),
+                                           self.capacity, len(chunk) <= self.capacity)
+        return tables
+
+    def _refill(self, key):
+        level, code, type_code = key
+        if level == 'city':
+            rows = self.engine.city_rows[code]
+            rows = rows[self.availability.available[rows]]
+        else:
+            rows = np.flatnonzero(self.availability.available)
+            rows = rows[self._level_codes(level, rows) == code]
+        if type_code >= 0:
+            rows = rows[self.engine.type_codes[rows] == type_code]
+        scores = self._score(rows)
+        order = np.lexsort((self.engine.ids[rows], -scores))
+        return TopK(self._entries(rows, scores, order), self.capacity, len(rows) <= self.capacity)
+
+    def _keys(self, row):
+        e = self.engine
+        codes = {'all': 0, 'region': e.region_codes[row], 'state': e.state_codes[row], 'city': e.city_codes[row]}
+        return [(level, int(codes[level]), type_code) for level in LEVELS
+                for type_code in (-1, int(e.type_codes[row]))]
+
+    def ensure_built(self):
+        if self.tables is None:
+            with self._build_lock:
+                if self.tables is None:
+                    self._rescore()
+
+    def refresh(self):
+        """Rescore in the background if the models were swapped (retrain or online update), rate-limited"""
+        if self.tables is None or self.ml_engine.models is self._models:
+            return
+        if self._rescoring is not None and not self._rescoring.done():
+            return
+        if time.monotonic() - self._scored_at >= self.config['rescore_seconds']:
+            self._rescoring = self._rescorer.submit(self._rescore)
+
+    @instrument('recommend.update')
+    def update(self, property_id):
+        """Re-rank one listing after buy or sell changed its availability or price"""
+        row = self.engine.row_of(property_id)
+        if self.tables is None or row is None:
+            return
+        with self._lock:
+            keys = self._keys(row)
+            for key in keys:
+                if key in self.tables:
+                    self.tables[key].discard(row)
+            if self.availability.available[row]:
+                entry = (float(self._score(np.array([row]))[0]), -int(self.engine.ids[row]), row)
+                for key in keys:
+                    self.tables.setdefault(key, TopK([], self.capacity, True)).offer(entry)
+            for key in keys:
+                table = self.tables.get(key)
+                if table is not None and not table.complete and len(table.heap) < self.config['top_k']:
+                    self.tables[key] = self._refill(key)
+
+    def _record(self, entry):
+        score, _, row = entry
+        e = self.engine
+        price = float(self.availability.listing_price[row])
+        return {
+            'Property_ID': int(e.ids[row]),
+            'Region': e.region_names[e.region_codes[row]],
+            'State': e.state_names[e.state_codes[row]],
+            'City': e.city_names[e.city_codes[row]],
+            'Property_Type': e.type_names[e.type_codes[row]],
+            'Area_SqFt': int(e.areas[row]),
+            'Price': round(price, 2),
+            'Fair_Value': round(float(self.fair_value[row]), 2),
+            'Expected_Value': round(float(self.expected_value[row]), 2),
+            'Expected_ROI': round((float(self.expected_value[row]) - price) / price * 100, 2),
+            'Growth_Rate': float(self.growth[row]),
+            'Risk_Score': int(self.risk[row]),
+            'Score': round(score, 4)
+        }
+
+    @instrument('recommend.top')
+    def top(self, region=None, state=None, city=None, property_type=None, limit=10):
+        """The best available listings in the most specific of city, state or region given (anywhere
+        without one), optionally of one property type; names match case-insensitively"""
+        self.ensure_built()
+        self.refresh()
+        e = self.engine
+        level, code = 'all', 0
+        for name, names, candidate in ((city, e.city_names, 'city'), (state, e.state_names, 'state'),
+                                       (region, e.region_names, 'region')):
+            if name:
+                codes = e.lookup_codes(names, name)
+                if not codes:
+                    return []
+                level, code = candidate, codes[0]
+                break
+        type_code = -1
+        if property_type:
+            codes = e.lookup_codes(e.type_names, property_type)
+            if not codes:
+                return []
+            type_code = codes[0]
+        with self._lock:
+            table = self.tables.get((level, code, type_code))
+            entries = table.ranked()[:min(limit, self.config['top_k'])] if table is not None else []
+            return [self._record(entry) for entry in entries]
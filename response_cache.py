@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import request, session, make_response, Response
+from instrumentation import timed
+
+CACHE_CONFIG = {
+    'max_bytes': 32 * 1024 * 1024,  # total size of the cached bodies; least recently used go first
+    'entry_overhead': 256           # bytes counted per entry on top of its body (key, headers)
+}
+
+class ResponseCache:
+    """Rendered GET responses by (endpoint, arguments, data version), with ETags and 304s.
+
+    version() returns the current data version: anything that can change a
+    cached response (a buy, a relist, a registration) must change it. Views
+    that read other state (the served models) pass their own version to
+    cached() instead. The ETag is that version plus a digest of the request's
+    key, so a conditional GET whose If-None-Match still matches is answered
+    304 Not Modified without running the view or reading the cache. Otherwise
+    the body cached for the key is served if it was rendered at the current
+    version; if not, the view runs and its 200 response replaces the entry.
+    Entries are kept in LRU order and evicted past config['max_bytes'].
+    """
+
+    def __init__(self, version, config=CACHE_CONFIG):
+        self.version = version
+        self.config = config
+        self.entries = OrderedDict()  # key -> (version, body, content type)
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def cached(self, per_user=False, when=None, version=None):
+        """Decorator for a GET view. per_user views (pages showing the session's user) are keyed by
+        user too; with when, only requests for which when() is true go through the cache; version
+        replaces the cache's version() for views that depend on something else."""
+        version_of = version or self.version
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if when is not None and not when():
+                    return view(*args, **kwargs)
+                key = (request.endpoint, tuple(sorted(kwargs.items())),
+                       tuple(sorted(request.args.items(multi=True))),
+                       session.get('user_id') if per_user else None)
+                version = str(version_of())
+                etag = f"{version}-{hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()}"
+                if request.if_none_match.contains(etag):
+                    return self._respond(Response(status=304), etag)
+
+                with self._lock:
+                    entry = self.entries.get(key)
+                    if entry is not None and entry[0] == version:
+                        self.entries.move_to_end(key)
+                        return self._respond(Response(entry[1], content_type=entry[2]), etag)
+
+                with timed('cache.miss'):
+                    response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                self._store(key, version, response.get_data(), response.content_type)
+                return self._respond(response, etag)
+            return wrapper
+        return decorator
+
+    def _respond(self, response, etag):
+        response.set_etag(etag)
+        # Browsers keep the body but ask again each time, and get a 304 while the data is unchanged
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _store(self, key, version, body, content_type):
+        cost = len(body) + self.config['entry_overhead']
+        if cost > self.config['max_bytes']:
+            return
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1]) + self.config['entry_overhead']
+            self.entries[key] = (version, body, content_type)
+            self.size += cost
+            while self.size > self.config['max_bytes']:
+                _, (_, evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted) + self.config['entry_overhead']
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
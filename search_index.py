@@ -0,0 +1,178 @@
+import bisect
+import numpy as np
+
+# Former and common names people still search by -> the dataset's name
+ALIASES = {
+    'Bangalore': 'Bengaluru', 'Gurgaon': 'Gurugram', 'Bombay': 'Mumbai', 'Madras': 'Chennai',
+    'Calcutta': 'Kolkata', 'Poona': 'Pune', 'Baroda': 'Vadodara', 'Benares': 'Varanasi',
+    'Banaras': 'Varanasi', 'Allahabad': 'Prayagraj', 'Mysore': 'Mysuru', 'Mangalore': 'Mangaluru',
+    'Hubli': 'Hubballi', 'Belgaum': 'Belagavi', 'Bellary': 'Ballari', 'Tumkur': 'Tumakuru',
+    'Shimoga': 'Shivamogga', 'Trivandrum': 'Thiruvananthapuram', 'Cochin': 'Kochi',
+    'Calicut': 'Kozhikode', 'Trichur': 'Thrissur', 'Quilon': 'Kollam', 'Alleppey': 'Alappuzha',
+    'Trichy': 'Tiruchirappalli', 'Tuticorin': 'Thoothukudi', 'Vizag': 'Visakhapatnam',
+    'Rajamundry': 'Rajahmundry', 'Simla': 'Shimla', 'Panjim': 'Panaji', 'Orissa': 'Odisha'
+}
+KINDS = ('region', 'state', 'city', 'type')
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance (a transposition counts as one edit), or max_distance + 1 if larger.
+
+    Only cells within max_distance of the diagonal are computed.
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    previous2, previous = None, [min(j, too_far) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        lo, hi = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = min(i, too_far)
+        for j in range(lo, hi + 1):
+            cost = a[i - 1] != b[j - 1]
+            best = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                best = min(best, previous2[j - 2] + 1)
+            current[j] = best
+        if min(current[lo - 1:hi + 1]) > max_distance:
+            return too_far
+        previous2, previous = previous, current
+    return min(previous[-1], too_far)
+
+def max_edits(text):
+    # Short names tolerate fewer typos, or every 4-letter query would match something
+    return 1 if len(text) <= 5 else 2
+
+def deletes(text, distance):
+    """Every string made by deleting up to distance characters from text"""
+    result = level = {text}
+    for _ in range(distance):
+        level = {word[:i] + word[i + 1:] for word in level for i in range(len(word))}
+        result = result | level
+    return result
+
+class SearchIndex:
+    """Prefix autocomplete and typo-tolerant lookup of regions, states, cities and property types.
+
+    Built once from the DSA engine's dictionaries; every query is answered from
+    in-memory structures, never by scanning the property table:
+    - prefix: a sorted list of keys (each full name, and the name from each
+      later word on, so "delhi" completes "New Delhi") searched by bisection;
+    - fuzzy: a symmetric-delete map (every key with up to max_edits()
+      characters removed) whose hits are verified by edit distance, so a
+      query only touches the few keys a typo could have come from.
+    Aliases (ALIASES) are indexed as extra keys of the entry they name.
+    """
+
+    def __init__(self, dsa_engine):
+        e = dsa_engine
+        self.entries = []
+        self.exact = {}    # normalized name or alias -> entry ids, in KINDS order
+        keys = []          # (key, match rank: 0 name, 1 later word of a name, 2 alias; entry id)
+        self.variants = {}  # deletion variant -> full keys
+
+        def first_rows(codes, n):
+            # The first dataset row of each code, like .iloc[0] of a filtered frame
+            _, first = np.unique(codes, return_index=True)
+            rows = np.full(n, -1)
+            rows[np.asarray(codes)[first]] = first
+            return rows
+
+        counts = {kind: np.bincount(codes, minlength=len(names)) for kind, codes, names in
+                  (('region', e.region_codes, e.region_names), ('state', e.state_codes, e.state_names),
+                   ('city', e.city_codes, e.city_names), ('type', e.type_codes, e.type_names))}
+        state_rows = first_rows(e.state_codes, len(e.state_names))
+        city_rows = first_rows(e.city_codes, len(e.city_names))
+
+        for kind, names in (('region', e.region_names), ('state', e.state_names),
+                            ('city', e.city_names), ('type', e.type_names)):
+            for code, name in enumerate(names):
+                entry = {'type': kind, 'name': name, 'count': int(counts[kind][code])}
+                if kind == 'state' and state_rows[code] >= 0:
+                    entry['region'] = e.region_names[e.region_codes[state_rows[code]]]
+                elif kind == 'city' and city_rows[code] >= 0:
+                    row = city_rows[code]
+                    entry['region'] = e.region_names[e.region_codes[row]]
+                    entry['state'] = e.state_names[e.state_codes[row]]
+                self.entries.append(entry)
+
+        by_name = {}
+        for entry_id, entry in enumerate(self.entries):
+            by_name.setdefault(normalize(entry['name']), []).append(entry_id)
+        names = [(key, ids, False) for key, ids in by_name.items()]
+        names += [(normalize(alias), by_name[normalize(target)], True) for alias, target in ALIASES.items()
+                  if normalize(target) in by_name and normalize(alias) not in by_name]
+
+        for key, ids, is_alias in names:
+            self.exact[key] = ids
+            words = key.split(' ')
+            for entry_id in ids:
+                keys.append((key, 2 if is_alias else 0, entry_id))
+                for start in range(1, len(words)):
+                    keys.append((' '.join(words[start:]), 2 if is_alias else 1, entry_id))
+            for variant in deletes(key, max_edits(key)):
+                self.variants.setdefault(variant, []).append(key)
+
+        keys.sort()
+        self.keys = [key for key, _, _ in keys]
+        self.key_entries = [(rank, entry_id) for _, rank, entry_id in keys]
+
+    def _rank(self, entry_id, *prefix):
+        return prefix + (-self.entries[entry_id]['count'], KINDS.index(self.entries[entry_id]['type']))
+
+    def complete(self, prefix, limit=10):
+        """Entries whose name (or a later word of it, or an alias) starts with prefix.
+
+        Name matches come before matches of a later word, then aliases; ties go
+        to bigger entries.
+        If nothing starts with prefix, the closest fuzzy matches are returned.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        matches = {}
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            rank, entry_id = self.key_entries[i]
+            matches[entry_id] = min(rank, matches.get(entry_id, rank))
+            i += 1
+        if not matches:
+            return self.fuzzy(prefix, limit)
+        ranked = sorted(matches, key=lambda entry_id: self._rank(entry_id, matches[entry_id]))
+        return [self.entries[entry_id] for entry_id in ranked[:limit]]
+
+    def fuzzy(self, query, limit=10):
+        """Entries within max_edits() typos of query (names and aliases), closest and biggest first"""
+        query = normalize(query)
+        if not query:
+            return []
+        allowed = max_edits(query)
+        candidates = set()
+        for variant in deletes(query, allowed):
+            candidates.update(self.variants.get(variant, ()))
+        best = {}
+        for key in candidates:
+            distance = edit_distance(query, key, allowed)
+            if distance <= allowed:
+                for entry_id in self.exact[key]:
+                    best[entry_id] = min(distance, best.get(entry_id, distance))
+        ranked = sorted(best, key=lambda entry_id: self._rank(entry_id, best[entry_id]))
+        return [self.entries[entry_id] for entry_id in ranked[:limit]]
+
+    def resolve(self, query, kinds=KINDS):
+        """The single best entry of one of kinds for a search box query, or None.
+
+        An exact (case-insensitive) name or alias wins, cities before states as
+        the marketplace search always did; otherwise the closest fuzzy match.
+        """
+        query = normalize(query)
+        exact = [entry_id for entry_id in self.exact.get(query, ()) if self.entries[entry_id]['type'] in kinds]
+        if exact:
+            return self.entries[min(exact, key=lambda entry_id: (-(self.entries[entry_id]['type'] == 'city'),
+                                                                KINDS.index(self.entries[entry_id]['type'])))]
+        for entry in self.fuzzy(query, limit=len(self.entries)):
+            if entry['type'] in kinds:
+                return entry
+        return None
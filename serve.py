@@ -0,0 +1,102 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from werkzeug.serving import make_server
+
+def warm(app_module):
+    """Build everything the workers only read, once, before they are forked"""
+    started = time.perf_counter()
+    app_module.ml_engine.ensure_loaded()
+    app_module.recommendations.ensure_built()
+    for city in app_module.dsa_engine.city_names:
+        app_module.dsa_engine.get_city_data(city)
+    print(f"Engines, models and indexes ready in {time.perf_counter() - started:.1f}s")
+
+def run_worker(app_module, sock, threads, slot):
+    # Connections and threads do not carry over a fork: open fresh ones here
+    app_module.store.reset_connections()
+    # The worker in slot 0 trains and saves the models; the others load what it saves
+    app_module.ml_engine.trainer = slot == 0
+    app_module.listing_feed.sync()
+    app_module.ml_engine.watch(sales_count=app_module.store.sales_count, load_sales=app_module.store.sales)
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app_module.app, threaded=threads, fd=sock.fileno())
+    server.serve_forever()
+
+def fork_worker(app_module, sock, threads, slot):
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            run_worker(app_module, sock, threads, slot)
+        finally:
+            os._exit(1)
+    return pid
+
+def serve(host, port, workers, threads=True):
+    """Pre-fork server: build the app's read-only state once, then fork workers that share it.
+
+    The property table (memory-mapped columns), the models, and the DSA,
+    search and recommendation indexes are built in this process; gc.freeze()
+    keeps the collector from touching them, so the forked workers share their
+    pages copy-on-write and each worker only adds what it writes. All workers
+    accept on one listening socket. Writes go through SQLite, and every
+    worker replays the listing change log (see store.ListingFeed), so buys
+    and relists made in one worker show up in all of them. One worker, the
+    one in slot 0, updates, retrains and saves the models (see
+    MLEngine.trainer). Workers that die are replaced in their slot.
+    """
+    # Tells app.py to leave the retrain watcher to the workers
+    os.environ['LANDSPHERE_PREFORK'] = '1'
+    import app as app_module
+    warm(app_module)
+
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+    gc.freeze()
+
+    children = {}  # pid -> slot
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for slot in range(workers):
+        children[fork_worker(app_module, sock, threads, slot)] = slot
+    print(f"Serving on http://{host}:{sock.getsockname()[1]} with {workers} workers (pids {sorted(children)})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if not stopping and slot is not None:
+            print(f"Worker {pid} exited with status {status}; starting a new one")
+            children[fork_worker(app_module, sock, threads, slot)] = slot
+    sock.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve LandSphere with pre-forked workers sharing the engines")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--no-threads', action='store_true', help="handle one request at a time per worker")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, threads=not args.no_threads)
+    sys.exit(0)
@@ -0,0 +1,422 @@
+import pandas as pd
+import sqlite3
+import json
+import threading
+import multiprocessing
+import os
+from instrumentation import instrument
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    UserID INTEGER PRIMARY KEY,
+    Username TEXT UNIQUE NOT NULL,
+    Password TEXT,
+    Email TEXT,
+    Balance NUMERIC,
+    FullName TEXT,
+    Phone TEXT,
+    Address TEXT
+);
+CREATE TABLE IF NOT EXISTS listings (
+    PropertyID INTEGER PRIMARY KEY,
+    Price NUMERIC,
+    OwnerID INTEGER,
+    Status TEXT
+);
+CREATE INDEX IF NOT EXISTS listings_owner ON listings (OwnerID);
+CREATE INDEX IF NOT EXISTS listings_status ON listings (Status);
+CREATE TABLE IF NOT EXISTS transactions (
+    TransactionID INTEGER PRIMARY KEY,
+    UserID INTEGER,
+    PropertyID INTEGER,
+    Date TEXT,
+    Price NUMERIC,
+    Type TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_user ON transactions (UserID);
+CREATE TABLE IF NOT EXISTS listing_changes (
+    Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    PropertyID INTEGER,
+    Price NUMERIC,
+    Status TEXT,
+    OrderID INTEGER,
+    Date TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    OrderID INTEGER PRIMARY KEY AUTOINCREMENT,
+    PropertyID INTEGER,
+    UserID INTEGER,
+    Side TEXT,
+    Price NUMERIC,
+    Status TEXT
+);
+CREATE INDEX IF NOT EXISTS orders_open ON orders (PropertyID, Status, Side, Price);
+"""
+
+USER_COLUMNS = ['UserID', 'Username', 'Password', 'Email', 'Balance', 'FullName', 'Phone', 'Address']
+LISTING_COLUMNS = ['PropertyID', 'Price', 'OwnerID', 'Status']
+TRANSACTION_COLUMNS = ['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type']
+ORDER_COLUMNS = ['OrderID', 'PropertyID', 'UserID', 'Side', 'Price', 'Status']
+
+class MarketStore:
+    """SQLite-backed Users/Listings/Transactions with indexed point reads and atomic trades."""
+
+    def __init__(self, db_path='data/landsphere.db'):
+        self.db_path = db_path
+        self.created = not os.path.exists(db_path)
+        self._local = threading.local()
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        # Databases created before the order book (or sale dates in the log) lack these change log columns
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(listing_changes)')}
+        for column, kind in (('OrderID', 'INTEGER'), ('Date', 'TEXT')):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE listing_changes ADD COLUMN {column} {kind}')
+
+    def reset_connections(self):
+        # A forked worker must not use the parent's SQLite connections; it opens its own
+        self._local = threading.local()
+
+    def connection(self):
+        # One connection per thread; autocommit unless a write opens BEGIN IMMEDIATE
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _write(self):
+        return _WriteTransaction(self.connection())
+
+    @instrument('io.import_csvs')
+    def import_csvs(self, users_csv, listings_csv, transactions_csv):
+        """One-shot import of the legacy CSV files, replacing the table contents."""
+        sources = [('users', users_csv, USER_COLUMNS),
+                   ('listings', listings_csv, LISTING_COLUMNS),
+                   ('transactions', transactions_csv, TRANSACTION_COLUMNS)]
+        with self._write() as conn:
+            # Processes build their indexes from the imported listings, not from older changes
+            conn.execute('DELETE FROM listing_changes')
+            conn.execute('DELETE FROM orders')
+            for table, path, columns in sources:
+                conn.execute(f'DELETE FROM {table}')
+                if not os.path.exists(path):
+                    continue
+                df = pd.read_csv(path)
+                df = df[[c for c in columns if c in df.columns]]
+                df = df.astype(object).where(df.notna(), None)
+                placeholders = ','.join('?' * len(df.columns))
+                conn.executemany(f'INSERT INTO {table} ({",".join(df.columns)}) VALUES ({placeholders})',
+                                 df.itertuples(index=False, name=None))
+
+    # --- Users ---
+
+    @instrument('store.get_user')
+    def get_user(self, user_id):
+        row = self.connection().execute('SELECT * FROM users WHERE UserID = ?', (user_id,)).fetchone()
+        return dict(row) if row else None
+
+    @instrument('store.authenticate')
+    def authenticate(self, username, password):
+        row = self.connection().execute('SELECT * FROM users WHERE Username = ? AND Password = ?',
+                                        (username, password)).fetchone()
+        return dict(row) if row else None
+
+    @instrument('store.create_user')
+    def create_user(self, username, password, email, balance, fullname, phone, address):
+        """Insert a user and return the new UserID, or None if the username is taken."""
+        with self._write() as conn:
+            if conn.execute('SELECT 1 FROM users WHERE Username = ?', (username,)).fetchone():
+                return None
+            new_id = conn.execute('SELECT COALESCE(MAX(UserID), 0) + 1 FROM users').fetchone()[0]
+            conn.execute('INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (new_id, username, password, email, balance, fullname, phone, address))
+        return new_id
+
+    def last_user_id(self):
+        return self.connection().execute('SELECT COALESCE(MAX(UserID), 0) FROM users').fetchone()[0]
+
+    @instrument('store.users_frame')
+    def users_frame(self, columns=USER_COLUMNS, user_ids=None):
+        query = f'SELECT {",".join(columns)} FROM users'
+        if user_ids is None:
+            return pd.read_sql_query(query, self.connection())
+        return pd.read_sql_query(query + ' WHERE UserID IN (SELECT value FROM json_each(?))',
+                                 self.connection(), params=(json.dumps([int(u) for u in user_ids]),))
+
+    # --- Listings ---
+
+    @instrument('store.get_listing')
+    def get_listing(self, property_id):
+        row = self.connection().execute('SELECT * FROM listings WHERE PropertyID = ?', (property_id,)).fetchone()
+        return dict(row) if row else None
+
+    @instrument('store.available_listings')
+    def available_listings(self):
+        return pd.read_sql_query("SELECT * FROM listings WHERE Status = 'Available'", self.connection())
+
+    @instrument('store.listings_for')
+    def listings_for(self, property_ids):
+        """Listing rows for the given PropertyIDs, ordered by PropertyID"""
+        return pd.read_sql_query('SELECT * FROM listings WHERE PropertyID IN (SELECT value FROM json_each(?)) ORDER BY PropertyID',
+                                 self.connection(), params=(json.dumps([int(p) for p in property_ids]),))
+
+    @instrument('store.owned_listings')
+    def owned_listings(self, owner_id):
+        return pd.read_sql_query('SELECT * FROM listings WHERE OwnerID = ?', self.connection(), params=(owner_id,))
+
+    @instrument('store.changes_since')
+    def changes_since(self, seq):
+        """Listing changes after seq as (Seq, PropertyID, Price, Status, OrderID, Date), oldest first.
+        Date is the transaction date of a sale ('Sold' by a buy or a match), None otherwise."""
+        return self.connection().execute('SELECT Seq, PropertyID, Price, Status, OrderID, Date FROM listing_changes WHERE Seq > ? ORDER BY Seq',
+                                         (seq,)).fetchall()
+
+    def last_change(self):
+        return self.connection().execute('SELECT COALESCE(MAX(Seq), 0) FROM listing_changes').fetchone()[0]
+
+    def last_listing_change(self):
+        """Seq of the newest change to a listing itself, skipping bids placed or cancelled ('Order')"""
+        # Walks the log backwards from the newest Seq and stops at the first listing change
+        return self.connection().execute("SELECT COALESCE(MAX(Seq), 0) FROM (SELECT Seq FROM listing_changes "
+                                         "WHERE Status != 'Order' ORDER BY Seq DESC LIMIT 1)").fetchone()[0]
+
+    # --- Transactions ---
+
+    @instrument('store.transactions')
+    def transactions(self, user_id=None):
+        if user_id is None:
+            return pd.read_sql_query('SELECT * FROM transactions', self.connection())
+        return pd.read_sql_query('SELECT * FROM transactions WHERE UserID = ?', self.connection(), params=(user_id,))
+
+    @instrument('store.transactions_page')
+    def transactions_page(self, limit, cursor=None):
+        """Up to limit transactions after TransactionID cursor, and the cursor for the next page (None at the end)"""
+        df = pd.read_sql_query('SELECT * FROM transactions WHERE TransactionID > ? ORDER BY TransactionID LIMIT ?',
+                               self.connection(), params=(int(cursor or 0), limit + 1))
+        if len(df) > limit:
+            df = df.iloc[:limit]
+            return df, str(int(df['TransactionID'].iloc[-1]))
+        return df, None
+
+    @instrument('store.sales')
+    def sales(self):
+        """Completed purchases as (PropertyID, Price, Date), oldest first"""
+        return pd.read_sql_query("SELECT PropertyID, Price, Date FROM transactions WHERE Type = 'Buy' ORDER BY TransactionID",
+                                 self.connection())
+
+    @instrument('store.sales_count')
+    def sales_count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM transactions WHERE Type = 'Buy'").fetchone()[0]
+
+    @instrument('store.buy')
+    def buy(self, property_id, buyer_id, date):
+        """Settle a purchase at the asking price atomically.
+
+        Debits the buyer, credits the seller, flips the listing and records the
+        Buy (and Sell) transactions in one commit. Returns (listing, error).
+        """
+        with self._write() as conn:
+            row = conn.execute('SELECT * FROM listings WHERE PropertyID = ?', (property_id,)).fetchone()
+            if row is None or row['Status'] != 'Available':
+                return None, 'Not available'
+            listing = dict(row)
+            if buyer_id == int(listing['OwnerID']):
+                return None, 'You already own this land'
+            _transfer(conn, listing, buyer_id, listing['Price'], date)
+            return listing, None
+
+    # --- Orders ---
+
+    @instrument('store.get_order')
+    def get_order(self, order_id):
+        row = self.connection().execute('SELECT * FROM orders WHERE OrderID = ?', (order_id,)).fetchone()
+        return dict(row) if row else None
+
+    @instrument('store.open_orders')
+    def open_orders(self, property_id):
+        """Open bids and asks on a property, oldest first"""
+        rows = self.connection().execute("SELECT * FROM orders WHERE PropertyID = ? AND Status = 'Open' ORDER BY OrderID",
+                                         (property_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    @instrument('store.place_order')
+    def place_order(self, property_id, user_id, side, price):
+        """Record an open 'Bid' or 'Ask' on a property. Returns (order, best opposite order, error).
+
+        An ask is the owner's asking price: it replaces their earlier ask and
+        puts the listing on the market at that price. Owners cannot bid on their
+        own property. The best opposite order is read in the same transaction,
+        so the caller can tell whether its order book is current.
+        """
+        with self._write() as conn:
+            row = conn.execute('SELECT * FROM listings WHERE PropertyID = ?', (property_id,)).fetchone()
+            if row is None:
+                return None, None, 'Property not found'
+            owner_id = int(row['OwnerID'])
+            if side == 'Bid' and user_id == owner_id:
+                return None, None, 'You already own this land'
+            if side == 'Ask':
+                if user_id != owner_id:
+                    return None, None, 'Property not found or not owned by you'
+                conn.execute("UPDATE orders SET Status = 'Cancelled' WHERE PropertyID = ? AND Side = 'Ask' AND Status = 'Open'",
+                             (property_id,))
+                conn.execute("UPDATE listings SET Status = 'Available', Price = ? WHERE PropertyID = ?", (price, property_id))
+            order_id = conn.execute("INSERT INTO orders (PropertyID, UserID, Side, Price, Status) VALUES (?, ?, ?, ?, 'Open')",
+                                    (property_id, user_id, side, price)).lastrowid
+            # Relisting changes the listing; a bid only changes the order book
+            _log_change(conn, property_id, price, 'Available' if side == 'Ask' else 'Order', order_id)
+            order = dict(zip(ORDER_COLUMNS, (order_id, property_id, user_id, side, price, 'Open')))
+            if side == 'Ask':
+                best = conn.execute("SELECT * FROM orders WHERE PropertyID = ? AND Side = 'Bid' AND Status = 'Open' "
+                                    'ORDER BY Price DESC, OrderID LIMIT 1', (property_id,)).fetchone()
+            else:
+                best = conn.execute("SELECT * FROM orders WHERE PropertyID = ? AND Side = 'Ask' AND Status = 'Open' "
+                                    'ORDER BY Price, OrderID LIMIT 1', (property_id,)).fetchone()
+                if best is None and row['Status'] == 'Available':
+                    return order, listing_ask(dict(row)), None
+            return order, dict(best) if best else None, None
+
+    @instrument('store.cancel_order')
+    def cancel_order(self, order_id, user_id):
+        """Cancel one of user_id's open orders; cancelling an ask takes the listing off the market.
+        Returns (order, error)."""
+        with self._write() as conn:
+            row = conn.execute('SELECT * FROM orders WHERE OrderID = ?', (order_id,)).fetchone()
+            if row is None or row['UserID'] != user_id or row['Status'] != 'Open':
+                return None, 'Order not found or not open'
+            order = dict(row)
+            conn.execute("UPDATE orders SET Status = 'Cancelled' WHERE OrderID = ?", (order_id,))
+            if order['Side'] == 'Ask':
+                # Owned but not for sale, as after a purchase
+                conn.execute("UPDATE listings SET Status = 'Sold' WHERE PropertyID = ?", (order['PropertyID'],))
+                _log_change(conn, order['PropertyID'], order['Price'], 'Withdrawn', order_id)
+            else:
+                _log_change(conn, order['PropertyID'], order['Price'], 'Order', order_id)
+            order['Status'] = 'Cancelled'
+            return order, None
+
+    @instrument('store.settle')
+    def settle(self, property_id, bid, ask, price, date):
+        """Fill a bid against an ask at price atomically, like buy.
+
+        Both orders must still be open (an ask with OrderID 0 stands for a
+        listing put on the market without an order, see listing_ask) and the
+        asker must still own the listing, so a match computed from an out of
+        date order book is refused rather than settled. Returns (listing, error).
+        """
+        with self._write() as conn:
+            row = conn.execute('SELECT * FROM listings WHERE PropertyID = ?', (property_id,)).fetchone()
+            if row is None or row['Status'] != 'Available' or int(row['OwnerID']) != ask['UserID']:
+                return None, 'Not available'
+            if bid['UserID'] == ask['UserID']:
+                return None, 'You already own this land'
+            if not ask['OrderID'] and row['Price'] != ask['Price']:
+                return None, 'Not available'
+            order_ids = [order['OrderID'] for order in (bid, ask) if order['OrderID']]
+            placeholders = ','.join('?' * len(order_ids))
+            still_open = conn.execute(f"SELECT COUNT(*) FROM orders WHERE Status = 'Open' AND OrderID IN ({placeholders})",
+                                      order_ids).fetchone()[0]
+            if still_open != len(order_ids):
+                return None, 'Order no longer open'
+            conn.execute(f"UPDATE orders SET Status = 'Filled' WHERE OrderID IN ({placeholders})", order_ids)
+            listing = dict(row)
+            _transfer(conn, listing, bid['UserID'], price, date)
+            return listing, None
+
+def listing_ask(listing):
+    """The ask of a listing on the market with no ask order (imported listings): OrderID 0, older than any order"""
+    return dict(zip(ORDER_COLUMNS, (0, listing['PropertyID'], int(listing['OwnerID']), 'Ask', listing['Price'], 'Open')))
+
+def _transfer(conn, listing, buyer_id, price, date):
+    property_id = listing['PropertyID']
+    seller_id = int(listing['OwnerID'])
+    # Balance Restriction Removed per User Request
+    # 1. Update Buyer Balance
+    conn.execute('UPDATE users SET Balance = Balance - ? WHERE UserID = ?', (price, buyer_id))
+    # 2. Update Seller Balance (if not platform)
+    if seller_id != 0:
+        conn.execute('UPDATE users SET Balance = Balance + ? WHERE UserID = ?', (price, seller_id))
+    # 3. Update Listing; the seller's asks and the buyer's own bids lapse with the ownership
+    conn.execute("UPDATE listings SET Status = 'Sold', OwnerID = ?, Price = ? WHERE PropertyID = ?", (buyer_id, price, property_id))
+    conn.execute("UPDATE orders SET Status = 'Cancelled' WHERE PropertyID = ? AND Status = 'Open' AND (Side = 'Ask' OR UserID = ?)",
+                 (property_id, buyer_id))
+    _log_change(conn, property_id, price, 'Sold', date=date)
+    # 4. Record Transaction for Buyer, and for Seller if not platform
+    new_trans_id = conn.execute('SELECT COALESCE(MAX(TransactionID), 0) + 1 FROM transactions').fetchone()[0]
+    conn.execute('INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)',
+                 (new_trans_id, buyer_id, property_id, date, price, 'Buy'))
+    if seller_id != 0:
+        conn.execute('INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)',
+                     (new_trans_id + 1, seller_id, property_id, date, price, 'Sell'))
+
+def _log_change(conn, property_id, price, status, order_id=None, date=None):
+    # Same transaction as the listing write, so the log never disagrees with the listings table
+    conn.execute('INSERT INTO listing_changes (PropertyID, Price, Status, OrderID, Date) VALUES (?, ?, ?, ?, ?)',
+                 (property_id, price, status, order_id, date))
+
+class ListingFeed:
+    """Applies the store's listing changes (buys, relists and orders) to a process's in-memory indexes.
+
+    Every process serving the same database (the workers forked by serve.py)
+    follows the listing_changes log in order, its own writes included, so
+    their availability and recommendation indexes all converge. The newest
+    Seq is also kept in shared memory, created before the fork: sync() only
+    queries SQLite when a write has happened since its last look.
+
+    listings_seen is the Seq of the newest applied change to a listing (a buy,
+    relist or withdrawal). Bids placed or cancelled move seen but not
+    listings_seen, so views that only read listings can key on it.
+    """
+
+    def __init__(self, store, apply):
+        self.store = store
+        self.apply = apply  # apply(property_id, price, status, order_id, date)
+        self.seen = store.last_change()
+        self.listings_seen = store.last_listing_change()
+        self.latest = multiprocessing.Value('q', self.seen)
+        self._lock = threading.Lock()
+
+    def publish(self):
+        """Announce this process's committed write to the others, and apply it here"""
+        last = self.store.last_change()
+        with self.latest.get_lock():
+            self.latest.value = max(self.latest.value, last)
+        self.sync()
+
+    def sync(self):
+        if self.seen >= self.latest.value:
+            return
+        with self._lock:
+            for seq, property_id, price, status, order_id, date in self.store.changes_since(self.seen):
+                self.apply(property_id, price, status, order_id, date)
+                self.seen = seq
+                if status != 'Order':
+                    self.listings_seen = seq
+
+class _WriteTransaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error.
+
+    IMMEDIATE takes the write lock up front so the check-then-write in buy()
+    cannot interleave with another writer.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+        return False
+
+
+if __name__ == "__main__":
+    store = MarketStore()
+    store.import_csvs('data/Users.csv', 'data/Listings.csv', 'data/Transactions.csv')
+    print("Imported CSVs into", store.db_path)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import os
+from columnar import write_columnar, load_properties, columnar_path, open_table, derived_orders
+
+def test_columnar_roundtrip(tmp_path):
+    csv_path = os.path.join(tmp_path, 'props.csv')
+    df = pd.DataFrame({
+        'Property_ID': [1, 2, 3],
+        'Region': ['West', 'South', 'West'],
+        'State': ['Maharashtra', 'Karnataka', 'Maharashtra'],
+        'City': ['Pune', 'Bengaluru', 'Mumbai'],
+        'Property_Type': ['Residential', 'Commercial', 'Residential'],
+        'Area_SqFt': [1000, 2000, 1500],
+        'Price_Per_SqFt': [5000, 9000, 20000],
+        'Current_Price': [5000000, 18000000, 30000000],
+        'Year_Built': [2019, 2020, 2021],
+        'Growth_Rate': [0.05, 0.1, 0.12],
+        'Risk_Score': [3, 5, 7]
+    })
+    df.to_csv(csv_path, index=False)
+    write_columnar(df, columnar_path(csv_path))
+
+    table = open_table(csv_path)
+    assert table is not None
+    assert list(table.orders['price_order']) == [0, 1, 2]
+
+    loaded = load_properties(csv_path)
+    assert list(loaded.columns) == list(df.columns)
+    assert loaded['City'].astype(str).tolist() == df['City'].tolist()
+    assert loaded['Current_Price'].tolist() == df['Current_Price'].tolist()
+
+def test_derived_orders_in_chunks_match_full_sorts():
+    rng = np.random.default_rng(0)
+    prices = rng.integers(0, 50, 1000)
+    cities, types = rng.integers(0, 7, 1000).astype(np.int16), rng.integers(0, 3, 1000).astype(np.int16)
+    orders = derived_orders(prices, cities, types, 7, 3, chunk=64)
+    assert np.array_equal(orders['price_order'], np.argsort(prices, kind='stable'))
+    assert np.array_equal(orders['city_order'], np.argsort(cities, kind='stable'))
+    assert np.array_equal(orders['city_type_order'], np.lexsort((prices, cities.astype(np.int64) * 3 + types)))
+    assert np.array_equal(orders['city_offsets'], np.concatenate([[0], np.cumsum(np.bincount(cities, minlength=7))]))
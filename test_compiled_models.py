@@ -0,0 +1,30 @@
+import os
+import numpy as np
+import pandas as pd
+from data_gen import generate_dataset
+from ml_engine import train_models, TRAINING_CONFIG
+from compiled_models import compile_models, TRAVERSAL_ROWS
+
+def test_compiled_models_predict_bit_identically(tmp_path):
+    path = os.path.join(tmp_path, 'props.csv')
+    generate_dataset(1500, path=path)
+    artifact = train_models(path, n_jobs=1)
+    models, poly_features = artifact['models'], artifact['poly_features']
+    compiled = compile_models(models, poly_features)
+
+    rng = np.random.default_rng(0)
+    n = 3 * TRAVERSAL_ROWS
+    X = pd.DataFrame({'Area_SqFt': rng.integers(200, 20000, n), 'Year_Built': rng.integers(1950, 2030, n),
+                      'Growth_Rate': rng.uniform(-0.05, 0.3, n), 'Risk_Score': rng.integers(1, 11, n)},
+                     columns=TRAINING_CONFIG['features'])
+    expected = {'lr': models['lr'].predict(X), 'poly': models['poly'].predict(poly_features.transform(X)),
+                'rf': models['rf'].predict(X)}
+    for name, model in compiled.items():
+        # Both batch paths: flat-array traversal for small batches, per-tree evaluation for big ones
+        assert np.array_equal(model.predict(X.to_numpy()), expected[name]), name
+        assert np.array_equal(model.predict(X.to_numpy()[:TRAVERSAL_ROWS // 2]), expected[name][:TRAVERSAL_ROWS // 2]), name
+        for i in range(0, n, 7):
+            single = X.iloc[[i]]
+            reference = (models[name].predict(poly_features.transform(single)) if name == 'poly'
+                         else models[name].predict(single))[0]
+            assert model.predict_one(X.to_numpy()[i]) == reference, (name, i)
@@ -0,0 +1,28 @@
+import pandas as pd
+import os
+from data_gen import generate_dataset, TIER_1, STATE_CITY_MAP
+from columnar import load_properties
+
+def test_chunked_generation_is_seeded_and_consistent(tmp_path):
+    path = os.path.join(tmp_path, 'props.csv')
+    generate_dataset(1000, 20, 50, seed=7, chunk_size=300, path=path)
+    first = pd.read_csv(path)
+    generate_dataset(1000, 20, 50, seed=7, chunk_size=300, path=path)
+    df = pd.read_csv(path)
+    pd.testing.assert_frame_equal(first, df)
+
+    assert df['Property_ID'].tolist() == list(range(1, 1001))
+    assert load_properties(path)['City'].astype(str).tolist() == df['City'].tolist()
+    assert df[df['City'].isin(TIER_1) & (df['Property_Type'] == 'Residential')]['Price_Per_SqFt'].min() >= 8000 * 0.8 - 1
+
+    listings = pd.read_csv(os.path.join(tmp_path, 'Listings.csv'))
+    transactions = pd.read_csv(os.path.join(tmp_path, 'Transactions.csv'))
+    sold = listings[listings['Status'] == 'Sold']
+    assert len(sold) == len(transactions) == 50
+    assert sorted(sold['PropertyID']) == sorted(transactions['PropertyID'])
+    assert transactions['UserID'].between(1, 20).all()
+    assert len(pd.read_csv(os.path.join(tmp_path, 'Users.csv'))) == 20
+
+    cities = pd.read_csv(os.path.join(tmp_path, 'Cities.csv'))
+    assert list(zip(cities['State'], cities['City'])) == [(s, c) for s in STATE_CITY_MAP for c in STATE_CITY_MAP[s]]
+    assert cities['Latitude'].between(6, 37).all() and cities['Longitude'].between(68, 98).all()
@@ -0,0 +1,130 @@
+import os
+import pytest
+from data_gen import generate_dataset
+from dsa_engine import DSAEngine, NEARBY_CITIES_LIMIT, RESULT_LIMIT
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp('dsa'), 'props.csv')
+    generate_dataset(3000, path=path)
+    return DSAEngine(path)
+
+def test_city_data_is_cached_per_city(engine):
+    city = engine.city_names[0]
+    first = engine.get_city_data(city)
+    assert engine.get_city_data(city) == first
+    assert first == engine._city_analytics(engine.lookup_codes(engine.city_names, city), city)
+    # Case-insensitive match, echoing the requested name
+    lower = engine.get_city_data(city.lower())
+    assert lower['name'] == city.lower() and lower['count'] == first['count']
+    assert engine.get_city_data('Atlantis') == {}
+    assert engine.get_multi_city_data([city, ' Atlantis ']) == {city: first, 'Atlantis': {}}
+    # Callers own what they get: the cached lists and dicts are not shared
+    first['nearby'].append('Atlantis')
+    first['type_distribution'].clear()
+    assert engine.get_city_data(city) == engine._city_analytics(engine.lookup_codes(engine.city_names, city), city)
+
+def test_nearby_cities_cross_states_by_distance(engine):
+    # Delhi's neighbourhoods and Gurugram are a few km apart, across a state border
+    nearby = engine.bfs_nearby_cities('Gurugram', radius_km=40, with_hops=True)
+    assert 'Dwarka' in [city for city, _ in nearby]
+    distances = engine.city_distances('Gurugram', [city for city, _ in nearby])
+    assert list(distances.values()) == sorted(distances.values()) and max(distances.values()) <= 40
+    assert engine.bfs_nearby_cities('gurugram', k=3) == [city for city, _ in nearby[:3]]
+    assert all(hops <= 2 for _, hops in engine.bfs_nearby_cities('Gurugram', max_hops=2, with_hops=True))
+    assert engine.bfs_nearby_cities('Atlantis', radius_km=100) == []
+
+    route = engine.shortest_path('Gurugram', 'Chennai')
+    assert route['path'][0] == 'Gurugram' and route['path'][-1] == 'Chennai'
+    assert route['distance_km'] >= engine.city_distances('Gurugram', ['Chennai'])['Chennai']
+    assert engine.shortest_path('Gurugram', 'Atlantis') == {}
+
+    results = engine.search_nearby('Haryana', 'Gurugram', 'Residential', 5e7, radius_km=40)
+    assert results and {p['City'] for p in results} <= {'Gurugram'} | {city for city, _ in nearby}
+
+def test_unbounded_nearby_query_returns_a_neighbourhood(engine):
+    city = engine.city_names[0]
+    everywhere = engine.bfs_nearby_cities(city, max_hops=len(engine.city_names))
+    assert len(everywhere) > NEARBY_CITIES_LIMIT
+    # With no max_hops, limit, radius_km or k: the nearest NEARBY_CITIES_LIMIT by hops, not the whole country
+    assert engine.bfs_nearby_cities(city) == everywhere[:NEARBY_CITIES_LIMIT]
+
+PROPERTY_KEYS = {'Property_ID': int, 'City': str, 'Property_Type': str, 'Area_SqFt': int,
+                 'Price_Per_SqFt': float, 'Current_Price': float}
+
+def reference_properties(df):
+    """The Java CLI's output for rows of df: the first RESULT_LIMIT, formatted like its JSON"""
+    return [{'Property_ID': int(r.Property_ID), 'City': r.City, 'Property_Type': r.Property_Type,
+             'Area_SqFt': int(r.Area_SqFt), 'Price_Per_SqFt': round(float(r.Price_Per_SqFt), 2),
+             'Current_Price': round(float(r.Current_Price), 2)} for r in df.head(RESULT_LIMIT).itertuples()]
+
+def assert_property_shape(properties):
+    for prop in properties:
+        assert set(prop) == set(PROPERTY_KEYS)
+        assert all(isinstance(prop[key], kind) for key, kind in PROPERTY_KEYS.items())
+
+def test_filter_search_and_sort_match_the_java_cli(engine):
+    df = engine.df
+    by_price = df.sort_values('Current_Price', kind='stable')
+    budget = float(by_price['Current_Price'].iloc[len(df) // 2])
+
+    # Filter: every property within budget, cheapest first, capped at RESULT_LIMIT
+    cheap = engine.linear_search(budget)
+    assert_property_shape(cheap)
+    assert cheap == reference_properties(by_price[by_price['Current_Price'] <= budget])
+    assert len(cheap) == RESULT_LIMIT
+    prices = [p['Current_Price'] for p in cheap]
+    assert prices == sorted(prices)
+    few = engine.linear_search(by_price['Current_Price'].iloc[4])
+    assert len(few) >= 5 and few == reference_properties(by_price[by_price['Current_Price'] <= by_price['Current_Price'].iloc[4]])
+    assert engine.linear_search(0) == []
+
+    # Sort: the stable ascending order, and its reverse for descending
+    assert engine.merge_sort() == reference_properties(by_price)
+    assert engine.merge_sort(descending=True) == reference_properties(by_price.iloc[::-1])
+
+    # Search: a property priced within 1000 of the target, or {}
+    target = by_price.iloc[7]
+    found = engine.binary_search(float(target['Current_Price']) + 500)
+    assert_property_shape([found])
+    assert abs(found['Current_Price'] - target['Current_Price']) < 1000
+    assert engine.binary_search(-10 ** 9) == {}
+
+def test_city_data_matches_a_groupby(engine):
+    df = engine.df
+    city = df['City'].value_counts().index[0]
+    rows = df[df['City'] == city]
+    data = engine.get_city_data(city)
+    assert set(data) == {'name', 'state', 'avg_price', 'count', 'nearby', 'type_distribution', 'type_avg_prices'}
+    assert data['name'] == city and data['state'] == rows['State'].iloc[0] and data['count'] == len(rows)
+    assert data['avg_price'] == pytest.approx(rows['Current_Price'].mean())
+    assert data['type_distribution'] == rows['Property_Type'].value_counts().to_dict()
+    assert data['type_avg_prices'] == pytest.approx(rows.groupby('Property_Type')['Price_Per_SqFt'].mean().to_dict())
+    assert isinstance(data['nearby'], list) and city not in data['nearby']
+    for unknown in ('', 'Atlantis'):
+        assert engine.get_city_data(unknown) == {}
+
+def test_search_nearby_ranks_by_price_distance(engine):
+    df = engine.df
+    city = df['City'].value_counts().index[0]
+    state = df.loc[df['City'] == city, 'State'].iloc[0]
+    target = float(df.loc[df['City'] == city, 'Current_Price'].median())
+
+    results = engine.search_nearby(state, city, 'residential', target)
+    assert_property_shape(results)
+    cities = {city} | set(engine._nearby(city))
+    candidates = df[df['City'].isin(cities) & (df['Property_Type'] == 'Residential')
+                    & ((df['Current_Price'] - target).abs() <= target * 0.2)]
+    candidates = candidates.assign(gap=(candidates['Current_Price'] - target).abs()).sort_values(['gap', 'Property_ID'])
+    assert sorted(p['Property_ID'] for p in results) == sorted(candidates['Property_ID'].head(RESULT_LIMIT))
+    gaps = [abs(p['Current_Price'] - target) for p in results]
+    assert gaps == sorted(gaps)
+
+    # No city: the whole state; a wide margin reaches the cap
+    everywhere = engine.search_nearby(state, '', 'Residential', target, margin=1e12)
+    in_state = df[(df['State'] == state) & (df['Property_Type'] == 'Residential')]
+    assert len(everywhere) == min(RESULT_LIMIT, len(in_state))
+    assert {p['City'] for p in everywhere} <= set(in_state['City'])
+    assert len(engine.search_nearby('', city, 'Residential', target, margin=1e12, radius_km=5000)) == RESULT_LIMIT
+    assert engine.search_nearby('Atlantis', '', 'Residential', target) == []
+    assert engine.search_nearby(state, city, 'Castle', target) == []
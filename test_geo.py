@@ -0,0 +1,24 @@
+import numpy as np
+from geo import CityGeometry, haversine_km
+
+def test_nearest_matches_brute_force_and_routes_connect():
+    rng = np.random.default_rng(3)
+    # Two far-apart clusters, so only the spanning tree links them, and one city without coordinates
+    points = np.vstack([rng.uniform([10, 70], [14, 74], (30, 2)), rng.uniform([26, 90], [28, 92], (10, 2)), [[np.nan, np.nan]]])
+    geometry = CityGeometry(points)
+    lat, lon = points[:40].T
+    brute = haversine_km(lat[5], lon[5], lat, lon)
+
+    cities, km = geometry.nearest(5, k=4)
+    assert list(cities) == [c for c in np.argsort(brute) if c != 5][:4]
+    assert np.allclose(km, brute[cities])
+    cities, km = geometry.nearest(5, radius_km=150)
+    assert set(cities) == {c for c in range(40) if c != 5 and brute[c] <= 150}
+    assert list(km) == sorted(km)
+    assert len(geometry.nearest(40, k=3)[0]) == 0
+
+    km, path = geometry.route(0, 35)
+    assert path[0] == 0 and path[-1] == 35
+    assert np.isclose(km, sum(geometry.edges[tuple(sorted(edge))] for edge in zip(path, path[1:])))
+    assert km >= haversine_km(lat[0], lon[0], lat[35], lon[35]) - 1e-6
+    assert geometry.route(0, 40) == (np.inf, [])
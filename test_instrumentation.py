@@ -0,0 +1,50 @@
+import logging
+import pytest
+from flask import Flask
+from instrumentation import StageMetrics
+
+def test_histograms_errors_and_exposition():
+    metrics = StageMetrics(buckets=(0.01, 0.1))
+    metrics.observe('dsa.get_city_data', 0.005)
+    metrics.observe('dsa.get_city_data', 0.05)
+    with pytest.raises(ValueError):
+        with metrics.timed('store.buy'):
+            raise ValueError
+
+    text = metrics.render()
+    assert 'landsphere_stage_seconds_bucket{stage="dsa.get_city_data",le="0.01"} 1' in text
+    assert 'landsphere_stage_seconds_bucket{stage="dsa.get_city_data",le="+Inf"} 2' in text
+    assert 'landsphere_stage_seconds_count{stage="dsa.get_city_data"} 2' in text
+    assert 'landsphere_stage_errors_total{stage="store.buy"} 1' in text
+
+def test_slow_request_logs_stage_breakdown(caplog):
+    metrics = StageMetrics()
+    metrics.start_request()
+    metrics.observe('merge.listing_owners', 0.2)
+    with caplog.at_level(logging.WARNING, logger='landsphere.slow_requests'):
+        metrics.finish_request('marketplace', 'GET', 200, slow_threshold=0)
+    assert 'merge.listing_owners 200.0ms' in caplog.text
+    assert metrics.requests[('marketplace', 'GET', 200)] == 1
+    assert metrics.slow_requests == 1
+
+def test_tracked_requests_count_unhandled_errors():
+    metrics = StageMetrics()
+    app = Flask(__name__)
+    metrics.track_requests(app)
+    app.add_url_rule('/ok', 'ok', lambda: 'ok')
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    client = app.test_client()
+    assert client.get('/ok').status_code == 200
+    assert client.get('/boom').status_code == 500
+    assert metrics.requests[('ok', 'GET', 200)] == 1
+    assert metrics.requests[('boom', 'GET', 500)] == 1
+    assert metrics.errors['route.boom'] == 1
+    # Also when the exception propagates (testing), where Flask skips after_request
+    app.testing = True
+    with pytest.raises(RuntimeError):
+        client.get('/boom')
+    assert metrics.requests[('boom', 'GET', 500)] == 2
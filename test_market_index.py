@@ -0,0 +1,72 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data_gen import generate_dataset
+from dsa_engine import DSAEngine
+from market_index import AvailabilityIndex
+
+@pytest.fixture
+def market(tmp_path):
+    path = os.path.join(tmp_path, 'props.csv')
+    generate_dataset(2000, path=path)
+    engine = DSAEngine(path)
+    listings = pd.read_csv(os.path.join(tmp_path, 'Listings.csv'))
+    return engine, AvailabilityIndex(engine, listings[listings['Status'] == 'Available'])
+
+def expected_ids(engine, availability, city, max_price=None):
+    rows = np.flatnonzero((engine.df['City'] == city).to_numpy() & availability.available)
+    if max_price is not None:
+        rows = rows[availability.listing_price[rows] <= max_price]
+    return np.sort(engine.ids[rows]).tolist()
+
+def all_pages(availability, city, limit, **kwargs):
+    ids, cursors = [], []
+    cursor = None
+    while True:
+        page, cursor = availability.city_page(city, limit, cursor, **kwargs)
+        ids.extend(int(pid) for pid in page)
+        if cursor is None:
+            return ids, cursors
+        assert len(page) == limit and cursor == str(page[-1])
+        cursors.append(cursor)
+
+def test_cursor_pages_follow_property_id_order(market):
+    engine, availability = market
+    city = engine.df['City'].value_counts().index[0]
+    ids, cursors = all_pages(availability, city, 7)
+    assert ids == expected_ids(engine, availability, city) and cursors
+    budget = float(np.nanmedian(availability.listing_price))
+    assert all_pages(availability, city.upper(), 5, max_price=budget)[0] == expected_ids(engine, availability, city, budget)
+
+    # Sells and relists before and after the cursor show up on the following pages
+    first, cursor = availability.city_page(city, 7)
+    availability.remove(int(first[0]))
+    later = expected_ids(engine, availability, city)[10]
+    availability.remove(later)
+    rest, _ = availability.city_page(city, 1000, cursor)
+    assert later not in rest.tolist() and rest.tolist() == [pid for pid in expected_ids(engine, availability, city) if pid > int(cursor)]
+    availability.add(later, 1.0)
+    assert later in availability.city_page(city, 1000, cursor)[0].tolist()
+
+    page, cursor = availability.city_page('Atlantis', 10)
+    assert len(page) == 0 and cursor is None
+    with pytest.raises(ValueError):
+        availability.city_page(city, 10, 'not-an-id')
+
+def test_pages_stream_every_listing_once(market):
+    engine, availability = market
+    city = engine.df['City'].value_counts().index[0]
+    expected = expected_ids(engine, availability, city)
+    pages = list(availability.city_pages(city, 9))
+    assert [int(pid) for page in pages for pid in page] == expected
+    assert all(len(page) == 9 for page in pages[:-1])
+    # Price sorts stream in price order; a stream can resume from any page's cursor
+    pages = list(availability.city_pages(city, 9, sort_by='price_desc'))
+    prices = [availability.listing_price[engine.row_of(pid)] for page in pages for pid in page]
+    assert prices == sorted(prices, reverse=True) and sorted(pid for page in pages for pid in page) == expected
+    _, cursor = availability.city_page(city, 9)
+    assert [int(pid) for page in availability.city_pages(city, 9, cursor) for pid in page] == expected[9:]
+    # A bad cursor fails when the stream is opened, before the response would start
+    with pytest.raises(ValueError):
+        availability.city_pages(city, 9, 'x', sort_by='price_asc')
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import ml_engine
+from ml_engine import MLEngine, TRAINING_CONFIG, dataset_fingerprint
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setitem(TRAINING_CONFIG, 'rf_estimators', 4)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Property_ID': np.arange(1, 201), 'Area_SqFt': rng.integers(500, 5000, 200),
+                       'Year_Built': rng.integers(1990, 2024, 200), 'Growth_Rate': rng.uniform(0.01, 0.2, 200),
+                       'Risk_Score': rng.integers(1, 10, 200)})
+    df['Current_Price'] = df['Area_SqFt'] * 1000
+    path = os.path.join(tmp_path, 'properties.csv')
+    df.to_csv(path, index=False)
+    return path
+
+def test_fingerprint_is_hashed_once_per_file_version(data_path, monkeypatch):
+    hashed = []
+    hash_dataset = ml_engine._hash_dataset
+    monkeypatch.setattr(ml_engine, '_hash_dataset', lambda *args: hashed.append(args) or hash_dataset(*args))
+    first = dataset_fingerprint(data_path)
+    # Unchanged mtime and size: answered without reading the file again
+    assert dataset_fingerprint(data_path) == first and len(hashed) == 1
+    with open(data_path, 'a') as f:
+        f.write('201,1000,2020,0.1,5,1000000\n')
+    assert dataset_fingerprint(data_path) != first and len(hashed) == 2
+
+def test_second_engine_loads_the_disk_cache_without_training(data_path, tmp_path, monkeypatch):
+    cache_dir = os.path.join(tmp_path, 'cache')
+    trained = MLEngine(data_path, cache_dir)
+    trained.ensure_loaded()
+    assert os.listdir(cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("trained instead of loading the cache")
+    monkeypatch.setattr(ml_engine, 'train_models', fail)
+    cached = MLEngine(data_path, cache_dir)
+    assert cached.version == 'unloaded'
+    cached.ensure_loaded()
+    assert cached.version == trained.version
+    assert cached.predict(2000, 2020, 0.1, 5) == trained.predict(2000, 2020, 0.1, 5)
+
+def test_predict_batch_matches_predict_per_row(data_path, tmp_path):
+    engine = MLEngine(data_path, os.path.join(tmp_path, 'cache'))
+    rows = [(1000, 2024, 0.1, 5, 5), (2500, 2010, 0.05, 2, 0), (4000, 1995, 0.2, 9, 12), (700, 2020, -0.02, 1, 3)]
+    batch = engine.predict_batch(*[[row[i] for row in rows] for i in range(5)])
+    for i, (area, year, growth, risk, years) in enumerate(rows):
+        single = engine.predict(area, year, growth, risk, years)
+        for key in ('current_price_est', 'future_price', 'roi', 'investment_score'):
+            assert batch[key][i] == pytest.approx(single[key], rel=1e-12, abs=1e-9)
+        # The yearly series stops at each row's own horizon
+        series = batch['time_series'][i]
+        expected = [round(single['current_price_est'] * (1 + growth) ** y, 2) for y in range(years + 1)]
+        assert series[:years + 1] == pytest.approx(expected, rel=1e-12)
+        assert np.isnan(series[years + 1:]).all()
+
+def test_retrain_runs_in_a_subprocess_and_swaps_in(data_path, tmp_path, monkeypatch):
+    engine = MLEngine(data_path, os.path.join(tmp_path, 'cache'))
+    engine.ensure_loaded()
+    old_version, old_price = engine.version, engine.predict(2000, 2020, 0.1, 5)
+    # Hold the retrain until the old models have been checked
+    gate = threading.Event()
+    train_in_subprocess = ml_engine.train_in_subprocess
+    monkeypatch.setattr(ml_engine, 'train_in_subprocess', lambda *args: gate.wait() and train_in_subprocess(*args))
+
+    sales = pd.DataFrame({'PropertyID': [1, 2, 3], 'Price': [5e6, 6e6, 7e6]})
+    future = engine.retrain_async(sales)
+    assert engine.retrain_async(sales) is future
+    assert engine.version == old_version and engine.predict(2000, 2020, 0.1, 5) == old_price
+    gate.set()
+    artifact = future.result(timeout=120)
+
+    # The done callback installs and saves the artifact right after the result is set
+    saved = engine._cache_path(artifact['fingerprint'])
+    deadline = time.monotonic() + 30
+    while (engine.version == old_version or not os.path.exists(saved)) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert engine.version != old_version
+    assert engine.metrics == artifact['metrics'] and artifact['trained_sales'] == 3
+    assert os.listdir(os.path.join(tmp_path, 'cache')) == [os.path.basename(saved)]
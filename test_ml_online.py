@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+import ml_engine
+from ml_engine import TRAINING_CONFIG, ONLINE_CONFIG, online_update
+
+def make_artifact(n_base):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Area_SqFt': rng.integers(500, 5000, 200), 'Year_Built': rng.integers(1990, 2024, 200),
+                       'Growth_Rate': rng.uniform(0.01, 0.2, 200), 'Risk_Score': rng.integers(1, 10, 200)})
+    df['Current_Price'] = df['Area_SqFt'] * 1000
+    rf = RandomForestRegressor(n_estimators=n_base, random_state=0).fit(df[TRAINING_CONFIG['features']], df['Current_Price'])
+    artifact = {'models': {'rf': rf}, 'metrics': {'rf': {'MAE': 1000.0}}}
+    return artifact, df
+
+def test_online_update_grows_and_caps_forest(monkeypatch):
+    monkeypatch.setitem(TRAINING_CONFIG, 'rf_estimators', 4)
+    monkeypatch.setitem(ONLINE_CONFIG, 'max_online_trees', 8)
+    artifact, df = make_artifact(4)
+    sold = df.head(25).assign(Price=df['Current_Price'].head(25) * 2)
+
+    updated = online_update(artifact, sold, df)
+    assert updated['models']['rf'].n_estimators == 4 + ONLINE_CONFIG['trees_per_batch']
+    # The served artifact is never mutated, and the original trees are shared
+    assert artifact['models']['rf'].n_estimators == 4
+    assert updated['models']['rf'].estimators_[:4] == artifact['models']['rf'].estimators_
+
+    for _ in range(3):
+        updated = online_update(updated, sold, df)
+    online = updated['metrics']['online']
+    assert updated['models']['rf'].n_estimators == 4 + 8
+    assert online['batches'] == 4 and online['sales'] == 100
+    # Sales at twice the training price show up as drift
+    assert online['drift'] > 1
+
+def test_trainer_saves_online_models_and_followers_load_them(monkeypatch, tmp_path):
+    monkeypatch.setitem(TRAINING_CONFIG, 'rf_estimators', 4)
+    monkeypatch.setitem(ONLINE_CONFIG, 'save_every', 1)
+    _, df = make_artifact(4)
+    data_path = tmp_path / 'properties.csv'
+    df.assign(Property_ID=np.arange(1, len(df) + 1)).to_csv(data_path, index=False)
+    trainer = ml_engine.MLEngine(str(data_path), str(tmp_path / 'cache'))
+    trainer.ensure_loaded()
+    # A forked worker shares the trainer's save counter
+    follower = ml_engine.MLEngine(str(data_path), str(tmp_path / 'cache'))
+    follower.saved, follower.trainer = trainer.saved, False
+    follower.ensure_loaded()
+
+    reads = []
+    monkeypatch.setattr(ml_engine, 'load_properties', lambda path: reads.append(path) or pd.read_csv(path))
+    sales = [(pid, 1e7) for pid in range(1, 26)]
+    trainer.partial_update(sales)
+    trainer.partial_update(sales)
+    # The property features are read once, not per mini-batch
+    assert len(reads) == 1
+    assert trainer.models['rf'].n_estimators == 4 + 2 * ONLINE_CONFIG['trees_per_batch']
+
+    # The follower does not train on the sale, it loads the trainer's saved forest
+    assert follower.version != trainer.version
+    assert follower.observe_sale(1, 1e7).result()
+    # ...and then names its models as the trainer does, for ETags shared by the workers
+    assert follower.version == trainer.version
+    assert follower._pending == []
+    assert follower.models['rf'].n_estimators == trainer.models['rf'].n_estimators
+    assert follower.observe_sale(2, 1e7) is None
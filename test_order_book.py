@@ -0,0 +1,71 @@
+import threading
+from store import MarketStore
+from order_book import MatchingEngine, OrderBook
+from test_store import make_store
+
+def test_book_keeps_price_time_priority():
+    book = OrderBook([{'OrderID': 1, 'UserID': 1, 'Side': 'Bid', 'Price': 100},
+                      {'OrderID': 2, 'UserID': 2, 'Side': 'Bid', 'Price': 120},
+                      {'OrderID': 3, 'UserID': 3, 'Side': 'Bid', 'Price': 120},
+                      {'OrderID': 4, 'UserID': 4, 'Side': 'Ask', 'Price': 150}])
+    assert book.best('Bid')['OrderID'] == 2
+    book.discard(2)
+    assert book.best('Bid')['OrderID'] == 3
+    assert book.depth('Bid', 5) == [[120, 1], [100, 1]]
+    assert book.best('Ask')['OrderID'] == 4
+
+def test_bids_match_asks_and_settle(tmp_path):
+    store = make_store(tmp_path)
+    engine = MatchingEngine(store, shards=4)
+    # Property 10 is the platform's, on the market at 300 without an ask order
+    order, trades, error = engine.place(10, 1, 'Bid', 250, '2024-01-01')
+    assert error is None and trades == []
+    order, trades, error = engine.place(10, 2, 'Bid', 250, '2024-01-01')
+    assert engine.book(10)['bids'] == [[250, 2]] and engine.book(10)['best_ask'] == 300
+
+    # A bid at or above the ask fills at the waiting ask's price
+    order, trades, error = engine.place(10, 2, 'Bid', 320, '2024-01-01')
+    assert [(t['BuyerID'], t['Price']) for t in trades] == [(2, 300)]
+    assert store.get_listing(10)['OwnerID'] == 2 and store.get_user(2)['Balance'] == 700
+    # The new owner's bids lapse; alice's is still waiting
+    assert engine.book(10)['bids'] == [[250, 1]] and engine.book(10)['best_ask'] is None
+
+    # bob's ask crosses alice's bid: the waiting bid sets the price
+    order, trades, error = engine.place(10, 2, 'Ask', 200, '2024-01-02')
+    assert [(t['BuyerID'], t['SellerID'], t['Price']) for t in trades] == [(1, 2, 250)]
+    assert store.get_user(1)['Balance'] == 750 and store.get_user(2)['Balance'] == 950
+    assert store.transactions()[['UserID', 'Type', 'Price']].values.tolist() == \
+        [[2, 'Buy', 300], [1, 'Buy', 250], [2, 'Sell', 250]]
+
+    assert engine.place(10, 1, 'Bid', 400, '2024-01-02')[2] == 'You already own this land'
+    assert engine.place(10, 2, 'Ask', 400, '2024-01-02')[2] == 'Property not found or not owned by you'
+
+def test_cancel_in_another_process_leaves_the_book(tmp_path):
+    store = make_store(tmp_path)
+    a, b = MatchingEngine(store), MatchingEngine(MarketStore(store.db_path))
+    order, _, _ = a.place(10, 1, 'Bid', 250, '2024-01-01')
+    b.order_changed(10, order['OrderID'])
+    assert b.book(10)['bids'] == [[250, 1]]
+    # b learns of the cancel from the change log, as it learnt of the bid
+    assert a.cancel(order['OrderID'], 1)[1] is None
+    b.order_changed(10, order['OrderID'])
+    assert b.book(10)['bids'] == [] and a.book(10)['bids'] == []
+
+def test_competing_buyers_get_one_property(tmp_path):
+    store = make_store(tmp_path)
+    # A second process's engine over the same database, with its own books
+    engines = [MatchingEngine(store), MatchingEngine(MarketStore(store.db_path))]
+    for engine in engines:
+        engine.book(10)
+    results = []
+
+    def bid(engine, user_id):
+        results.append(engine.place(10, user_id, 'Bid', 300, '2024-01-01')[1])
+
+    threads = [threading.Thread(target=bid, args=(engine, user_id)) for engine, user_id in zip(engines, (1, 2))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(len(trades) for trades in results) == [0, 1]
+    assert len(store.transactions()) == 1
@@ -0,0 +1,77 @@
+import os
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from data_gen import generate_dataset
+from dsa_engine import DSAEngine
+from price_history import PriceHistory, Series, HISTORY_CONFIG, period_of
+
+def test_buckets_and_rolling_figures_match_the_raw_sales(tmp_path):
+    path = os.path.join(tmp_path, 'props.csv')
+    generate_dataset(2000, path=path)
+    engine = DSAEngine(path)
+    df = engine.df
+    city = df['City'].value_counts().index[0]
+    rows = np.flatnonzero(df['City'].to_numpy() == city)
+
+    rng = np.random.default_rng(0)
+    sold = rng.choice(rows, 400)
+    sales = pd.DataFrame({'PropertyID': engine.ids[sold],
+                          'Price': rng.uniform(1e6, 5e7, len(sold)).round(),
+                          'Date': [(date(2020, 1, 1) + timedelta(days=int(d))).isoformat()
+                                   for d in rng.integers(0, 1500, len(sold))]})
+    history = PriceHistory(engine)
+    # Half from the stored sales, half one at a time, as buy_land feeds them
+    history.load(sales.iloc[:200])
+    for sale in sales.iloc[200:].sort_values('Date').itertuples():
+        history.record(sale.PropertyID, sale.Price, date.fromisoformat(sale.Date))
+
+    sales['ppsf'] = sales['Price'] / df['Area_SqFt'].to_numpy()[engine.rows_of(sales['PropertyID'])]
+    sales['month'] = [period_of('month', date.fromisoformat(d)) for d in sales['Date']]
+    result = history.history(city.upper(), resolution='month')
+    months = sorted(sales['month'].unique())
+    assert [p['volume'] for p in result['points']] == [int((sales['month'] == m).sum()) for m in months]
+
+    # The rolling window ends at the newest month; sales recorded late still count in it
+    window = HISTORY_CONFIG['windows']['month']
+    last = months[-1]
+    in_window = sales.loc[sales['month'] > last - window, 'ppsf']
+    assert result['summary']['rolling_volume'] == len(in_window)
+    assert result['summary']['rolling_median_ppsf'] == round(float(np.median(in_window)), 2)
+    point = result['points'][-1]
+    assert point['median_ppsf'] == round(float(sales.loc[sales['month'] == last, 'ppsf'].median()), 2)
+
+    typed = history.history(city, 'Residential', 'year', start=date(2021, 1, 1), end=date(2022, 12, 31))
+    assert [p['period'] for p in typed['points']] == ['2021', '2022']
+    assert history.history('Atlantis') is None
+
+def test_late_sale_in_a_new_older_bucket_updates_the_rolling_figures():
+    series = Series(window=3)
+    series.add(100, 10.0, 10.0)
+    series.add(110, 30.0, 30.0)
+    # Older than the newest bucket, and in a bucket of its own
+    series.add(105, 20.0, 20.0)
+    series.add(101, 40.0, 40.0)
+    points = series.points('year')
+    assert [p['period'] for p in points] == ['0100', '0101', '0105', '0110']
+    # Each bucket's rolling window (the 3 periods ending at it) counts every sale in it, late ones too
+    assert [p['rolling_volume'] for p in points] == [1, 2, 1, 1]
+    assert [p['rolling_median_ppsf'] for p in points] == [10.0, 25.0, 20.0, 30.0]
+
+def test_buckets_that_leave_the_window_keep_only_their_figures():
+    series = Series(window=2)
+    for period, values in ((1, [10.0, 30.0, 20.0]), (2, [5.0]), (3, [7.0, 9.0])):
+        for value in values:
+            series.add(period, value, value * 100)
+    # Period 1 left the window ending at 3: no raw values, same figures
+    assert series.buckets[1][0] is None and series.buckets[3][0] == [7.0, 9.0]
+    assert series.rolling == [5.0, 7.0, 9.0]
+    first = series.points('year')[0]
+    assert (first['volume'], first['median_ppsf'], first['avg_ppsf'], first['value']) == (3, 20.0, 20.0, 6000.0)
+
+    # A sale arriving after its bucket was compacted: exact volume, value and average, approximate median
+    series.add(1, 40.0, 4000.0)
+    first, second = series.points('year')[:2]
+    assert (first['volume'], first['avg_ppsf'], first['value']) == (4, 25.0, 10000.0)
+    assert first['median_ppsf'] == 20.0
+    assert second['rolling_volume'] == 5 and series.points('year')[-1]['rolling_volume'] == 3
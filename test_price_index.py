@@ -0,0 +1,57 @@
+import numpy as np
+import price_index
+from price_index import PriceIndex, StaticPriceIndex
+
+def test_range_nearest_and_pages():
+    index = PriceIndex([(500, 1), (100, 2), (300, 3), (300, 4), (900, 5)])
+    assert index.range(200, 600) == [(300.0, 3), (300.0, 4), (500.0, 1)]
+    assert index.range(max_price=300, descending=True) == [(300.0, 4), (300.0, 3), (100.0, 2)]
+    assert [pid for _, pid in index.nearest(450, 2)] == [1, 4]
+
+    page, cursor = index.page(2)
+    assert [pid for _, pid in page] == [2, 3]
+    page, cursor = index.page(2, cursor)
+    assert [pid for _, pid in page] == [4, 1]
+    page, cursor = index.page(2, cursor)
+    assert [pid for _, pid in page] == [5] and cursor is None
+
+def test_updates_keep_order():
+    index = PriceIndex([(500, 1), (100, 2)])
+    index.add(200, 3)
+    index.remove(100, 2)
+    assert index.range() == [(200.0, 3), (500.0, 1)]
+
+def test_static_index_matches_stable_sort():
+    prices = np.array([30, 10, 20, 10])
+    index = StaticPriceIndex(prices, np.argsort(prices, kind='stable'))
+    assert index.range(10, 20) == [1, 3, 2]
+    assert index.nearest(29, 1) == [0]
+    page, cursor = index.page(3, descending=True)
+    assert page == [0, 2, 3]
+    assert index.page(3, cursor, descending=True) == ([1], None)
+
+def test_chunked_index_matches_a_sorted_list(monkeypatch):
+    monkeypatch.setattr(price_index, 'CHUNK_SIZE', 4)
+    rng = np.random.default_rng(0)
+    entries = [(int(p), i) for i, p in enumerate(rng.integers(0, 50, 30))]
+    index = PriceIndex(entries)
+    expected = sorted((float(p), i) for p, i in entries)
+    for step in range(300):
+        if step % 3 == 0 and expected:
+            price, pid = expected[int(rng.integers(len(expected)))]
+            index.remove(price, pid)
+            expected.remove((price, pid))
+        else:
+            pid = 100 + step
+            price = float(rng.integers(0, 50))
+            index.add(price, pid)
+            expected.append((price, pid))
+            expected.sort()
+        assert len(index.chunks) == 0 or max(len(chunk) for chunk in index.chunks) <= 8
+    index.remove(-1, 0)  # absent: ignored
+    assert list(index) == expected and len(index) == len(expected)
+    assert index.range(10, 20) == [key for key in expected if 10 <= key[0] <= 20]
+    assert index.count(max_price=25) == sum(key[0] <= 25 for key in expected)
+    page, cursor = index.page(7, min_price=5)
+    rest = [key for key in expected if key[0] >= 5]
+    assert page == rest[:7] and index.page(len(rest), cursor, min_price=5)[0] == rest[7:]
@@ -0,0 +1,53 @@
+import os
+import numpy as np
+import pandas as pd
+from data_gen import generate_dataset
+from dsa_engine import DSAEngine
+from market_index import AvailabilityIndex
+from recommendations import RecommendationIndex, RECOMMENDATION_CONFIG
+
+class ValueModel:
+    """Stands in for MLEngine: a listing is worth 5000 per square foot"""
+    models = {'rf': None}
+
+    def predict_batch(self, areas, years_built, growth_rates, risk_scores, years_ahead):
+        fair = np.asarray(areas, dtype=float) * 5000
+        return {'current_price_est': fair, 'future_price': fair * (1 + np.asarray(growth_rates)) ** years_ahead}
+
+def test_top_k_tables_follow_buys_and_sells(tmp_path):
+    path = os.path.join(tmp_path, 'props.csv')
+    generate_dataset(3000, path=path)
+    engine = DSAEngine(path)
+    listings = pd.read_csv(os.path.join(tmp_path, 'Listings.csv'))
+    availability = AvailabilityIndex(engine, listings)
+    config = dict(RECOMMENDATION_CONFIG, top_k=3, slack=2)
+    index = RecommendationIndex(engine, availability, ValueModel(), config)
+    df = engine.df
+
+    def expected(**filters):
+        rows = np.flatnonzero(availability.available)
+        for column, value in filters.items():
+            rows = rows[df[column].to_numpy()[rows] == value]
+        price = availability.listing_price[rows]
+        future = df['Area_SqFt'].to_numpy()[rows] * 5000.0 * (1 + df['Growth_Rate'].to_numpy()[rows]) ** 5
+        score = (future - price) / price * 100 / df['Risk_Score'].to_numpy()[rows]
+        return engine.ids[rows[np.lexsort((engine.ids[rows], -score))][:3]].tolist()
+
+    city = df['City'].value_counts().index[0]
+    state = df.loc[df['City'] == city, 'State'].iloc[0]
+    filters = [({}, {}), ({'region': 'North'}, {'Region': 'North'}), ({'state': state.lower()}, {'State': state}),
+               ({'city': city, 'property_type': 'Commercial'}, {'City': city, 'Property_Type': 'Commercial'})]
+
+    rng = np.random.default_rng(1)
+    for step in range(60):
+        for query, columns in filters:
+            assert [r['Property_ID'] for r in index.top(limit=5, **query)] == expected(**columns)
+        # Sell off the current leaders, and relist random properties at random prices
+        for leader in index.top(**filters[step % len(filters)][0])[:1]:
+            availability.remove(leader['Property_ID'])
+            index.update(leader['Property_ID'])
+        property_id = int(rng.integers(1, 3001))
+        availability.add(property_id, float(rng.integers(100_000, 50_000_000)))
+        index.update(property_id)
+
+    assert index.top(city='Atlantis') == [] and index.top(property_type='Castle') == []
@@ -0,0 +1,51 @@
+from flask import Flask, jsonify, request
+from response_cache import ResponseCache, CACHE_CONFIG
+
+def test_etags_304s_and_lru_budget():
+    app = Flask(__name__)
+    state = {'version': 1, 'calls': 0}
+    cache = ResponseCache(lambda: state['version'], dict(CACHE_CONFIG, max_bytes=3 * (100 + 256)))
+
+    @app.route('/api/item/<name>')
+    @cache.cached()
+    def item(name):
+        state['calls'] += 1
+        return jsonify({'name': name, 'pad': 'x' * 60, 'q': request.args.get('q')})
+
+    client = app.test_client()
+    first = client.get('/api/item/a')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and state['calls'] == 1
+    # Same key and version: served from the cache, or 304 when the client has it
+    assert client.get('/api/item/a').get_data() == first.get_data() and state['calls'] == 1
+    assert client.get('/api/item/a', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/item/a', query_string={'q': '1'}).headers['ETag'] != etag
+    assert state['calls'] == 2
+
+    # A data change retires every ETag and cached body
+    state['version'] = 2
+    again = client.get('/api/item/a', headers={'If-None-Match': etag})
+    assert again.status_code == 200 and again.headers['ETag'] != etag and state['calls'] == 3
+
+    for name in 'bcde':
+        client.get(f'/api/item/{name}')
+    assert cache.size <= cache.config['max_bytes'] and len(cache.entries) == 3
+    assert ('item', (('name', 'a'),), (), None) not in cache.entries
+
+def test_view_with_its_own_version_ignores_data_changes():
+    app = Flask(__name__)
+    state = {'data': 1, 'model': 'a', 'calls': 0}
+    cache = ResponseCache(lambda: state['data'])
+
+    @app.route('/analyzer')
+    @cache.cached(version=lambda: state['model'])
+    def analyzer():
+        state['calls'] += 1
+        return jsonify({'model': state['model']})
+
+    client = app.test_client()
+    etag = client.get('/analyzer').headers['ETag']
+    state['data'] = 2
+    assert client.get('/analyzer', headers={'If-None-Match': etag}).status_code == 304 and state['calls'] == 1
+    state['model'] = 'b'
+    assert client.get('/analyzer').get_json() == {'model': 'b'} and state['calls'] == 2
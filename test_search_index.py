@@ -0,0 +1,30 @@
+import os
+import pytest
+from data_gen import generate_dataset
+from dsa_engine import DSAEngine
+from search_index import SearchIndex, edit_distance
+
+@pytest.fixture(scope='module')
+def index(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp('search'), 'props.csv')
+    generate_dataset(20000, path=path)
+    return SearchIndex(DSAEngine(path))
+
+def test_prefix_autocomplete(index):
+    assert [e['name'] for e in index.complete('bengal', 2)] == ['Bengaluru', 'West Bengal']
+    assert 'New Delhi' in [e['name'] for e in index.complete('delhi')]
+    assert index.complete('') == []
+
+def test_typos_and_former_names_resolve(index):
+    assert index.resolve('Bangalor')['name'] == 'Bengaluru'
+    gurugram = index.resolve('Gurgaon')
+    assert (gurugram['type'], gurugram['name'], gurugram['state']) == ('city', 'Gurugram', 'Haryana')
+    assert index.resolve('karnatka')['name'] == 'Karnataka'
+    assert index.resolve('comercial')['name'] == 'Commercial'
+    assert index.resolve('xyzzy') is None
+    assert index.complete('hyderbad')[0]['name'] == 'Hyderabad'
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance('dlehi', 'delhi', 2) == 1
+    assert edit_distance('kolkatta', 'kolkata', 2) == 1
+    assert edit_distance('mumbai', 'chennai', 2) == 3
@@ -0,0 +1,76 @@
+import pandas as pd
+import os
+from store import MarketStore, ListingFeed
+
+def make_store(tmp_path):
+    users_csv = os.path.join(tmp_path, 'Users.csv')
+    listings_csv = os.path.join(tmp_path, 'Listings.csv')
+    trans_csv = os.path.join(tmp_path, 'Transactions.csv')
+    pd.DataFrame([[1, 'alice', 'pw', 'a@x', 1000], [2, 'bob', 'pw', 'b@x', 1000]],
+                 columns=['UserID', 'Username', 'Password', 'Email', 'Balance']).to_csv(users_csv, index=False)
+    pd.DataFrame([[10, 300, 0, 'Available'], [11, 200, 2, 'Sold']],
+                 columns=['PropertyID', 'Price', 'OwnerID', 'Status']).to_csv(listings_csv, index=False)
+    pd.DataFrame(columns=['TransactionID', 'UserID', 'PropertyID', 'Date', 'Price', 'Type']).to_csv(trans_csv, index=False)
+    store = MarketStore(os.path.join(tmp_path, 'test.db'))
+    store.import_csvs(users_csv, listings_csv, trans_csv)
+    return store
+
+def test_buy_settles_atomically(tmp_path):
+    store = make_store(tmp_path)
+    assert store.place_order(11, 2, 'Ask', 250)[2] is None
+
+    listing, error = store.buy(11, 1, '2024-01-01')
+    assert error is None and listing['Price'] == 250
+    assert store.get_user(1)['Balance'] == 750
+    assert store.get_user(2)['Balance'] == 1250
+    assert store.get_listing(11) == {'PropertyID': 11, 'Price': 250, 'OwnerID': 1, 'Status': 'Sold'}
+    assert store.transactions()[['UserID', 'Type']].values.tolist() == [[1, 'Buy'], [2, 'Sell']]
+
+    # A second buyer of the same listing is rejected and nothing changes
+    listing, error = store.buy(11, 2, '2024-01-01')
+    assert error == 'Not available'
+    assert len(store.transactions()) == 2
+
+def test_create_user_rejects_duplicate(tmp_path):
+    store = make_store(tmp_path)
+    assert store.create_user('carol', 'pw', 'c@x', 500, 'Carol', '1', 'addr') == 3
+    assert store.create_user('carol', 'pw', 'c@x', 500, 'Carol', '1', 'addr') is None
+    assert store.authenticate('carol', 'pw')['UserID'] == 3
+
+def test_transactions_page_walks_by_id(tmp_path):
+    store = make_store(tmp_path)
+    store.buy(10, 2, '2024-01-01')
+    store.place_order(11, 2, 'Ask', 250)
+    store.buy(11, 1, '2024-01-02')
+    page, cursor = store.transactions_page(2)
+    assert page['TransactionID'].tolist() == [1, 2] and cursor == '2'
+    page, cursor = store.transactions_page(2, cursor)
+    assert page['TransactionID'].tolist() == [3] and cursor is None
+
+def test_listing_feed_replays_other_writers(tmp_path):
+    writer = make_store(tmp_path)
+    reader = MarketStore(writer.db_path)
+    seen = {'writer': [], 'reader': []}
+    writer_feed = ListingFeed(writer, lambda *change: seen['writer'].append(change))
+    reader_feed = ListingFeed(reader, lambda *change: seen['reader'].append(change))
+    # Forked workers share the counter created before the fork
+    reader_feed.latest = writer_feed.latest
+
+    writer.buy(10, 1, '2024-01-01')
+    assert writer.place_order(11, 2, 'Ask', 250)[2] is None
+    writer.buy(10, 1, '2024-01-01')  # rejected: logs nothing
+    writer_feed.publish()
+    reader_feed.sync()
+    assert seen['writer'] == seen['reader'] == [(10, 300, 'Sold', None, '2024-01-01'), (11, 250, 'Available', 1, None)]
+    reader_feed.sync()
+    assert len(seen['reader']) == 2
+
+    # A bid and its cancellation reach the order books but leave listings_seen alone
+    listings_seen = reader_feed.listings_seen
+    order, _, _ = writer.place_order(11, 1, 'Bid', 100)
+    writer.cancel_order(order['OrderID'], 1)
+    writer_feed.publish()
+    reader_feed.sync()
+    assert [change[2] for change in seen['reader'][2:]] == ['Order', 'Order']
+    assert reader_feed.seen > listings_seen == reader_feed.listings_seen == writer_feed.listings_seen
+    assert ListingFeed(reader, None).listings_seen == listings_seen